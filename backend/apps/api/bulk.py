@@ -0,0 +1,355 @@
+# apps/api/bulk.py
+
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+OPERATIONS = ('create', 'update', 'delete')
+
+
+def get_bulk_config():
+    """BULK_API de settings, com os padrões"""
+    config = getattr(settings, 'BULK_API', {})
+    return {
+        'MAX_ITEMS': config.get('MAX_ITEMS', 1000),
+        'BATCH_SIZE': config.get('BATCH_SIZE', 500),
+    }
+
+
+def record_saved(model, instances, created):
+    """
+    O que o post_save faria para objetos gravados com bulk_create /
+    bulk_update (que não disparam signals): um AuditLog por objeto, como no
+    save(), e uma nova versão do cache de respostas por organização.
+    """
+    from apps.shared.audit import audit_registry
+    from apps.shared.response_cache import response_cache
+    from apps.shared.signals import audit_post_save
+
+    if audit_registry.is_registered(model):
+        for instance in instances:
+            audit_post_save(sender=model, instance=instance, created=created)
+
+    if response_cache.is_tracked(model):
+        for organization_id in {response_cache.get_organization_id(instance) for instance in instances}:
+            response_cache.bump_on_commit(organization_id, model)
+
+
+def get_unique_checks(model):
+    """[(campos, condição)] das restrições de unicidade do model"""
+    from django.db.models import UniqueConstraint
+
+    checks = [
+        (list(constraint.fields), constraint.condition)
+        for constraint in model._meta.constraints
+        if isinstance(constraint, UniqueConstraint) and constraint.fields
+    ]
+    checks += [(list(fields), None) for fields in model._meta.unique_together]
+    return checks
+
+
+def find_unique_conflicts(model, instances, batch_size=500):
+    """
+    {posição: [campos]} dos objetos que violariam uma restrição de
+    unicidade: repetidos no próprio lote ou já existentes no banco (uma
+    consulta por bloco de batch_size, com __in em cada campo).
+
+    A condição da restrição (ex: is_deleted=False) só filtra o banco: os
+    objetos gravados pela API estão sempre vivos.
+    """
+    conflicts = {}
+
+    for fields, condition in get_unique_checks(model):
+        attnames = [model._meta.get_field(name).attname for name in fields]
+
+        seen = {}
+        for position, instance in enumerate(instances):
+            key = tuple(getattr(instance, attname) for attname in attnames)
+            if None in key or '' in key:
+                continue
+            if key in seen:
+                conflicts.setdefault(position, []).extend(fields)
+            else:
+                seen[key] = position
+
+        existing = model._base_manager.all()
+        if condition is not None:
+            existing = existing.filter(condition)
+
+        keys = list(seen)
+        for start in range(0, len(keys), batch_size):
+            chunk = keys[start:start + batch_size]
+            lookups = {
+                f'{attname}__in': {key[i] for key in chunk}
+                for i, attname in enumerate(attnames)
+            }
+            for pk, *values in existing.filter(**lookups).values_list('pk', *attnames):
+                position = seen.get(tuple(values))
+                if position is not None and instances[position].pk != pk:
+                    conflicts.setdefault(position, []).extend(fields)
+
+    return conflicts
+
+
+class BulkMixin:
+    """
+    POST <lista>/bulk/: cria, edita e apaga vários objetos numa requisição.
+
+        {"create": [{...}, ...],
+         "update": [{"id": 1, ...campos alterados}, ...],
+         "delete": [3, 4]}
+
+    Todos os itens são validados antes de gravar (um serializer para o
+    lote; os objetos editados vêm numa consulta). Com algum erro, nada é
+    gravado e a resposta é 400. Sem erros, tudo é gravado numa transação
+    com bulk_create / bulk_update; o delete usa o do queryset (soft delete
+    onde houver). Resposta: um resultado por item, na ordem enviada.
+
+    Tenant e auditoria como no create()/save() de um objeto: ver
+    TenantSerializerMixin e record_saved().
+
+    bulk_serializer_class: serializer de escrita (com TenantSerializerMixin).
+    """
+
+    bulk_serializer_class = None
+
+    def get_bulk_serializer(self, *args, **kwargs):
+        kwargs.setdefault('context', {**self.get_serializer_context(), 'bulk': True})
+        return self.bulk_serializer_class(*args, **kwargs)
+
+    def get_bulk_payload(self, request, max_items):
+        data = request.data
+        if not isinstance(data, dict) or not set(data) & set(OPERATIONS):
+            raise ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [f"Envie um objeto com {', '.join(OPERATIONS)}."]
+            })
+
+        payload = {}
+        for operation in OPERATIONS:
+            items = data.get(operation) or []
+            if not isinstance(items, list):
+                raise ValidationError({operation: ['Envie uma lista.']})
+            payload[operation] = items
+
+        total = sum(len(items) for items in payload.values())
+        if total > max_items:
+            raise ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [f'Máximo de {max_items} itens por requisição ({total} enviados).']
+            })
+
+        return payload
+
+    def to_pk(self, value):
+        model = self.get_queryset().model
+        try:
+            return model._meta.pk.to_python(value)
+        except DjangoValidationError:
+            return None
+
+    def validate_items(self, serializer, items, instances=None):
+        """
+        Valida cada item com o mesmo serializer (campos montados uma vez).
+        Devolve [(validated_data ou None, erros ou None)].
+        """
+        validated = []
+        for position, item in enumerate(items):
+            instance = instances[position] if instances is not None else None
+            if instances is not None and instance is None:
+                validated.append((None, None))  # Erro já registrado (id)
+                continue
+
+            serializer.instance = instance
+            serializer.initial_data = item
+            try:
+                if not isinstance(item, dict):
+                    raise ValidationError({api_settings.NON_FIELD_ERRORS_KEY: ['Envie um objeto.']})
+                validated.append((serializer.run_validation(item), None))
+            except ValidationError as exc:
+                validated.append((None, exc.detail))
+
+        return validated
+
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """
+        Cria, edita e apaga em lote (ver BulkMixin).
+        """
+        config = get_bulk_config()
+        batch_size = config['BATCH_SIZE']
+        payload = self.get_bulk_payload(request, config['MAX_ITEMS'])
+        model = self.get_queryset().model
+
+        errors = {operation: {} for operation in OPERATIONS}
+
+        # ===== IDS (update / delete) =====
+        seen = set()
+        update_ids = []
+        for position, item in enumerate(payload['update']):
+            pk = self.to_pk(item.get('id')) if isinstance(item, dict) else None
+            if pk is None:
+                errors['update'][position] = {'id': ['Informe o id do objeto.']}
+            elif pk in seen:
+                errors['update'][position] = {'id': ['Id repetido no lote.']}
+                pk = None
+            seen.add(pk)
+            update_ids.append(pk)
+
+        delete_ids = []
+        for position, value in enumerate(payload['delete']):
+            pk = self.to_pk(value)
+            if pk is None:
+                errors['delete'][position] = {'id': ['Id inválido.']}
+            elif pk in seen:
+                errors['delete'][position] = {'id': ['Id repetido no lote.']}
+                pk = None
+            seen.add(pk)
+            delete_ids.append(pk)
+
+        with transaction.atomic():
+            # Objetos do tenant (mesmo queryset do get_object), travados até o fim
+            wanted = [pk for pk in update_ids + delete_ids if pk is not None]
+            found = {}
+            queryset = self.filter_queryset(self.get_queryset()).order_by()
+            for start in range(0, len(wanted), batch_size):
+                found.update(
+                    (instance.pk, instance)
+                    for instance in queryset.filter(pk__in=wanted[start:start + batch_size]).select_for_update()
+                )
+
+            for operation, ids in (('update', update_ids), ('delete', delete_ids)):
+                for position, pk in enumerate(ids):
+                    if pk is not None and pk not in found:
+                        errors[operation][position] = {'id': ['Não encontrado.']}
+
+            # ===== VALIDAÇÃO =====
+            creates = self.validate_items(self.get_bulk_serializer(), payload['create'])
+            update_instances = [
+                found.get(pk) if position not in errors['update'] else None
+                for position, pk in enumerate(update_ids)
+            ]
+            updates = self.validate_items(
+                self.get_bulk_serializer(partial=True),
+                payload['update'],
+                update_instances
+            )
+
+            builder = self.get_bulk_serializer()
+            created, updated = [], []
+            for operation, results, target in (('create', creates, created), ('update', updates, updated)):
+                for position, (validated_data, item_errors) in enumerate(results):
+                    if item_errors is not None:
+                        errors[operation][position] = item_errors
+                    if validated_data is None:
+                        continue
+
+                    related = builder.pop_related(validated_data)
+                    if operation == 'create':
+                        instance = builder.build_instance(validated_data)
+                    else:
+                        instance = builder.apply_update(update_instances[position], validated_data)
+                    if hasattr(instance, 'prepare_for_save'):
+                        instance.prepare_for_save()
+                    target.append((position, instance, related))
+
+            # Unicidade do lote inteiro (no próprio lote e contra o banco)
+            written = [('create', entry) for entry in created] + [('update', entry) for entry in updated]
+            conflicts = find_unique_conflicts(model, [entry[1] for _, entry in written], batch_size)
+            for index, fields in conflicts.items():
+                operation, (position, _, _) = written[index]
+                errors[operation][position] = {
+                    api_settings.NON_FIELD_ERRORS_KEY: [
+                        f"Já existe {model._meta.verbose_name} com este(s) valor(es) de {', '.join(dict.fromkeys(fields))}."
+                    ]
+                }
+
+            if any(errors.values()):
+                return Response(self.get_bulk_results(payload, errors), status=status.HTTP_400_BAD_REQUEST)
+
+            # ===== GRAVAÇÃO =====
+            try:
+                self.perform_bulk(model, created, updated, [found[pk] for pk in delete_ids], batch_size)
+            except IntegrityError:
+                # Conflito com gravação concorrente: a transação inteira volta
+                transaction.set_rollback(True)
+                return Response(
+                    {'detail': 'Conflito ao gravar o lote (dados alterados ao mesmo tempo). Nada foi gravado.'},
+                    status=status.HTTP_409_CONFLICT
+                )
+
+        return Response(self.get_bulk_results(payload, errors, created, updated, delete_ids))
+
+    def perform_bulk(self, model, created, updated, deleted, batch_size):
+        builder = self.get_bulk_serializer()
+
+        with transaction.atomic():
+            if created:
+                instances = model.objects.bulk_create(
+                    [instance for _, instance, _ in created],
+                    batch_size=batch_size
+                )
+                record_saved(model, instances, created=True)
+
+            if updated:
+                # bulk_update não aplica auto_now; só as colunas alteradas
+                now = timezone.now()
+                fields = {'updated_at'} if hasattr(model, 'updated_at') else set()
+                for _, instance, _ in updated:
+                    snapshot = instance.get_audit_snapshot() or {}
+                    if hasattr(instance, 'updated_at'):
+                        instance.updated_at = now
+                    fields.update(
+                        field.name for field in model._meta.concrete_fields
+                        if not field.primary_key
+                        and snapshot.get(field.attname, object()) != getattr(instance, field.attname)
+                    )
+                model.objects.bulk_update(
+                    [instance for _, instance, _ in updated],
+                    sorted(fields),
+                    batch_size=batch_size
+                )
+                record_saved(model, [instance for _, instance, _ in updated], created=False)
+
+            builder.save_related(
+                [(instance, related) for _, instance, related in created + updated],
+                batch_size
+            )
+
+            if deleted:
+                model.objects.filter(pk__in=[instance.pk for instance in deleted]).delete()
+
+    def get_bulk_results(self, payload, errors, created=(), updated=(), delete_ids=()):
+        """Um resultado por item enviado, na mesma ordem"""
+        saved = {
+            'create': {position: instance.pk for position, instance, _ in created},
+            'update': {position: instance.pk for position, instance, _ in updated},
+            'delete': dict(enumerate(delete_ids)),
+        }
+        labels = {'create': 'created', 'update': 'updated', 'delete': 'deleted'}
+
+        results = {}
+        for operation in OPERATIONS:
+            results[operation] = []
+            for position in range(len(payload[operation])):
+                if position in errors[operation]:
+                    results[operation].append({
+                        'index': position,
+                        'status': 'error',
+                        'errors': errors[operation][position],
+                    })
+                elif position in saved[operation]:
+                    results[operation].append({
+                        'index': position,
+                        'status': labels[operation],
+                        'id': saved[operation][position],
+                    })
+                else:
+                    # Válido, mas o lote não foi gravado por erro em outro item
+                    results[operation].append({'index': position, 'status': 'valid'})
+
+        return results
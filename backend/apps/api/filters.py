@@ -0,0 +1,147 @@
+# apps/api/filters.py
+
+import django_filters
+from rest_framework.filters import BaseFilterBackend
+
+from apps.shared.models import AuditLog
+from apps.shared.permissions import CanViewConfidential
+
+
+def filter_confidential(request, queryset, field='is_confidential'):
+    """
+    Remove registros confidenciais se o usuário não pode vê-los.
+    
+    Usa as capacidades já calculadas do request (sem consultas); o filtro
+    vai para o SQL, então contagem e paginação continuam corretas.
+    
+    Uso:
+        processes = filter_confidential(request, Process.objects.for_request(request))
+        parties = filter_confidential(request, parties, 'process__is_confidential')
+    """
+    if CanViewConfidential().has_request_permission(request):
+        return queryset
+    return queryset.filter(**{field: False})
+
+
+class ConfidentialityFilterBackend(BaseFilterBackend):
+    """
+    Filter backend que esconde registros confidenciais conforme o papel.
+    
+    Vale para list, retrieve e actions que usam get_object(); o campo pode
+    ser trocado com `confidential_field` na view.
+    """
+    
+    def filter_queryset(self, request, queryset, view):
+        field = getattr(view, 'confidential_field', 'is_confidential')
+        return filter_confidential(request, queryset, field)
+
+
+class SparseFieldsetsFilterBackend(BaseFilterBackend):
+    """
+    Leva ?fields=/?omit= para o banco: queryset.only() com as colunas que
+    o serializer da action vai ler (ver SparseFieldsetsMixin).
+    
+    Sempre carrega também as colunas de tenant/confidencialidade (checagens
+    de permissão por objeto), as de ordenação (cursor da paginação), o
+    timestamp do GET condicional e as FKs de select_related.
+    """
+    required_fields = ('organization', 'office', 'is_confidential')
+    
+    def get_ordering_fields(self, request, view):
+        from rest_framework.settings import api_settings
+        
+        terms = list(getattr(view, 'keyset_ordering', None) or getattr(view, 'ordering', None) or ())
+        terms += request.query_params.get(api_settings.ORDERING_PARAM, '').split(',')
+        return [term.strip().lstrip('-') for term in terms if term and term.strip()]
+    
+    def filter_queryset(self, request, queryset, view):
+        from django.core.exceptions import FieldDoesNotExist
+        
+        serializer_class = view.get_serializer_class()
+        if not hasattr(serializer_class, 'get_only_fields'):
+            return queryset
+        
+        model = queryset.model
+        names = serializer_class.get_only_fields(request, model)
+        if names is None:
+            return queryset
+        
+        candidates = [*self.required_fields, *self.get_ordering_fields(request, view)]
+        candidates.append(getattr(view, 'conditional_timestamp_field', None))
+        if isinstance(queryset.query.select_related, dict):
+            candidates += list(queryset.query.select_related)
+        
+        for name in filter(None, candidates):
+            try:
+                field = model._meta.get_field(name)
+            except FieldDoesNotExist:
+                continue
+            if field.concrete and not field.many_to_many:
+                names.add(field.name)
+        
+        return queryset.only(*names)
+
+
+class AuditLogFilter(django_filters.FilterSet):
+    """
+    Filtros da API de auditoria.
+    
+    Cada filtro usa um dos índices de AuditLog (sempre junto da organização):
+    model + object_id -> (model_type, object_id); user -> (user, timestamp);
+    since/until -> (organization, timestamp).
+    
+    include_archived não filtra o queryset: a listagem segue pelos logs
+    arquivados (ver AuditLogViewSet.list_with_archived).
+    """
+    model = django_filters.CharFilter(method='filter_model', label='Model (ex: Process)')
+    object_id = django_filters.NumberFilter()
+    user = django_filters.NumberFilter(field_name='user_id')
+    action = django_filters.ChoiceFilter(choices=AuditLog.ACTION_CHOICES)
+    since = django_filters.IsoDateTimeFilter(field_name='timestamp', lookup_expr='gte')
+    until = django_filters.IsoDateTimeFilter(field_name='timestamp', lookup_expr='lt')
+    include_archived = django_filters.BooleanFilter(
+        method='filter_include_archived',
+        label='Incluir logs arquivados'
+    )
+    
+    class Meta:
+        model = AuditLog
+        fields = ['model', 'object_id', 'user', 'action', 'since', 'until', 'include_archived']
+    
+    def filter_model(self, queryset, name, value):
+        # Nome -> id pelo cache de lookup: filtra direto na FK, sem JOIN
+        from apps.shared.audit_intern import model_names
+        
+        model_type_id = model_names.find_id(value)
+        if model_type_id is None:
+            return queryset.none()
+        return queryset.filter(model_type_id=model_type_id)
+    
+    def filter_include_archived(self, queryset, name, value):
+        return queryset
+    
+    def archive_match(self, office_id=None):
+        """Os mesmos filtros aplicados a uma linha arquivada (dict)"""
+        from django.utils.dateparse import parse_datetime
+        
+        data = self.form.cleaned_data
+        checks = [
+            ('office_id', office_id),
+            ('model_name', data.get('model') or None),
+            ('object_id', data.get('object_id')),
+            ('user_id', data.get('user')),
+            ('action', data.get('action') or None),
+        ]
+        checks = [(key, value) for key, value in checks if value is not None]
+        since, until = data.get('since'), data.get('until')
+        
+        def match(row):
+            if any(row.get(key) != value for key, value in checks):
+                return False
+            if since or until:
+                timestamp = parse_datetime(row['timestamp'])
+                if (since and timestamp < since) or (until and timestamp >= until):
+                    return False
+            return True
+        
+        return match
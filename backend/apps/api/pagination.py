@@ -0,0 +1,281 @@
+# apps/api/pagination.py
+
+import base64
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.exceptions import ValidationError as APIValidationError
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+def is_keyset_field(model, name):
+    """
+    Campo serve de chave do keyset: coluna simples, NOT NULL (NULL quebra a
+    comparação de tuplas) e coberta por algum índice.
+    """
+    if name == 'pk':
+        return True
+
+    try:
+        field = model._meta.get_field(name)
+    except FieldDoesNotExist:
+        return False
+
+    if not field.concrete or field.is_relation or field.null:
+        return False
+
+    if field.primary_key or field.unique or field.db_index:
+        return True
+
+    return any(
+        name in index.fields or f'-{name}' in index.fields
+        for index in model._meta.indexes
+    )
+
+
+class KeysetPagination(BasePagination):
+    """
+    Paginação por keyset (seek): a próxima página começa depois da última
+    linha da anterior, comparando a tupla de ordenação, ex:
+        WHERE (timestamp, id) < (:ts, :id) ORDER BY timestamp DESC, id DESC LIMIT n
+
+    Custo constante em qualquer página (usa o índice, sem OFFSET) e sem
+    COUNT. Só avança (`next`); o cursor é opaco para o cliente.
+
+    A ordenação vem de `keyset_ordering` na view (ou na action:
+    @action(..., keyset_ordering=(...))) ou, se não houver, do ?ordering=
+    (OrderingFilter) quando todos os campos pedidos servem de chave
+    (is_keyset_field), senão do `ordering` da view / Meta do model.
+    O id é acrescentado como desempate. Um ?ordering= que não serve de
+    chave é recusado (400), em vez de ignorado.
+    """
+    page_size = 50
+    max_page_size = 500
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+    ordering = ('-id',)
+    invalid_cursor_message = 'Cursor inválido.'
+    invalid_ordering_message = 'Ordenação não suportada na paginação por cursor: {ordering}.'
+
+    def get_keyset_terms(self, model, terms, allowed=None):
+        """Termos de ordenação válidos como chave, ou None"""
+        terms = [term.strip() for term in terms if term and term.strip()]
+        if not terms:
+            return None
+        for term in terms:
+            name = term.lstrip('-')
+            if allowed is not None and name not in allowed:
+                return None
+            if not is_keyset_field(model, name):
+                return None
+        return terms
+
+    def reject_ordering(self, requested):
+        raise APIValidationError({
+            api_settings.ORDERING_PARAM: [self.invalid_ordering_message.format(ordering=','.join(requested))]
+        })
+
+    def get_ordering(self, request, queryset, view):
+        requested = [
+            term.strip()
+            for term in request.query_params.get(api_settings.ORDERING_PARAM, '').split(',')
+            if term.strip()
+        ]
+
+        explicit = getattr(view, 'keyset_ordering', None)
+        if explicit:
+            # Só o próprio keyset (ou um prefixo dele) pode ser pedido
+            if requested and list(explicit[:len(requested)]) != requested:
+                self.reject_ordering(requested)
+            return tuple(explicit)
+
+        model = queryset.model
+        allowed = getattr(view, 'ordering_fields', None)
+        if allowed == '__all__':
+            allowed = None
+
+        if requested:
+            ordering = self.get_keyset_terms(model, requested, allowed)
+            if ordering is None:
+                self.reject_ordering(requested)
+        else:
+            ordering = (
+                self.get_keyset_terms(model, getattr(view, 'ordering', None) or ())
+                or self.get_keyset_terms(model, model._meta.ordering)
+                or list(self.ordering)
+            )
+
+        # Desempate pelo id, na direção do primeiro campo (mesmo sentido do índice)
+        if ordering[-1].lstrip('-') not in ('id', 'pk'):
+            ordering.append('-id' if ordering[0].startswith('-') else 'id')
+
+        return tuple(ordering)
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    # ===== CURSOR =====
+
+    def encode_cursor(self, values):
+        # isoformat mantém os microssegundos (a comparação precisa ser exata)
+        raw = json.dumps(
+            values,
+            default=lambda value: value.isoformat() if hasattr(value, 'isoformat') else str(value),
+            separators=(',', ':')
+        )
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, queryset, cursor):
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            values = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+            if len(values) != len(self.fields):
+                raise ValueError
+            return [
+                queryset.model._meta.get_field(name).to_python(value)
+                for name, value in zip(self.fields, values)
+            ]
+        except (TypeError, ValueError, ValidationError, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def seek_filter(self, values):
+        """
+        Q de "depois da posição": OR de (prefixo igual E campo i além do valor).
+        """
+        condition = Q()
+        for i, (name, descending) in enumerate(zip(self.fields, self.descending)):
+            lookup = 'lt' if descending else 'gt'
+            branch = Q(**{f'{name}__{lookup}': values[i]})
+            for prev_name, prev_value in zip(self.fields[:i], values[:i]):
+                branch &= Q(**{prev_name: prev_value})
+            condition |= branch
+        return condition
+
+    # ===== PAGINAÇÃO =====
+
+    def paginate_queryset(self, queryset, request, view=None):
+        ordering = self.get_ordering(request, queryset, view)
+        self.fields = [field.lstrip('-') for field in ordering]
+        self.descending = [field.startswith('-') for field in ordering]
+        self.request = request
+        self.page_size_value = self.get_page_size(request)
+
+        queryset = queryset.order_by(*ordering)
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            queryset = queryset.filter(self.seek_filter(self.decode_cursor(queryset, cursor)))
+
+        # Uma linha a mais só para saber se existe próxima página
+        results = list(queryset[:self.page_size_value + 1])
+        self.has_next = len(results) > self.page_size_value
+        self.page = results[:self.page_size_value]
+        return self.page
+
+    def get_cursor_link(self, values):
+        """URL da página depois da posição `values` (valores de self.fields)"""
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(values))
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+
+        last = self.page[-1]
+        return self.get_cursor_link([getattr(last, name) for name in self.fields])
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {
+                    'type': 'string',
+                    'nullable': True,
+                    'format': 'uri',
+                },
+                'results': schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Cursor da próxima página (link `next`).',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.page_size_query_param,
+                'required': False,
+                'in': 'query',
+                'description': f'Itens por página (máximo {self.max_page_size}).',
+                'schema': {'type': 'integer'},
+            },
+        ]
+
+
+class OptInKeysetPagination(PageNumberPagination):
+    """
+    Paginação padrão da API.
+
+    Por padrão, por página (?page=, com count). Com ?paginate=cursor (ou um
+    ?cursor= vindo do link `next`), usa KeysetPagination: sem COUNT e sem
+    OFFSET, custo constante em qualquer profundidade.
+
+    Uso:
+        GET /api/processes/?paginate=cursor&ordering=-created_at
+        GET <next>
+    """
+    mode_query_param = 'paginate'
+    keyset_class = KeysetPagination
+
+    def use_keyset(self, request):
+        return (
+            request.query_params.get(self.mode_query_param) == 'cursor'
+            or self.keyset_class.cursor_query_param in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if self.use_keyset(request):
+            self.keyset = self.keyset_class()
+            self.keyset.page_size = self.page_size
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            *super().get_schema_operation_parameters(view),
+            {
+                'name': self.mode_query_param,
+                'required': False,
+                'in': 'query',
+                'description': '`cursor`: paginação por cursor (sem count, resposta só com next/results).',
+                'schema': {'type': 'string', 'enum': ['cursor']},
+            },
+            *self.keyset_class().get_schema_operation_parameters(view),
+        ]
@@ -2,7 +2,8 @@ from .auth import (
     UserSerializer,
     MembershipSerializer,
     LoginSerializer,
-    LoginResponseSerializer
+    LoginResponseSerializer,
+    TenantTokenRefreshSerializer
 )
 
 from .customers import (
@@ -14,6 +15,7 @@ from .customers import (
 from .processes import (
     ProcessSerializer,
     ProcessListSerializer,
+    CustomerProcessSerializer,
     ProcessCreateUpdateSerializer,
     ProcessPartySerializer
 )
@@ -36,12 +38,15 @@ from .finance import (
     PaymentSerializer
 )
 
+from .audit import AuditLogSerializer
+
 __all__ = [
     # Auth
     'UserSerializer',
     'MembershipSerializer',
     'LoginSerializer',
     'LoginResponseSerializer',
+    'TenantTokenRefreshSerializer',
     
     # Customers
     'CustomerSerializer',
@@ -51,6 +56,7 @@ __all__ = [
     # Processes
     'ProcessSerializer',
     'ProcessListSerializer',
+    'CustomerProcessSerializer',
     'ProcessCreateUpdateSerializer',
     'ProcessPartySerializer',
     
@@ -68,4 +74,7 @@ __all__ = [
     'FeeAgreementSerializer',
     'FeeAgreementListSerializer',
     'PaymentSerializer',
+    
+    # Audit
+    'AuditLogSerializer',
 ]
\ No newline at end of file
@@ -0,0 +1,66 @@
+from django.contrib.auth import get_user_model
+from django.utils.dateparse import parse_datetime
+from rest_framework import serializers
+from apps.api.serializers.mixins import SparseFieldsetsMixin
+from apps.shared.models import AuditLog
+
+class AuditLogSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
+    """
+    Serializer de AuditLog (somente leitura).
+    """
+    action_display = serializers.CharField(source='get_action_display', read_only=True)
+    model_name = serializers.CharField(read_only=True)
+    ip_address = serializers.CharField(read_only=True)
+    user_email = serializers.CharField(source='user.email', read_only=True, default=None)
+    
+    class Meta:
+        model = AuditLog
+        only_dependencies = {
+            'model_name': ['model_type'],
+            'ip_address': ['client'],
+        }
+        fields = [
+            'id',
+            'timestamp',
+            'user',
+            'user_email',
+            'organization',
+            'office',
+            'action',
+            'action_display',
+            'model_name',
+            'object_id',
+            'object_repr',
+            'changes',
+            'ip_address',
+        ]
+        read_only_fields = fields
+    
+    def archive_representations(self, rows):
+        """
+        Representação de logs arquivados (linhas de audit_archive), com os
+        mesmos campos (e a mesma seleção ?fields=/?omit=) dos logs do banco.
+        """
+        fields = self.fields
+        
+        emails = {}
+        user_ids = {row['user_id'] for row in rows if row['user_id']}
+        if user_ids and 'user_email' in fields:
+            emails = dict(get_user_model().objects.filter(pk__in=user_ids).values_list('id', 'email'))
+        actions = dict(AuditLog.ACTION_CHOICES)
+        
+        results = []
+        for row in rows:
+            values = {
+                **row,
+                'user': row['user_id'],
+                'user_email': emails.get(row['user_id']),
+                'organization': row['organization_id'],
+                'office': row['office_id'],
+                'action_display': actions.get(row['action'], row['action']),
+            }
+            if 'timestamp' in fields:
+                values['timestamp'] = fields['timestamp'].to_representation(parse_datetime(row['timestamp']))
+            results.append({name: values.get(name) for name in fields})
+        
+        return results
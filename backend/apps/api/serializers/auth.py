@@ -1,8 +1,11 @@
 from rest_framework import serializers
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
 from apps.accounts.models import User
 from apps.memberships.models import Membership
+from apps.api.serializers.mixins import SparseFieldsetsMixin
+from apps.api.tokens import TenantRefreshToken
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     """
     Serializer básico de usuário.
     """
@@ -26,7 +29,7 @@ class UserSerializer(serializers.ModelSerializer):
         return obj.get_full_name() or obj.email
 
 
-class MembershipSerializer(serializers.ModelSerializer):
+class MembershipSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     """
     Serializer de membership (com organização e office).
     """
@@ -63,4 +66,12 @@ class LoginResponseSerializer(serializers.Serializer):
     access = serializers.CharField()
     refresh = serializers.CharField()
     user = UserSerializer()
-    memberships = MembershipSerializer(many=True)
\ No newline at end of file
+    memberships = MembershipSerializer(many=True)
+
+
+class TenantTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Serializer de refresh que recalcula os claims de tenant
+    (organização, escritório, membership e papel) a cada refresh.
+    """
+    token_class = TenantRefreshToken
@@ -1,7 +1,8 @@
 from rest_framework import serializers
+from apps.api.serializers.mixins import SparseFieldsetsMixin, TenantSerializerMixin
 from apps.customers.models import Customer
 
-class CustomerSerializer(serializers.ModelSerializer):
+class CustomerSerializer(TenantSerializerMixin, SparseFieldsetsMixin, serializers.ModelSerializer):
     """
     Serializer completo de Customer.
     """
@@ -11,6 +12,10 @@ class CustomerSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Customer
+        only_dependencies = {
+            'document_formatted': ['type', 'document'],
+            'total_processes': [],
+        }
         fields = [
             'id',
             'organization',
@@ -34,18 +39,9 @@ class CustomerSerializer(serializers.ModelSerializer):
             'updated_at'
         ]
         read_only_fields = ['id', 'created_at', 'updated_at', 'organization', 'office']
-    
-    def create(self, validated_data):
-        """
-        Injeta organization e office do request automaticamente.
-        """
-        request = self.context.get('request')
-        validated_data['organization'] = request.organization
-        validated_data['office'] = request.office
-        return super().create(validated_data)
 
 
-class CustomerListSerializer(serializers.ModelSerializer):
+class CustomerListSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     """
     Serializer resumido para listagem (performance).
     """
@@ -66,7 +62,7 @@ class CustomerListSerializer(serializers.ModelSerializer):
         ]
 
 
-class CustomerCreateUpdateSerializer(serializers.ModelSerializer):
+class CustomerCreateUpdateSerializer(TenantSerializerMixin, SparseFieldsetsMixin, serializers.ModelSerializer):
     """
     Serializer para criação/edição (sem campos read-only).
     """
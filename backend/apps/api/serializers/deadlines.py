@@ -1,7 +1,8 @@
 from rest_framework import serializers
+from apps.api.serializers.mixins import SparseFieldsetsMixin, TenantSerializerMixin
 from apps.deadlines.models import Deadline
 
-class DeadlineSerializer(serializers.ModelSerializer):
+class DeadlineSerializer(TenantSerializerMixin, SparseFieldsetsMixin, serializers.ModelSerializer):
     """
     Serializer completo de Deadline.
     """
@@ -14,6 +15,10 @@ class DeadlineSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Deadline
+        only_dependencies = {
+            'is_overdue': ['due_date', 'status'],
+            'days_remaining': ['due_date', 'status'],
+        }
         fields = [
             'id',
             'organization',
@@ -42,15 +47,9 @@ class DeadlineSerializer(serializers.ModelSerializer):
             'updated_at'
         ]
         read_only_fields = ['id', 'created_at', 'updated_at', 'organization', 'office', 'completed_at']
-    
-    def create(self, validated_data):
-        request = self.context.get('request')
-        validated_data['organization'] = request.organization
-        validated_data['office'] = request.office
-        return super().create(validated_data)
 
 
-class DeadlineListSerializer(serializers.ModelSerializer):
+class DeadlineListSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     """
     Serializer resumido para listagem.
     """
@@ -61,6 +60,10 @@ class DeadlineListSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Deadline
+        only_dependencies = {
+            'is_overdue': ['due_date', 'status'],
+            'days_remaining': ['due_date', 'status'],
+        }
         fields = [
             'id',
             'title',
@@ -76,7 +79,7 @@ class DeadlineListSerializer(serializers.ModelSerializer):
         ]
 
 
-class DeadlineCreateUpdateSerializer(serializers.ModelSerializer):
+class DeadlineCreateUpdateSerializer(TenantSerializerMixin, SparseFieldsetsMixin, serializers.ModelSerializer):
     """
     Serializer para criação/edição.
     """
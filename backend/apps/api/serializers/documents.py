@@ -1,7 +1,8 @@
 from rest_framework import serializers
+from apps.api.serializers.mixins import SparseFieldsetsMixin
 from apps.documents.models import Document
 
-class DocumentSerializer(serializers.ModelSerializer):
+class DocumentSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     """
     Serializer completo de Document.
     """
@@ -14,6 +15,12 @@ class DocumentSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Document
+        only_dependencies = {
+            'file_url': ['file'],
+            'file_extension': ['file'],
+            'file_size_mb': ['file_size'],
+            'file_icon': ['file'],
+        }
         fields = [
             'id',
             'organization',
@@ -55,7 +62,7 @@ class DocumentSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
-class DocumentListSerializer(serializers.ModelSerializer):
+class DocumentListSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     """
     Serializer resumido para listagem.
     """
@@ -65,6 +72,10 @@ class DocumentListSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Document
+        only_dependencies = {
+            'file_extension': ['file'],
+            'file_size_mb': ['file_size'],
+        }
         fields = [
             'id',
             'title',
@@ -77,7 +88,7 @@ class DocumentListSerializer(serializers.ModelSerializer):
         ]
 
 
-class DocumentUploadSerializer(serializers.ModelSerializer):
+class DocumentUploadSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     """
     Serializer para upload de documento.
     """
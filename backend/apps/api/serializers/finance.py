@@ -1,7 +1,8 @@
 from rest_framework import serializers
+from apps.api.serializers.mixins import SparseFieldsetsMixin
 from apps.finance.models import FeeAgreement, Payment
 
-class PaymentSerializer(serializers.ModelSerializer):
+class PaymentSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     """
     Serializer de Payment.
     """
@@ -12,6 +13,10 @@ class PaymentSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Payment
+        only_dependencies = {
+            'is_overdue': ['due_date', 'status'],
+            'days_overdue': ['due_date', 'status'],
+        }
         fields = [
             'id',
             'organization',
@@ -35,7 +40,7 @@ class PaymentSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at', 'organization', 'office']
 
 
-class FeeAgreementSerializer(serializers.ModelSerializer):
+class FeeAgreementSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     """
     Serializer completo de FeeAgreement.
     """
@@ -51,6 +56,11 @@ class FeeAgreementSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = FeeAgreement
+        only_dependencies = {
+            'total_pending': ['amount', 'total_received'],
+            'percentage_received': ['amount', 'total_received'],
+            'is_fully_paid': ['amount', 'total_received'],
+        }
         fields = [
             'id',
             'organization',
@@ -76,6 +86,7 @@ class FeeAgreementSerializer(serializers.ModelSerializer):
             'contract_file',
             'payments',
             'total_received',
+            'received_count',
             'total_pending',
             'percentage_received',
             'is_fully_paid',
@@ -91,7 +102,7 @@ class FeeAgreementSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
-class FeeAgreementListSerializer(serializers.ModelSerializer):
+class FeeAgreementListSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     """
     Serializer resumido para listagem.
     """
@@ -102,6 +113,9 @@ class FeeAgreementListSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = FeeAgreement
+        only_dependencies = {
+            'percentage_received': ['amount', 'total_received'],
+        }
         fields = [
             'id',
             'customer_name',
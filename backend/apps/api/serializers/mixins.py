@@ -0,0 +1,156 @@
+import re
+
+from django.core.exceptions import FieldDoesNotExist
+
+DISPLAY_SOURCE = re.compile(r'^get_(\w+)_display$')
+
+
+def parse_field_list(value):
+    """'a, b,,c' -> ['a', 'b', 'c']"""
+    if not value:
+        return []
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+
+class SparseFieldsetsMixin:
+    """
+    Sparse fieldsets: ?fields=id,name devolve só esses campos; ?omit=notes
+    remove campos. Só em leituras (GET/HEAD) e só no serializer raiz (o que
+    recebe o request no context); serializers aninhados ficam inteiros.
+
+    Campos removidos não são avaliados (properties, nested, method fields
+    não rodam). SparseFieldsetsFilterBackend usa get_only_fields() para
+    levar a seleção ao banco com .only().
+
+    Campos calculados (properties, SerializerMethodField) declaram as
+    colunas de que dependem em Meta.only_dependencies; sem isso o
+    queryset não é restringido (nada de consulta extra por linha).
+    """
+    fields_query_param = 'fields'
+    omit_query_param = 'omit'
+
+    @classmethod
+    def get_sparse_selection(cls, request):
+        """(campos pedidos ou None, campos omitidos) do request"""
+        if request is None or request.method not in ('GET', 'HEAD'):
+            return None, []
+
+        params = getattr(request, 'query_params', request.GET)
+        fields = parse_field_list(params.get(cls.fields_query_param))
+        omit = parse_field_list(params.get(cls.omit_query_param))
+        return fields or None, omit
+
+    @classmethod
+    def is_field_requested(cls, request, name):
+        """O campo vai estar na resposta? (ex: para pular anotações caras)"""
+        fields, omit = cls.get_sparse_selection(request)
+        return (fields is None or name in fields) and name not in omit
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        fields, omit = self.get_sparse_selection(self._context.get('request'))
+        if fields is None and not omit:
+            return
+
+        for name in list(self.fields):
+            if (fields is not None and name not in fields) or name in omit:
+                self.fields.pop(name)
+
+    @classmethod
+    def get_only_fields(cls, request, model):
+        """
+        Nomes para queryset.only(), ou None se não houver seleção ou se
+        algum campo pedido não puder ser mapeado para colunas.
+        """
+        fields, omit = cls.get_sparse_selection(request)
+        if fields is None and not omit:
+            return None
+
+        dependencies = getattr(getattr(cls, 'Meta', None), 'only_dependencies', {})
+        names = {model._meta.pk.name}
+
+        for name, field in cls(context={'request': request}).fields.items():
+            if name in dependencies:
+                names.update(dependencies[name])
+                continue
+
+            root = field.source.split('.')[0]
+            match = DISPLAY_SOURCE.match(root)
+            if match:
+                root = match.group(1)
+
+            try:
+                model_field = model._meta.get_field(root)
+            except FieldDoesNotExist:
+                return None
+
+            # Relações reversas/M2M (ex: parties) não ocupam colunas aqui
+            if model_field.many_to_many or model_field.one_to_many:
+                continue
+            if not model_field.concrete:
+                return None
+
+            names.add(model_field.name)
+
+        return names
+
+
+class TenantSerializerMixin:
+    """
+    Injeta organization e office do request: no create() e nos objetos
+    montados sem salvar para a gravação em lote (ver apps.api.bulk).
+
+    Serializers com relações aninhadas (ex: partes do processo) tiram os
+    dados delas em pop_related() e gravam em save_related().
+    """
+
+    def inject_tenant(self, validated_data):
+        request = self.context.get('request')
+        validated_data['organization'] = request.organization
+        validated_data['office'] = request.office
+        return validated_data
+
+    def create(self, validated_data):
+        return super().create(self.inject_tenant(validated_data))
+
+    # ===== LOTE =====
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if self.context.get('bulk'):
+            # Unicidade conferida para o lote inteiro (find_unique_conflicts),
+            # não com uma consulta por item
+            from rest_framework.validators import UniqueValidator
+            for field in fields.values():
+                field.validators = [
+                    validator for validator in field.validators
+                    if not isinstance(validator, UniqueValidator)
+                ]
+        return fields
+
+    def get_validators(self):
+        validators = super().get_validators()
+        if self.context.get('bulk'):
+            from rest_framework.validators import UniqueTogetherValidator
+            validators = [
+                validator for validator in validators
+                if not isinstance(validator, UniqueTogetherValidator)
+            ]
+        return validators
+
+    def pop_related(self, validated_data):
+        """Dados gravados depois do objeto (None: nada a gravar)"""
+        return None
+
+    def build_instance(self, validated_data):
+        """Objeto novo (sem salvar) com o tenant do request"""
+        return self.Meta.model(**self.inject_tenant(validated_data))
+
+    def apply_update(self, instance, validated_data):
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        return instance
+
+    def save_related(self, pairs, batch_size):
+        """Grava o que pop_related() tirou; pairs: [(objeto salvo, dados), ...]"""
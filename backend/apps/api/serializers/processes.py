@@ -1,8 +1,9 @@
 from rest_framework import serializers
+from apps.api.serializers.mixins import SparseFieldsetsMixin, TenantSerializerMixin
 from apps.processes.models import Process, ProcessParty
 from apps.api.serializers.customers import CustomerListSerializer
 
-class ProcessPartySerializer(serializers.ModelSerializer):
+class ProcessPartySerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     """
     Serializer para partes do processo.
     """
@@ -23,7 +24,7 @@ class ProcessPartySerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at']
 
 
-class ProcessSerializer(serializers.ModelSerializer):
+class ProcessSerializer(TenantSerializerMixin, SparseFieldsetsMixin, serializers.ModelSerializer):
     """
     Serializer completo de Process (com partes inline).
     """
@@ -35,6 +36,11 @@ class ProcessSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Process
+        only_dependencies = {
+            # Anotados por with_counts() (sem anotação, só precisam do pk)
+            'parties_count': [],
+            'deadlines_count': [],
+        }
         fields = [
             'id',
             'organization',
@@ -60,15 +66,9 @@ class ProcessSerializer(serializers.ModelSerializer):
             'updated_at'
         ]
         read_only_fields = ['id', 'created_at', 'updated_at', 'organization', 'office']
-    
-    def create(self, validated_data):
-        request = self.context.get('request')
-        validated_data['organization'] = request.organization
-        validated_data['office'] = request.office
-        return super().create(validated_data)
 
 
-class ProcessListSerializer(serializers.ModelSerializer):
+class ProcessListSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     """
     Serializer resumido para listagem.
     """
@@ -78,6 +78,9 @@ class ProcessListSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Process
+        only_dependencies = {
+            'parties_count': [],
+        }
         fields = [
             'id',
             'number',
@@ -93,7 +96,25 @@ class ProcessListSerializer(serializers.ModelSerializer):
         ]
 
 
-class ProcessCreateUpdateSerializer(serializers.ModelSerializer):
+class CustomerProcessSerializer(ProcessListSerializer):
+    """
+    Processo na listagem de um cliente, com os papéis do cliente nele.
+    customer_roles vem preenchido pela view (uma consulta por página).
+    """
+    customer_roles = serializers.ListField(
+        child=serializers.CharField(),
+        read_only=True
+    )
+    
+    class Meta(ProcessListSerializer.Meta):
+        only_dependencies = {
+            **ProcessListSerializer.Meta.only_dependencies,
+            'customer_roles': [],
+        }
+        fields = ProcessListSerializer.Meta.fields + ['customer_roles']
+
+
+class ProcessCreateUpdateSerializer(TenantSerializerMixin, SparseFieldsetsMixin, serializers.ModelSerializer):
     """
     Serializer para criação/edição.
     """
@@ -120,11 +141,7 @@ class ProcessCreateUpdateSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         parties_data = validated_data.pop('parties', [])
         
-        request = self.context.get('request')
-        validated_data['organization'] = request.organization
-        validated_data['office'] = request.office
-        
-        process = Process.objects.create(**validated_data)
+        process = Process.objects.create(**self.inject_tenant(validated_data))
         
         # Criar partes
         for party_data in parties_data:
@@ -148,4 +165,26 @@ class ProcessCreateUpdateSerializer(serializers.ModelSerializer):
             for party_data in parties_data:
                 ProcessParty.objects.create(process=instance, **party_data)
         
-        return instance
\ No newline at end of file
+        return instance
+    
+    def pop_related(self, validated_data):
+        return validated_data.pop('parties', None)
+    
+    def save_related(self, pairs, batch_size):
+        """
+        Partes do lote: substitui as dos processos que trouxeram 'parties'
+        e cria todas num bulk_create.
+        """
+        from apps.api.bulk import record_saved
+        
+        pairs = [(process, parties) for process, parties in pairs if parties is not None]
+        if not pairs:
+            return
+        
+        ProcessParty.objects.filter(process__in=[process for process, _ in pairs]).delete()
+        
+        parties = ProcessParty.objects.bulk_create(
+            [ProcessParty(process=process, **data) for process, items in pairs for data in items],
+            batch_size=batch_size
+        )
+        record_saved(ProcessParty, parties, created=True)
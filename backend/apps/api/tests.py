@@ -1,3 +1,1417 @@
 from django.test import TestCase
+from rest_framework.test import APIClient, APIRequestFactory
 
-# Create your tests here.
+from apps.accounts.models import User
+from apps.organizations.models import Organization
+from apps.offices.models import Office
+from apps.memberships.models import Membership
+from apps.customers.models import Customer
+from apps.shared.membership_cache import membership_cache
+from apps.shared.tenant import TenantContext
+
+
+class TenantClaimsTest(TestCase):
+    """
+    Testa os claims de tenant nos tokens JWT.
+    """
+    
+    def setUp(self):
+        membership_cache.clear()
+        
+        self.org = Organization.objects.create(
+            name='JWT Org',
+            document='44444444444444'
+        )
+        
+        self.office = Office.objects.create(
+            organization=self.org,
+            name='JWT Office'
+        )
+        
+        self.user = User.objects.create_user(
+            username='jwt',
+            email='jwt@test.com',
+            password='test123'
+        )
+        
+        self.membership = Membership.objects.create(
+            user=self.user,
+            organization=self.org,
+            office=self.office,
+            role='lawyer'
+        )
+        
+        self.customer = Customer.objects.create(
+            organization=self.org,
+            office=self.office,
+            name='Cliente JWT',
+            document='11111111111',
+            type='PF'
+        )
+        
+        self.client = APIClient()
+        self.factory = APIRequestFactory()
+    
+    def login(self):
+        response = self.client.post(
+            '/api/auth/login/',
+            {'email': 'jwt@test.com', 'password': 'test123'},
+            format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.data
+    
+    def test_login_token_has_tenant_claims(self):
+        """Access token traz organização, escritório, membership e papel"""
+        from rest_framework_simplejwt.tokens import AccessToken
+        
+        token = AccessToken(self.login()['access'])
+        
+        self.assertEqual(token['org_id'], self.org.pk)
+        self.assertEqual(token['office_id'], self.office.pk)
+        self.assertEqual(token['membership_id'], self.membership.pk)
+        self.assertEqual(token['role'], 'lawyer')
+        self.assertEqual(token['membership_version'], self.membership.version)
+    
+    def test_api_list_scoped_by_token(self):
+        """Listagem via JWT retorna os dados do tenant do token"""
+        access = self.login()['access']
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+        
+        response = self.client.get('/api/customers/')
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 1)
+    
+    def test_resolution_without_queries(self):
+        """Com claims atuais e cache aquecido, não há consulta de tenant"""
+        access = self.login()['access']
+        
+        request = self.factory.get('/', HTTP_AUTHORIZATION=f'Bearer {access}')
+        TenantContext(request).role
+        
+        with self.assertNumQueries(0):
+            tenant = TenantContext(request)
+            self.assertEqual(tenant.organization_id, self.org.pk)
+            self.assertEqual(tenant.office_id, self.office.pk)
+            self.assertEqual(tenant.role, 'lawyer')
+    
+    def test_role_change_applies(self):
+        """Mudança de papel invalida os claims e vale no próximo refresh"""
+        from rest_framework_simplejwt.tokens import AccessToken
+        
+        tokens = self.login()
+        
+        self.membership.role = 'intern'
+        self.membership.save()
+        
+        # Claims antigos deixam de valer: papel vem do membership atual
+        request = self.factory.get('/', HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+        self.assertEqual(TenantContext(request).role, 'intern')
+        
+        response = self.client.post('/api/auth/refresh/', {'refresh': tokens['refresh']}, format='json')
+        self.assertEqual(response.status_code, 200)
+        
+        token = AccessToken(response.data['access'])
+        self.assertEqual(token['role'], 'intern')
+        self.assertEqual(token['membership_version'], self.membership.version)
+    
+    def test_revoked_membership(self):
+        """Membership desativado não resolve tenant, mesmo com token antigo"""
+        access = self.login()['access']
+        
+        self.membership.is_active = False
+        self.membership.save()
+        
+        request = self.factory.get('/', HTTP_AUTHORIZATION=f'Bearer {access}')
+        self.assertIsNone(TenantContext(request).organization)
+
+
+class ConfidentialityFilterTest(TestCase):
+    """
+    Testa o filtro de confidencialidade nas listagens.
+    """
+    
+    def setUp(self):
+        from apps.processes.models import Process
+        
+        membership_cache.clear()
+        
+        self.org = Organization.objects.create(
+            name='Conf Org',
+            document='55555555555555'
+        )
+        
+        self.office = Office.objects.create(
+            organization=self.org,
+            name='Conf Office'
+        )
+        
+        for username, role in [('lawyer', 'lawyer'), ('intern', 'intern')]:
+            user = User.objects.create_user(
+                username=username,
+                email=f'{username}@conf.com',
+                password='test123'
+            )
+            Membership.objects.create(
+                user=user,
+                organization=self.org,
+                office=self.office,
+                role=role
+            )
+        
+        self.public = Process.objects.create(
+            organization=self.org,
+            office=self.office,
+            number='0000001-00.2024.8.26.0001',
+            subject='Público',
+            court='TJSP'
+        )
+        
+        self.confidential = Process.objects.create(
+            organization=self.org,
+            office=self.office,
+            number='0000002-00.2024.8.26.0001',
+            subject='Sigiloso',
+            court='TJSP',
+            is_confidential=True
+        )
+        
+        self.client = APIClient()
+    
+    def authenticate(self, username):
+        response = self.client.post(
+            '/api/auth/login/',
+            {'email': f'{username}@conf.com', 'password': 'test123'},
+            format='json'
+        )
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+    
+    def test_lawyer_sees_confidential(self):
+        """Advogado vê processos confidenciais"""
+        self.authenticate('lawyer')
+        
+        response = self.client.get('/api/processes/')
+        self.assertEqual(response.data['count'], 2)
+    
+    def test_intern_list_excludes_confidential(self):
+        """Estagiário não vê confidenciais na listagem, busca ou detalhe"""
+        self.authenticate('intern')
+        
+        response = self.client.get('/api/processes/')
+        self.assertEqual(response.data['count'], 1)
+        self.assertEqual(response.data['results'][0]['id'], self.public.pk)
+        
+        response = self.client.get('/api/processes/', {'search': 'Sigiloso'})
+        self.assertEqual(response.data['count'], 0)
+        
+        response = self.client.get(f'/api/processes/{self.confidential.pk}/')
+        self.assertEqual(response.status_code, 404)
+
+
+class AuditLogApiTest(TestCase):
+    """
+    Testa a API de auditoria (escopo do tenant e paginação por keyset).
+    """
+    
+    def setUp(self):
+        from datetime import timedelta
+        from django.utils import timezone
+        from apps.shared.audit_intern import clear_interned
+        from apps.shared.models import AuditLog
+        
+        membership_cache.clear()
+        clear_interned()
+        
+        self.org = Organization.objects.create(name='Audit API Org', document='12121212121212')
+        self.other_org = Organization.objects.create(name='Outra Org', document='13131313131313')
+        self.office = Office.objects.create(organization=self.org, name='Audit API Office')
+        
+        for username, role in [('admin', 'org_admin'), ('lawyer', 'lawyer')]:
+            user = User.objects.create_user(
+                username=f'audit_{username}',
+                email=f'{username}@audit.com',
+                password='test123'
+            )
+            Membership.objects.create(
+                user=user,
+                organization=self.org,
+                office=self.office,
+                role=role
+            )
+        
+        now = timezone.now()
+        for i in range(7):
+            AuditLog.objects.create(
+                organization=self.org,
+                office=self.office,
+                action='update',
+                model_name='Process' if i % 2 else 'Customer',
+                object_id=i,
+                timestamp=now - timedelta(minutes=i // 2)  # timestamps repetidos
+            )
+        AuditLog.objects.create(organization=self.other_org, action='create', model_name='Process')
+        
+        self.client = APIClient()
+    
+    def authenticate(self, username):
+        response = self.client.post(
+            '/api/auth/login/',
+            {'email': f'{username}@audit.com', 'password': 'test123'},
+            format='json'
+        )
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+    
+    def test_keyset_pages_cover_everything_once(self):
+        """Páginas seguem (timestamp, id) sem repetir nem pular, e sem COUNT"""
+        self.authenticate('admin')
+        
+        seen = []
+        url = '/api/audit-logs/?page_size=3'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn('count', response.data)
+            seen += [item['id'] for item in response.data['results']]
+            url = response.data['next']
+        
+        self.assertEqual(len(seen), 7)
+        self.assertEqual(len(set(seen)), 7)
+    
+    def test_filters(self):
+        """Filtro por model e objeto"""
+        self.authenticate('admin')
+        
+        response = self.client.get('/api/audit-logs/', {'model': 'Process'})
+        self.assertEqual(len(response.data['results']), 3)
+        
+        response = self.client.get('/api/audit-logs/', {'model': 'Customer', 'object_id': 2})
+        self.assertEqual([item['object_id'] for item in response.data['results']], [2])
+        
+        response = self.client.get('/api/audit-logs/', {'model': 'Inexistente'})
+        self.assertEqual(response.data['results'], [])
+    
+    def test_include_archived_continues_into_archives(self):
+        """?include_archived=true: depois do banco, os logs arquivados, sem repetir"""
+        import shutil
+        import tempfile
+        from datetime import timedelta
+        from django.test import override_settings
+        from django.utils import timezone
+        from apps.shared.audit_archive import archive_older_than
+        from apps.shared.models import AuditLog
+        
+        archive_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, archive_dir, True)
+        
+        now = timezone.now()
+        for days in (100, 130, 160):
+            AuditLog.objects.create(
+                organization=self.org,
+                office=self.office,
+                action='delete',
+                model_name='Process',
+                object_repr=f'Antigo {days}',
+                timestamp=now - timedelta(days=days)
+            )
+        AuditLog.objects.create(organization=self.other_org, action='delete', model_name='Process',
+                                timestamp=now - timedelta(days=100))
+        archive_older_than(2, archive_dir=archive_dir)
+        self.assertEqual(AuditLog.objects.filter(organization=self.org).count(), 7)
+        
+        self.authenticate('admin')
+        with override_settings(AUDIT_LOG_ARCHIVE={'DIR': archive_dir}):
+            response = self.client.get('/api/audit-logs/')
+            self.assertEqual(len(response.data['results']), 7)
+            
+            seen = []
+            url = '/api/audit-logs/?include_archived=true&page_size=4'
+            while url:
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                seen += response.data['results']
+                url = response.data['next']
+            
+            response = self.client.get('/api/audit-logs/', {'include_archived': 'true', 'action': 'delete'})
+            self.assertEqual(
+                [item['object_repr'] for item in response.data['results']],
+                ['Antigo 100', 'Antigo 130', 'Antigo 160']
+            )
+        
+        self.assertEqual(len(seen), 10)
+        self.assertEqual(len({item['id'] for item in seen}), 10)
+        self.assertEqual([item['object_repr'] for item in seen[-3:]], ['Antigo 100', 'Antigo 130', 'Antigo 160'])
+        self.assertEqual(seen[-1]['action_display'], 'Deletar')
+        timestamps = [item['timestamp'] for item in seen]
+        self.assertEqual(timestamps, sorted(timestamps, reverse=True))
+    
+    def test_requires_admin(self):
+        """Advogado não acessa os logs"""
+        self.authenticate('lawyer')
+        
+        response = self.client.get('/api/audit-logs/')
+        self.assertEqual(response.status_code, 403)
+    
+    def test_export_streams_ndjson_and_gzip_csv(self):
+        """Export em streaming: NDJSON e CSV compactado"""
+        import gzip
+        import json
+        
+        self.authenticate('admin')
+        
+        response = self.client.get('/api/audit-logs/export/', {'model': 'Process'})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        rows = [json.loads(line) for line in lines]
+        self.assertEqual(len(rows), 3)
+        self.assertEqual({row['model_name'] for row in rows}, {'Process'})
+        
+        response = self.client.get('/api/audit-logs/export/', {'output': 'csv', 'compress': 'gzip'})
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        
+        content = gzip.decompress(b''.join(response.streaming_content)).decode()
+        self.assertEqual(len(content.strip().splitlines()), 8)  # cabeçalho + 7 logs da org
+
+
+class ResponseCacheTest(TestCase):
+    """
+    Testa o cache das listagens (versão por tenant e model).
+    """
+    
+    def setUp(self):
+        from apps.processes.models import Process
+        from apps.shared.response_cache import response_cache
+        
+        membership_cache.clear()
+        response_cache.cache.clear()
+        # Testes rodam num processo só: locmem serve
+        self.addCleanup(setattr, response_cache, 'allow_local', response_cache.allow_local)
+        response_cache.allow_local = True
+        
+        self.org = Organization.objects.create(name='Cache Org', document='14141414141414')
+        self.office = Office.objects.create(organization=self.org, name='Cache Office')
+        
+        for username, role in [('lawyer', 'lawyer'), ('intern', 'intern')]:
+            user = User.objects.create_user(
+                username=f'cache_{username}',
+                email=f'{username}@cache.com',
+                password='test123'
+            )
+            Membership.objects.create(
+                user=user,
+                organization=self.org,
+                office=self.office,
+                role=role
+            )
+        
+        self.customer = Customer.objects.create(
+            organization=self.org,
+            office=self.office,
+            name='Cliente Cache',
+            document='12345678901'
+        )
+        
+        Process.objects.create(
+            organization=self.org,
+            office=self.office,
+            number='0000003-00.2024.8.26.0001',
+            subject='Sigiloso',
+            court='TJSP',
+            is_confidential=True
+        )
+        
+        self.client = APIClient()
+    
+    def authenticate(self, username):
+        response = self.client.post(
+            '/api/auth/login/',
+            {'email': f'{username}@cache.com', 'password': 'test123'},
+            format='json'
+        )
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+    
+    def test_hit_until_model_changes(self):
+        """Segunda leitura vem do cache; salvar um cliente invalida"""
+        self.authenticate('lawyer')
+        
+        response = self.client.get('/api/customers/', {'is_active': 'true', 'search': 'Cliente'})
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['count'], 1)
+        
+        # Mesmos params em outra ordem: mesma chave
+        response = self.client.get('/api/customers/?search=Cliente&is_active=true')
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertEqual(response.data['count'], 1)
+        
+        Customer.objects.create(
+            organization=self.org,
+            office=self.office,
+            name='Cliente Novo',
+            document='12345678902'
+        )
+        
+        response = self.client.get('/api/customers/', {'is_active': 'true', 'search': 'Cliente'})
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['count'], 2)
+    
+    def test_bulk_update_and_delete_invalidate(self):
+        """audited_update e delete também incrementam a versão"""
+        self.authenticate('lawyer')
+        
+        self.client.get('/api/customers/')
+        Customer.objects.filter(pk=self.customer.pk).audited_update(name='Renomeado')
+        
+        response = self.client.get('/api/customers/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['results'][0]['name'], 'Renomeado')
+        
+        self.customer.delete()
+        response = self.client.get('/api/customers/')
+        self.assertEqual(response.data['count'], 0)
+    
+    def test_finance_admin_actions_invalidate(self):
+        """Actions em massa do admin de contratos/pagamentos invalidam as listagens"""
+        from datetime import date
+        from django.test import Client
+        from apps.finance.models import FeeAgreement, Payment
+        
+        agreement = FeeAgreement.objects.create(
+            organization=self.org,
+            office=self.office,
+            customer=self.customer,
+            title='Contrato Cache',
+            amount=1000,
+            start_date=date(2024, 1, 1),
+            status='active'
+        )
+        payment = Payment.objects.create(
+            organization=self.org,
+            office=self.office,
+            fee_agreement=agreement,
+            description='Parcela',
+            amount=300,
+            due_date=date(2024, 2, 1),
+            status='received'
+        )
+        
+        self.authenticate('lawyer')
+        self.client.get('/api/fee-agreements/')
+        self.client.get('/api/payments/')
+        self.assertEqual(self.client.get('/api/payments/')['X-Cache'], 'HIT')
+        
+        admin = User.objects.create_superuser(username='cache_admin', email='admin@cache.com', password='test123')
+        admin_client = Client()
+        admin_client.force_login(admin)
+        admin_client.post('/admin/finance/feeagreement/', {
+            'action': 'suspend_agreements',
+            '_selected_action': [agreement.pk],
+        })
+        response = self.client.get('/api/fee-agreements/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['results'][0]['status'], 'suspended')
+        
+        admin_client.post('/admin/finance/payment/', {
+            'action': 'mark_as_pending',
+            '_selected_action': [payment.pk],
+        })
+        response = self.client.get('/api/payments/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['results'][0]['status'], 'pending')
+    
+    def test_disabled_on_local_backend(self):
+        """Sem backend compartilhado (locmem) e sem ALLOW_LOCAL, nada é cacheado"""
+        from apps.shared.response_cache import response_cache
+        
+        response_cache.allow_local = False
+        self.assertFalse(response_cache.is_shared())
+        self.assertFalse(response_cache.active)
+        
+        self.authenticate('lawyer')
+        self.client.get('/api/customers/')
+        response = self.client.get('/api/customers/')
+        self.assertNotIn('X-Cache', response)
+        self.assertEqual(response.data['count'], 1)
+    
+    def test_role_is_part_of_key(self):
+        """Papéis diferentes não compartilham respostas (confidencialidade)"""
+        self.authenticate('lawyer')
+        response = self.client.get('/api/processes/')
+        self.assertEqual(response.data['count'], 1)
+        
+        self.authenticate('intern')
+        response = self.client.get('/api/processes/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['count'], 0)
+
+
+class CursorPaginationTest(TestCase):
+    """
+    Testa a paginação por cursor opcional nas listagens.
+    """
+    
+    def setUp(self):
+        from apps.shared.response_cache import response_cache
+        
+        membership_cache.clear()
+        response_cache.cache.clear()
+        
+        self.org = Organization.objects.create(name='Cursor Org', document='15151515151515')
+        self.office = Office.objects.create(organization=self.org, name='Cursor Office')
+        
+        user = User.objects.create_user(
+            username='cursor_lawyer',
+            email='lawyer@cursor.com',
+            password='test123'
+        )
+        Membership.objects.create(
+            user=user,
+            organization=self.org,
+            office=self.office,
+            role='lawyer'
+        )
+        
+        for i, name in enumerate(['Carla', 'Ana', 'Bruno', 'Eva', 'Davi', 'Gil', 'Fábio']):
+            Customer.objects.create(
+                organization=self.org,
+                office=self.office,
+                name=name,
+                document=f'1234567890{i}'
+            )
+        
+        self.client = APIClient()
+        response = self.client.post(
+            '/api/auth/login/',
+            {'email': 'lawyer@cursor.com', 'password': 'test123'},
+            format='json'
+        )
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+    
+    def walk(self, url):
+        names = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn('count', response.data)
+            names += [item['name'] for item in response.data['results']]
+            url = response.data['next']
+        return names
+    
+    def test_page_number_is_default(self):
+        """Sem opt-in a resposta continua com count"""
+        response = self.client.get('/api/customers/')
+        self.assertEqual(response.data['count'], 7)
+    
+    def test_cursor_honours_indexed_ordering(self):
+        """?ordering= em campo indexado vira a chave do cursor"""
+        names = self.walk('/api/customers/?paginate=cursor&page_size=3&ordering=name')
+        self.assertEqual(names, sorted(names))
+        self.assertEqual(len(names), 7)
+        
+        names = self.walk('/api/customers/?paginate=cursor&page_size=2&ordering=-name')
+        self.assertEqual(names, sorted(names, reverse=True))
+    
+    def test_cursor_rejects_unindexed_ordering(self):
+        """?ordering= que não serve de chave: 400 (sem ordering, vale o da view)"""
+        from types import SimpleNamespace
+        from rest_framework.exceptions import ValidationError
+        from rest_framework.request import Request
+        from apps.api.pagination import KeysetPagination
+        
+        view = SimpleNamespace(ordering_fields=['name', 'email'], ordering=['-created_at'])
+        request = Request(APIRequestFactory().get('/api/customers/', {'ordering': 'email'}))
+        with self.assertRaises(ValidationError):
+            KeysetPagination().get_ordering(request, Customer.objects.all(), view)
+        
+        request = Request(APIRequestFactory().get('/api/customers/'))
+        ordering = KeysetPagination().get_ordering(request, Customer.objects.all(), view)
+        self.assertEqual(ordering, ('-created_at', '-id'))
+        
+        response = self.client.get('/api/customers/?paginate=cursor&ordering=phone')
+        self.assertEqual(response.status_code, 400)
+    
+    def test_process_deadlines_cursor_by_due_date(self):
+        """Prazos do processo: cursor pelo vencimento, não pelo id"""
+        from datetime import date
+        from django.contrib.contenttypes.models import ContentType
+        from apps.deadlines.models import Deadline
+        from apps.processes.models import Process
+        
+        process = Process.objects.create(
+            organization=self.org,
+            office=self.office,
+            number='0000500-00.2024.8.26.0022',
+            subject='Processo com prazos',
+            court='TJSP'
+        )
+        ct = ContentType.objects.get_for_model(Process)
+        for day in (20, 5, 12, 5, 30):
+            Deadline.objects.create(
+                organization=self.org,
+                office=self.office,
+                title=f'Prazo {day}',
+                type='legal',
+                due_date=date(2031, 1, day),
+                content_type=ct,
+                object_id=process.pk
+            )
+        
+        url = f'/api/processes/{process.pk}/deadlines/?paginate=cursor&page_size=2'
+        dates = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            dates += [item['due_date'] for item in response.data['results']]
+            url = response.data['next']
+        
+        self.assertEqual(dates, sorted(dates))
+        self.assertEqual(len(dates), 5)
+        
+        response = self.client.get(f'/api/processes/{process.pk}/deadlines/?paginate=cursor&ordering=title')
+        self.assertEqual(response.status_code, 400)
+    
+    def test_cursor_by_updated_at(self):
+        """updated_at (índice da sonda do GET condicional) também serve de cursor"""
+        names = self.walk('/api/customers/?paginate=cursor&page_size=3&ordering=updated_at')
+        expected = list(Customer.objects.order_by('updated_at', 'id').values_list('name', flat=True))
+        self.assertEqual(names, expected)
+
+
+class ProcessCountsTest(TestCase):
+    """
+    Testa as contagens anotadas na listagem/detalhe de processos.
+    """
+    
+    def setUp(self):
+        from apps.processes.models import Process, ProcessParty
+        from apps.shared.response_cache import response_cache
+        
+        membership_cache.clear()
+        self.addCleanup(setattr, response_cache, 'enabled', response_cache.enabled)
+        response_cache.enabled = False
+        
+        self.org = Organization.objects.create(name='Counts Org', document='16161616161616')
+        self.office = Office.objects.create(organization=self.org, name='Counts Office')
+        
+        user = User.objects.create_user(
+            username='counts_lawyer',
+            email='lawyer@counts.com',
+            password='test123'
+        )
+        Membership.objects.create(
+            user=user,
+            organization=self.org,
+            office=self.office,
+            role='lawyer'
+        )
+        
+        customers = [
+            Customer.objects.create(
+                organization=self.org,
+                office=self.office,
+                name=f'Parte {i}',
+                document=f'9876543210{i}'
+            )
+            for i in range(2)
+        ]
+        
+        self.processes = []
+        for i in range(6):
+            process = Process.objects.create(
+                organization=self.org,
+                office=self.office,
+                number=f'000010{i}-00.2024.8.26.0016',
+                subject=f'Processo {i}',
+                court='TJSP',
+                area='civil' if i < 2 else 'labor'
+            )
+            for customer, role in zip(customers, ['plaintiff', 'defendant']):
+                ProcessParty.objects.create(process=process, customer=customer, role=role)
+            self.processes.append(process)
+        
+        self.client = APIClient()
+        response = self.client.post(
+            '/api/auth/login/',
+            {'email': 'lawyer@counts.com', 'password': 'test123'},
+            format='json'
+        )
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+    
+    def count_queries(self, url):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response, len(context.captured_queries)
+    
+    def test_list_queries_do_not_grow_with_page(self):
+        """Página com 2 ou 4 processos: mesma quantidade de consultas"""
+        self.client.get('/api/processes/')  # Aquece caches (ContentType, membership)
+        
+        small, small_queries = self.count_queries('/api/processes/?area=civil')
+        large, large_queries = self.count_queries('/api/processes/?area=labor')
+        
+        self.assertEqual(small.data['count'], 2)
+        self.assertEqual(large.data['count'], 4)
+        self.assertEqual(small_queries, large_queries)
+        self.assertEqual({item['parties_count'] for item in large.data['results']}, {2})
+    
+    def test_detail_counts(self):
+        """Detalhe traz as contagens anotadas e as partes"""
+        response, _ = self.count_queries(f'/api/processes/{self.processes[0].pk}/')
+        self.assertEqual(response.data['parties_count'], 2)
+        self.assertEqual(response.data['deadlines_count'], 0)
+        self.assertEqual(len(response.data['parties']), 2)
+
+
+class CustomerProcessesTest(TestCase):
+    """
+    Testa a listagem de processos de um cliente.
+    """
+    
+    def setUp(self):
+        from apps.processes.models import Process, ProcessParty
+        
+        membership_cache.clear()
+        
+        self.org = Organization.objects.create(name='Parties Org', document='18181818181818')
+        self.office = Office.objects.create(organization=self.org, name='Parties Office')
+        
+        user = User.objects.create_user(
+            username='parties_lawyer',
+            email='lawyer@parties.com',
+            password='test123'
+        )
+        Membership.objects.create(
+            user=user,
+            organization=self.org,
+            office=self.office,
+            role='lawyer'
+        )
+        
+        self.customer = Customer.objects.create(
+            organization=self.org,
+            office=self.office,
+            name='Empresa',
+            document='12345678000199'
+        )
+        self.other = Customer.objects.create(
+            organization=self.org,
+            office=self.office,
+            name='Outra Parte',
+            document='12345678000100'
+        )
+        
+        for i in range(4):
+            process = Process.objects.create(
+                organization=self.org,
+                office=self.office,
+                number=f'000020{i}-00.2024.8.26.0018',
+                subject=f'Processo {i}',
+                court='TJSP'
+            )
+            ProcessParty.objects.create(process=process, customer=self.customer, role='plaintiff')
+            ProcessParty.objects.create(process=process, customer=self.other, role='defendant')
+            if i == 0:
+                # Mesmo cliente com dois papéis no mesmo processo
+                ProcessParty.objects.create(process=process, customer=self.customer, role='third_party')
+                self.double_role = process
+        
+        self.client = APIClient()
+        response = self.client.post(
+            '/api/auth/login/',
+            {'email': 'lawyer@parties.com', 'password': 'test123'},
+            format='json'
+        )
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+    
+    def test_distinct_with_roles_and_counts(self):
+        """Um item por processo, com os papéis agregados e a contagem de partes"""
+        response = self.client.get(f'/api/customers/{self.customer.pk}/processes/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 4)
+        
+        items = {item['id']: item for item in response.data['results']}
+        self.assertEqual(items[self.double_role.pk]['customer_roles'], ['plaintiff', 'third_party'])
+        self.assertEqual(items[self.double_role.pk]['parties_count'], 3)
+    
+    def test_constant_queries_with_cursor(self):
+        """Consultas não crescem com o tamanho da página"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        
+        url = f'/api/customers/{self.customer.pk}/processes/?paginate=cursor&page_size='
+        self.client.get(url + '1')  # Aquece caches
+        
+        counts = []
+        for size in ('1', '4'):
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(url + size)
+            self.assertEqual(len(response.data['results']), int(size))
+            counts.append(len(context.captured_queries))
+        
+        self.assertEqual(counts[0], counts[1])
+    
+    def test_dependents_of_deleted_parents_hidden(self):
+        """Contratos, pagamentos, partes e prazos de pais na lixeira somem das listagens"""
+        from datetime import date
+        from django.contrib.contenttypes.models import ContentType
+        from apps.deadlines.models import Deadline
+        from apps.finance.models import FeeAgreement, Payment
+        from apps.processes.models import Process
+        
+        agreement = FeeAgreement.objects.create(
+            organization=self.org,
+            office=self.office,
+            customer=self.other,
+            title='Contrato',
+            amount=1000,
+            start_date=date(2024, 1, 1)
+        )
+        Payment.objects.create(
+            organization=self.org,
+            office=self.office,
+            fee_agreement=agreement,
+            description='Parcela',
+            amount=500,
+            due_date=date(2024, 2, 1)
+        )
+        ct = ContentType.objects.get_for_model(Process)
+        deleted_process = Process.objects.exclude(pk=self.double_role.pk).first()
+        for process in (self.double_role, deleted_process):
+            Deadline.objects.create(
+                organization=self.org,
+                office=self.office,
+                title=f'Prazo {process.number}',
+                type='legal',
+                due_date=date(2031, 1, 1),
+                content_type=ct,
+                object_id=process.pk
+            )
+        
+        Deadline.objects.create(
+            organization=self.org,
+            office=self.office,
+            title='Prazo avulso',
+            type='legal',
+            due_date=date(2031, 1, 2)
+        )
+        
+        self.other.delete()
+        deleted_process.delete()
+        
+        self.assertEqual(self.client.get('/api/fee-agreements/').data['count'], 0)
+        self.assertEqual(self.client.get('/api/payments/').data['count'], 0)
+        
+        response = self.client.get('/api/deadlines/')
+        self.assertEqual(
+            {item['title'] for item in response.data['results']},
+            {'Prazo avulso', f'Prazo {self.double_role.number}'}
+        )
+        
+        response = self.client.get(f'/api/processes/{self.double_role.pk}/parties/')
+        self.assertEqual(len(response.data), 2)
+        self.assertNotIn(self.other.pk, [item['customer'] for item in response.data])
+        
+        response = self.client.get(f'/api/processes/{self.double_role.pk}/')
+        self.assertEqual(response.data['parties_count'], 2)
+        self.assertEqual(len(response.data['parties']), 2)
+
+
+class SparseFieldsetsTest(TestCase):
+    """
+    Testa ?fields= / ?omit= nas listagens e no detalhe.
+    """
+    
+    def setUp(self):
+        from apps.processes.models import Process, ProcessParty
+        from apps.shared.response_cache import response_cache
+        
+        membership_cache.clear()
+        self.addCleanup(setattr, response_cache, 'enabled', response_cache.enabled)
+        response_cache.enabled = False
+        
+        self.org = Organization.objects.create(name='Sparse Org', document='19191919191919')
+        self.office = Office.objects.create(organization=self.org, name='Sparse Office')
+        
+        user = User.objects.create_user(
+            username='sparse_lawyer',
+            email='lawyer@sparse.com',
+            password='test123'
+        )
+        Membership.objects.create(
+            user=user,
+            organization=self.org,
+            office=self.office,
+            role='lawyer'
+        )
+        
+        self.customer = Customer.objects.create(
+            organization=self.org,
+            office=self.office,
+            name='Cliente Enxuto',
+            document='11122233344',
+            email='cliente@sparse.com',
+            notes='Observações longas'
+        )
+        
+        self.process = Process.objects.create(
+            organization=self.org,
+            office=self.office,
+            number='0000300-00.2024.8.26.0019',
+            subject='Processo enxuto',
+            court='TJSP'
+        )
+        ProcessParty.objects.create(process=self.process, customer=self.customer, role='plaintiff')
+        
+        self.client = APIClient()
+        response = self.client.post(
+            '/api/auth/login/',
+            {'email': 'lawyer@sparse.com', 'password': 'test123'},
+            format='json'
+        )
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+    
+    def capture(self, url):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response, [query['sql'] for query in context.captured_queries]
+    
+    def test_fields_selects_only_requested_columns(self):
+        """?fields= devolve só os campos pedidos e não lê as outras colunas"""
+        response, queries = self.capture('/api/customers/?fields=id,name')
+        
+        self.assertEqual(response.data['results'], [{'id': self.customer.pk, 'name': 'Cliente Enxuto'}])
+        
+        select = next(sql for sql in queries if 'FROM "customers_customer"' in sql and 'COUNT(' not in sql)
+        self.assertIn('"customers_customer"."name"', select)
+        self.assertNotIn('"customers_customer"."email"', select)
+        self.assertNotIn('"customers_customer"."notes"', select)
+    
+    def test_omit_skips_computed_fields(self):
+        """?omit= remove o campo e não avalia a propriedade (sem consulta)"""
+        url = f'/api/customers/{self.customer.pk}/'
+        
+        full, full_queries = self.capture(url)
+        self.assertIn('total_processes', full.data)
+        self.assertTrue(any('processes_process' in sql for sql in full_queries))
+        
+        response, queries = self.capture(url + '?omit=total_processes,notes')
+        self.assertNotIn('total_processes', response.data)
+        self.assertNotIn('notes', response.data)
+        self.assertIn('document_formatted', response.data)
+        self.assertFalse(any('processes_process' in sql for sql in queries))
+    
+    def test_process_counts_only_when_requested(self):
+        """Sem parties_count na resposta, a listagem não anota as contagens"""
+        response, queries = self.capture('/api/processes/?fields=id,number&ordering=number')
+        self.assertEqual(response.data['results'], [{'id': self.process.pk, 'number': self.process.number}])
+        self.assertFalse(any('processes_processparty' in sql for sql in queries))
+        
+        response, queries = self.capture('/api/processes/?fields=id,parties_count')
+        self.assertEqual(response.data['results'][0]['parties_count'], 1)
+    
+    def test_writes_ignore_fields(self):
+        """fields= só vale para leitura: PATCH devolve o objeto inteiro"""
+        response = self.client.patch(
+            f'/api/customers/{self.customer.pk}/?fields=id',
+            {'phone': '11999999999'},
+            format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('phone', response.data)
+        self.assertIn('name', response.data)
+
+
+class ConditionalGetTest(TestCase):
+    """
+    Testa ETag / Last-Modified e as respostas 304.
+    """
+    
+    def setUp(self):
+        from apps.processes.models import Process
+        from apps.shared.response_cache import response_cache
+        
+        membership_cache.clear()
+        response_cache.cache.clear()
+        self.addCleanup(setattr, response_cache, 'allow_local', response_cache.allow_local)
+        response_cache.allow_local = True
+        
+        self.org = Organization.objects.create(name='Etag Org', document='20202020202020')
+        self.office = Office.objects.create(organization=self.org, name='Etag Office')
+        
+        user = User.objects.create_user(
+            username='etag_lawyer',
+            email='lawyer@etag.com',
+            password='test123'
+        )
+        Membership.objects.create(
+            user=user,
+            organization=self.org,
+            office=self.office,
+            role='lawyer'
+        )
+        
+        self.customer = Customer.objects.create(
+            organization=self.org,
+            office=self.office,
+            name='Cliente Etag',
+            document='55566677788'
+        )
+        self.process = Process.objects.create(
+            organization=self.org,
+            office=self.office,
+            number='0000400-00.2024.8.26.0020',
+            subject='Processo etag',
+            court='TJSP'
+        )
+        
+        self.client = APIClient()
+        response = self.client.post(
+            '/api/auth/login/',
+            {'email': 'lawyer@etag.com', 'password': 'test123'},
+            format='json'
+        )
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+    
+    def test_list_not_modified_with_single_probe(self):
+        """If-None-Match igual: 304 com uma consulta agregada e nenhuma leitura de linhas"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        
+        response = self.client.get('/api/customers/')
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        self.assertTrue(etag.startswith('"'))
+        self.assertIn('Last-Modified', response)
+        
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get('/api/customers/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        
+        customer_queries = [q['sql'] for q in context.captured_queries if 'customers_customer' in q['sql']]
+        self.assertEqual(len(customer_queries), 1)
+        self.assertIn('MAX(', customer_queries[0])
+        
+        # Outros params, outra resposta
+        response = self.client.get('/api/customers/?fields=id', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+    
+    def test_list_etag_changes_with_data(self):
+        """Alterar, apagar ou mexer em model relacionado muda o ETag"""
+        from apps.processes.models import Process, ProcessParty
+        
+        etag = self.client.get('/api/customers/')['ETag']
+        self.customer.phone = '11988887777'
+        self.customer.save()
+        response = self.client.get('/api/customers/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        
+        etag = self.client.get('/api/processes/')['ETag']
+        ProcessParty.objects.create(process=self.process, customer=self.customer, role='plaintiff')
+        response = self.client.get('/api/processes/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'][0]['parties_count'], 1)
+        
+        # update() em lote (audited_update) também move updated_at
+        etag = response['ETag']
+        Process.objects.filter(pk=self.process.pk).audited_update(phase='archived')
+        response = self.client.get('/api/processes/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+    
+    def test_detail_not_modified_reads_object(self):
+        """Detalhe validado pela versão do tenant: 304 depois do get_object (uma leitura)"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        
+        url = f'/api/customers/{self.customer.pk}/'
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        self.assertIn('Last-Modified', response)
+        
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        customer_queries = [q['sql'] for q in context.captured_queries if 'customers_customer' in q['sql']]
+        self.assertEqual(len(customer_queries), 1)
+        
+        self.customer.name = 'Cliente Renomeado'
+        self.customer.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['name'], 'Cliente Renomeado')
+    
+    def test_detail_etag_does_not_hide_404(self):
+        """ETag antigo de objeto apagado: 404, não 304"""
+        url = f'/api/customers/{self.customer.pk}/'
+        etag = self.client.get(url)['ETag']
+        
+        self.customer.delete()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 404)
+    
+    def test_detail_without_shared_cache_uses_timestamp(self):
+        """Cache local (sem ALLOW_LOCAL): ETag pelo updated_at do objeto, sem versões"""
+        from apps.shared.response_cache import response_cache
+        
+        response_cache.allow_local = False
+        url = f'/api/customers/{self.customer.pk}/'
+        etag = self.client.get(url)['ETag']
+        
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        
+        self.customer.name = 'Outro Nome'
+        self.customer.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        
+        # Processo depende das partes (sem versões locais): sem validador
+        response = self.client.get(f'/api/processes/{self.process.pk}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('ETag', response)
+    
+    def test_admin_bulk_actions_change_etag(self):
+        """Actions em massa do admin (sem save()) também mudam o ETag das listagens"""
+        from datetime import date
+        from django.test import Client
+        from apps.finance.models import FeeAgreement, Payment
+        
+        agreement = FeeAgreement.objects.create(
+            organization=self.org,
+            office=self.office,
+            customer=self.customer,
+            title='Contrato Etag',
+            amount=1000,
+            start_date=date(2024, 1, 1),
+            status='active'
+        )
+        payment = Payment.objects.create(
+            organization=self.org,
+            office=self.office,
+            fee_agreement=agreement,
+            description='Parcela',
+            amount=300,
+            due_date=date(2024, 2, 1),
+            status='received'
+        )
+        
+        agreements_etag = self.client.get('/api/fee-agreements/')['ETag']
+        payments_etag = self.client.get('/api/payments/')['ETag']
+        
+        admin = User.objects.create_superuser(username='etag_admin', email='admin@etag.com', password='test123')
+        admin_client = Client()
+        admin_client.force_login(admin)
+        admin_client.post('/admin/finance/feeagreement/', {
+            'action': 'suspend_agreements',
+            '_selected_action': [agreement.pk],
+        })
+        response = self.client.get('/api/fee-agreements/', HTTP_IF_NONE_MATCH=agreements_etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'][0]['status'], 'suspended')
+        
+        admin_client.post('/admin/finance/payment/', {
+            'action': 'mark_as_pending',
+            '_selected_action': [payment.pk],
+        })
+        response = self.client.get('/api/payments/', HTTP_IF_NONE_MATCH=payments_etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'][0]['status'], 'pending')
+    
+    def test_if_modified_since(self):
+        """If-Modified-Since a partir do Last-Modified da listagem"""
+        response = self.client.get('/api/processes/')
+        response = self.client.get('/api/processes/', HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
+
+
+class BulkApiTest(TestCase):
+    """
+    Testa os endpoints /bulk/ (criação, edição e deleção em lote).
+    """
+    
+    def setUp(self):
+        from apps.shared.audit_intern import clear_interned
+        from apps.shared.audit_writer import audit_writer
+        from apps.shared.response_cache import response_cache
+        
+        membership_cache.clear()
+        clear_interned()
+        response_cache.cache.clear()
+        self.addCleanup(setattr, response_cache, 'allow_local', response_cache.allow_local)
+        response_cache.allow_local = True
+        self.addCleanup(setattr, audit_writer, 'async_mode', audit_writer.async_mode)
+        audit_writer.async_mode = False
+        
+        self.org = Organization.objects.create(name='Bulk Org', document='21212121212121')
+        self.office = Office.objects.create(organization=self.org, name='Bulk Office')
+        
+        user = User.objects.create_user(
+            username='bulk_lawyer',
+            email='lawyer@bulk.com',
+            password='test123'
+        )
+        Membership.objects.create(
+            user=user,
+            organization=self.org,
+            office=self.office,
+            role='lawyer'
+        )
+        
+        self.customer = Customer.objects.create(
+            organization=self.org,
+            office=self.office,
+            name='Cliente Existente',
+            document='11144477735'
+        )
+        
+        self.client = APIClient()
+        response = self.client.post(
+            '/api/auth/login/',
+            {'email': 'lawyer@bulk.com', 'password': 'test123'},
+            format='json'
+        )
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+    
+    def post_bulk(self, url, payload):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(url, payload, format='json')
+    
+    def test_create_with_tenant_and_audit(self):
+        """Cria em lote com o tenant do request e um AuditLog por objeto"""
+        from apps.shared.models import AuditLog
+        
+        items = [
+            {'name': f'Cliente {i}', 'type': 'PF', 'document': f'529.982.247-2{i}'}
+            for i in range(3)
+        ]
+        response = self.post_bulk('/api/customers/bulk/', {'create': items})
+        self.assertEqual(response.status_code, 200, response.data)
+        
+        results = response.data['create']
+        self.assertEqual([result['status'] for result in results], ['created'] * 3)
+        
+        created = Customer.objects.filter(pk__in=[result['id'] for result in results])
+        self.assertEqual(created.count(), 3)
+        for customer in created:
+            self.assertEqual((customer.organization_id, customer.office_id), (self.org.pk, self.office.pk))
+            self.assertTrue(customer.document.isdigit())  # prepare_for_save normalizou
+        
+        logs = AuditLog.objects.filter(organization=self.org, action='create', model_type__name='Customer')
+        self.assertEqual(logs.count(), 3)
+    
+    def test_errors_write_nothing(self):
+        """Um item inválido ou repetido: 400 com resultado por item e nada gravado"""
+        response = self.post_bulk('/api/customers/bulk/', {
+            'create': [
+                {'name': 'Válido', 'type': 'PF', 'document': '39053344705'},
+                {'type': 'PF', 'document': '39053344705'},
+                {'name': 'Duplicado', 'type': 'PF', 'document': '111.444.777-35'},
+            ],
+            'delete': [999999],
+        })
+        self.assertEqual(response.status_code, 400)
+        
+        statuses = [result['status'] for result in response.data['create']]
+        self.assertEqual(statuses, ['valid', 'error', 'error'])
+        self.assertIn('name', response.data['create'][1]['errors'])
+        self.assertEqual(response.data['delete'][0]['status'], 'error')
+        self.assertEqual(Customer.objects.filter(organization=self.org).count(), 1)
+    
+    def test_update_and_delete(self):
+        """Edita só os campos enviados e apaga (soft delete) no mesmo lote"""
+        other = Customer.objects.create(
+            organization=self.org,
+            office=self.office,
+            name='Para Apagar',
+            document='39053344705'
+        )
+        
+        response = self.post_bulk('/api/customers/bulk/', {
+            'update': [{'id': self.customer.pk, 'phone': '11977776666'}],
+            'delete': [other.pk],
+        })
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data['update'][0], {'index': 0, 'status': 'updated', 'id': self.customer.pk})
+        self.assertEqual(response.data['delete'][0]['status'], 'deleted')
+        
+        self.customer.refresh_from_db()
+        self.assertEqual(self.customer.phone, '11977776666')
+        self.assertEqual(self.customer.name, 'Cliente Existente')
+        self.assertFalse(Customer.objects.filter(pk=other.pk).exists())
+        self.assertTrue(Customer.objects.with_deleted().filter(pk=other.pk).exists())
+    
+    def test_other_tenant_not_found(self):
+        """Objetos de outra organização não são encontrados"""
+        other_org = Organization.objects.create(name='Bulk Outra', document='22222222222222')
+        other_office = Office.objects.create(organization=other_org, name='Outro')
+        foreign = Customer.objects.create(
+            organization=other_org,
+            office=other_office,
+            name='Alheio',
+            document='39053344705'
+        )
+        
+        response = self.post_bulk('/api/customers/bulk/', {'update': [{'id': foreign.pk, 'name': 'X'}]})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['update'][0]['errors'], {'id': ['Não encontrado.']})
+    
+    def test_processes_with_parties_constant_queries(self):
+        """Processos com partes: consultas não crescem com o tamanho do lote"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from apps.processes.models import Process, ProcessParty
+        
+        def payload(start, size):
+            return {'create': [
+                {
+                    'number': f'{start + i:07d}-00.2024.8.26.0021',
+                    'area': 'civil',
+                    'subject': f'Processo {i}',
+                    'court': 'TJSP',
+                    'parties': [{'customer': self.customer.pk, 'role': 'plaintiff'}],
+                }
+                for i in range(size)
+            ]}
+        
+        counts = []
+        for start, size in ((100, 2), (200, 6)):
+            with CaptureQueriesContext(connection) as context:
+                response = self.post_bulk('/api/processes/bulk/', payload(start, size))
+            self.assertEqual(response.status_code, 200, response.data)
+            counts.append(len([
+                query for query in context.captured_queries
+                if 'processes_process' in query['sql']
+            ]))
+        
+        self.assertEqual(counts[0], counts[1])
+        self.assertEqual(Process.objects.filter(organization=self.org).count(), 8)
+        self.assertEqual(ProcessParty.objects.filter(customer=self.customer).count(), 8)
+        
+        # Número repetido (com processo já gravado) é recusado
+        response = self.post_bulk('/api/processes/bulk/', payload(100, 1))
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['create'][0]['status'], 'error')
+    
+    def test_deadlines_bulk_invalidates_cache(self):
+        """bulk_create não dispara signals: a listagem em cache é invalidada mesmo assim"""
+        self.assertEqual(self.client.get('/api/deadlines/').data['count'], 0)
+        
+        response = self.post_bulk('/api/deadlines/bulk/', {'create': [
+            {'title': f'Prazo {i}', 'type': 'task', 'due_date': '2030-01-0%d' % (i + 1)}
+            for i in range(2)
+        ]})
+        self.assertEqual(response.status_code, 200, response.data)
+        
+        response = self.client.get('/api/deadlines/')
+        self.assertEqual(response.data['count'], 2)
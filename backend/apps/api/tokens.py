@@ -0,0 +1,43 @@
+# apps/api/tokens.py
+
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.shared.membership_cache import membership_cache
+from apps.shared.tenant import TENANT_CLAIMS, tenant_claims
+
+
+class TenantRefreshToken(RefreshToken):
+    """
+    Refresh token com claims de tenant (org_id, office_id, membership_id,
+    role e membership_version), copiados para o access token.
+    
+    O OrganizationMiddleware confia nesses claims enquanto a
+    membership_version do token for a atual. No refresh os claims são
+    recalculados, então mudanças de papel valem a partir do próximo refresh.
+    """
+    
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token.set_tenant_claims(membership_cache.load(user.pk))
+        return token
+    
+    def set_tenant_claims(self, membership):
+        """Substitui os claims de tenant pelos do membership (ou remove, se None)"""
+        for claim in TENANT_CLAIMS:
+            self.payload.pop(claim, None)
+        
+        if membership is not None:
+            self.payload.update(tenant_claims(membership))
+        
+        self._tenant_claims_current = True
+    
+    @property
+    def access_token(self):
+        # Token recebido no refresh: recalcula os claims a partir do banco
+        if not getattr(self, '_tenant_claims_current', False):
+            user_id = self.payload.get(api_settings.USER_ID_CLAIM)
+            self.set_tenant_claims(membership_cache.load(user_id))
+        
+        return super().access_token
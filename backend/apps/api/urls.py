@@ -19,6 +19,7 @@ from apps.api.views.processes import ProcessViewSet
 from apps.api.views.deadlines import DeadlineViewSet
 from apps.api.views.documents import DocumentViewSet
 from apps.api.views.finance import FeeAgreementViewSet, PaymentViewSet
+from apps.api.views.audit import AuditLogViewSet
 
 app_name = 'api'
 
@@ -30,6 +31,7 @@ router.register(r'deadlines', DeadlineViewSet, basename='deadline')
 router.register(r'documents', DocumentViewSet, basename='document')
 router.register(r'fee-agreements', FeeAgreementViewSet, basename='fee-agreement')
 router.register(r'payments', PaymentViewSet, basename='payment')
+router.register(r'audit-logs', AuditLogViewSet, basename='audit-log')
 
 urlpatterns = [
     # ===== DOCUMENTAÇÃO =====
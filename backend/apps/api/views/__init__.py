@@ -6,6 +6,7 @@ from .processes import ProcessViewSet
 from .deadlines import DeadlineViewSet
 from .documents import DocumentViewSet
 from .finance import FeeAgreementViewSet, PaymentViewSet
+from .audit import AuditLogViewSet
 
 __all__ = [
     'login_view',
@@ -18,4 +19,5 @@ __all__ = [
     'DocumentViewSet',
     'FeeAgreementViewSet',
     'PaymentViewSet',
+    'AuditLogViewSet',
 ]
\ No newline at end of file
@@ -0,0 +1,131 @@
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from rest_framework import viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from django_filters.rest_framework import DjangoFilterBackend
+
+from apps.shared.audit_archive import archive_row_key, archive_window, archived_page, merge_archived
+from apps.shared.models import AuditLog
+from apps.api.filters import AuditLogFilter, SparseFieldsetsFilterBackend
+from apps.api.pagination import KeysetPagination
+from apps.api.serializers.audit import AuditLogSerializer
+from apps.shared.permissions import IsOrganizationAdmin
+from apps.shared.permissions_drf import IsOfficeAdminPermission
+from apps.shared.response_cache import ConditionalGetMixin
+from apps.shared.tenant import get_tenant_ids
+
+class AuditLogViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    Consulta dos logs de auditoria do tenant.
+    
+    Paginação por keyset em (timestamp, id), sem COUNT: use o link `next`.
+    Organization Admin vê a organização inteira; Office Admin, só o seu
+    escritório. ?include_archived=true segue pelos logs já arquivados.
+    """
+    permission_classes = [IsOfficeAdminPermission]
+    serializer_class = AuditLogSerializer
+    pagination_class = KeysetPagination
+    filter_backends = [DjangoFilterBackend, SparseFieldsetsFilterBackend]
+    filterset_class = AuditLogFilter
+    keyset_ordering = ('-timestamp', '-id')
+    conditional_timestamp_field = 'timestamp'
+    
+    def get_office_scope(self):
+        """Escritório a que o usuário fica restrito (Office Admin), ou None"""
+        _, office_id = get_tenant_ids(self.request)
+        if office_id and not IsOrganizationAdmin().has_request_permission(self.request):
+            return office_id
+        return None
+    
+    def get_queryset(self):
+        organization_id, _ = get_tenant_ids(self.request)
+        if not organization_id:
+            return AuditLog.objects.none()
+        
+        queryset = AuditLog.objects.filter(
+            organization_id=organization_id
+        ).select_related('user')
+        
+        office_id = self.get_office_scope()
+        if office_id:
+            queryset = queryset.filter(office_id=office_id)
+        
+        return queryset
+    
+    def list(self, request, *args, **kwargs):
+        filterset = self.filterset_class(request.query_params, queryset=AuditLog.objects.none(), request=request)
+        if filterset.is_valid() and filterset.form.cleaned_data.get('include_archived'):
+            return self.list_with_archived(request, filterset)
+        return super().list(request, *args, **kwargs)
+    
+    def list_with_archived(self, request, filterset):
+        """
+        Listagem do banco intercalada com os arquivos de archive_audit_logs,
+        na mesma ordem (timestamp, id) e com o mesmo cursor: a página tem os
+        N mais recentes dos dois lados. Os arquivos só são lidos quando
+        podem entrar na página (em geral, quando o banco acaba). Sem ETag.
+        """
+        organization_id, _ = get_tenant_ids(request)
+        paginator = self.paginator
+        queryset = self.filter_queryset(self.get_queryset())
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        size = paginator.page_size_value
+        
+        cursor = request.query_params.get(paginator.cursor_query_param)
+        before = tuple(paginator.decode_cursor(queryset, cursor)) if cursor else None
+        # Com mais linhas no banco, arquivo abaixo da última da página não entra
+        after = (page[-1].timestamp, page[-1].id) if paginator.has_next else None
+        
+        cleaned = filterset.form.cleaned_data
+        before, after = archive_window(before, after, cleaned.get('since'), cleaned.get('until'))
+        archived = archived_page(
+            organization_id,
+            size + 1,
+            before=before,
+            after=after,
+            match=filterset.archive_match(self.get_office_scope())
+        )
+        
+        serializer = self.get_serializer(page, many=True)
+        archived_data = serializer.child.archive_representations(archived)
+        entries, has_next = merge_archived(
+            [((item.timestamp, item.id), data) for item, data in zip(page, serializer.data)],
+            [(archive_row_key(row), data) for row, data in zip(archived, archived_data)],
+            size,
+            has_next=paginator.has_next
+        )
+        
+        next_link = paginator.get_cursor_link(list(entries[-1][0])) if has_next and entries else None
+        return Response({'next': next_link, 'results': [data for _, data in entries]})
+    
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """
+        Exporta os logs filtrados (mesmos filtros da listagem) em streaming.
+        
+        ?output=ndjson|csv (padrão ndjson); ?compress=gzip compacta durante
+        o envio. Memória constante, independente do período.
+        """
+        from apps.shared.audit_export import EXPORT_FORMATS, gzip_stream, iter_export
+        
+        output = request.query_params.get('output', 'ndjson')
+        if output not in EXPORT_FORMATS:
+            raise ValidationError({'output': f"Use um de: {', '.join(EXPORT_FORMATS)}"})
+        
+        compress = request.query_params.get('compress') == 'gzip'
+        
+        queryset = self.filter_queryset(self.get_queryset()).select_related(None)
+        stream = iter_export(queryset, output)
+        
+        filename = f'audit-{timezone.now():%Y%m%d-%H%M%S}.{output}'
+        content_type = EXPORT_FORMATS[output]
+        if compress:
+            stream = gzip_stream(stream)
+            filename += '.gz'
+            content_type = 'application/gzip'
+        
+        response = StreamingHttpResponse(stream, content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
@@ -3,6 +3,7 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework_simplejwt.tokens import RefreshToken
+from apps.api.tokens import TenantRefreshToken
 from django.contrib.auth import authenticate
 from apps.accounts.models import User
 from apps.api.serializers.auth import (
@@ -65,8 +66,8 @@ def login_view(request):
             status=status.HTTP_401_UNAUTHORIZED
         )
     
-    # Gera tokens JWT
-    refresh = RefreshToken.for_user(user_authenticated)
+    # Gera tokens JWT (com claims de organização/escritório/papel)
+    refresh = TenantRefreshToken.for_user(user_authenticated)
     
     # Busca memberships do usuário
     memberships = user_authenticated.memberships.filter(is_active=True).select_related(
@@ -162,6 +163,10 @@ def me_view(request):
 def refresh_token_view(request):
     """
     Refresh do access token usando refresh token.
+    Os claims de tenant são recalculados (mudanças de papel valem a partir daqui).
     """
     from rest_framework_simplejwt.views import TokenRefreshView
-    return TokenRefreshView.as_view()(request._request)
\ No newline at end of file
+    from apps.api.serializers.auth import TenantTokenRefreshSerializer
+    return TokenRefreshView.as_view(
+        serializer_class=TenantTokenRefreshSerializer
+    )(request._request)
\ No newline at end of file
@@ -9,7 +9,10 @@ from apps.api.serializers.customers import (
     CustomerListSerializer,
     CustomerCreateUpdateSerializer
 )
+from apps.api.bulk import BulkMixin
+from apps.api.filters import SparseFieldsetsFilterBackend
 from apps.shared.permissions_drf import CanManageCustomersPermission
+from apps.shared.response_cache import CachedListMixin, ConditionalGetMixin
 
 from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiParameter
 from drf_spectacular.types import OpenApiTypes
@@ -47,7 +50,7 @@ from drf_spectacular.types import OpenApiTypes
     ),
 )
 
-class CustomerViewSet(viewsets.ModelViewSet):
+class CustomerViewSet(BulkMixin, ConditionalGetMixin, CachedListMixin, viewsets.ModelViewSet):
     """
     ViewSet para gerenciar clientes (pessoas físicas e jurídicas).
     
@@ -56,11 +59,12 @@ class CustomerViewSet(viewsets.ModelViewSet):
     """
 
     permission_classes = [CanManageCustomersPermission]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter, SparseFieldsetsFilterBackend]
     filterset_fields = ['type', 'is_active', 'city', 'state']
     search_fields = ['name', 'document', 'email', 'phone']
     ordering_fields = ['name', 'created_at', 'updated_at']
     ordering = ['-created_at']
+    bulk_serializer_class = CustomerCreateUpdateSerializer
     
     def get_queryset(self):
         """
@@ -124,13 +128,38 @@ class CustomerViewSet(viewsets.ModelViewSet):
     def processes(self, request, pk=None):
         """
         Lista processos vinculados ao cliente.
+        
+        Uma consulta paginada sobre Process com EXISTS nas partes (um
+        processo por linha, mesmo com vários papéis, sem DISTINCT), contagens
+        anotadas, e uma consulta para os papéis do cliente na página.
         """
         customer = self.get_object()
-        from apps.processes.models import ProcessParty
-        from apps.api.serializers.processes import ProcessListSerializer
+        from django.db.models import Exists, OuterRef
+        from apps.processes.models import Process, ProcessParty
+        from apps.api.serializers.processes import CustomerProcessSerializer
+        from apps.api.filters import filter_confidential
+        
+        processes = filter_confidential(
+            request,
+            Process.objects.for_request(request).filter(
+                Exists(ProcessParty.objects.filter(process=OuterRef('pk'), customer=customer))
+            ).with_counts()
+        )
+        
+        page = self.paginate_queryset(processes)
+        rows = list(processes) if page is None else page
         
-        process_parties = ProcessParty.objects.filter(customer=customer)
-        processes = [pp.process for pp in process_parties]
+        # Papéis do cliente em cada processo da página
+        roles = {}
+        for process_id, role in ProcessParty.objects.filter(
+            customer=customer,
+            process_id__in=[process.pk for process in rows]
+        ).order_by('role').values_list('process_id', 'role'):
+            roles.setdefault(process_id, []).append(role)
+        for process in rows:
+            process.customer_roles = roles.get(process.pk, [])
         
-        serializer = ProcessListSerializer(processes, many=True, context={'request': request})
+        serializer = CustomerProcessSerializer(rows, many=True, context={'request': request})
+        if page is not None:
+            return self.get_paginated_response(serializer.data)
         return Response(serializer.data)
\ No newline at end of file
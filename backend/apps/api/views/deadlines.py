@@ -10,22 +10,30 @@ from apps.api.serializers.deadlines import (
     DeadlineListSerializer,
     DeadlineCreateUpdateSerializer
 )
+from apps.api.bulk import BulkMixin
+from apps.api.filters import SparseFieldsetsFilterBackend
 from rest_framework.permissions import IsAuthenticated
+from apps.shared.response_cache import CachedListMixin, ConditionalGetMixin
 
-class DeadlineViewSet(viewsets.ModelViewSet):
+class DeadlineViewSet(BulkMixin, ConditionalGetMixin, CachedListMixin, viewsets.ModelViewSet):
     """
     ViewSet para gerenciar prazos.
     """
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter, SparseFieldsetsFilterBackend]
     filterset_fields = ['type', 'priority', 'status', 'responsible']
     search_fields = ['title', 'description']
     ordering_fields = ['due_date', 'priority', 'created_at']
     ordering = ['due_date']
+    bulk_serializer_class = DeadlineCreateUpdateSerializer
     
     def get_queryset(self):
         return Deadline.objects.for_request(self.request)
     
+    def get_cache_vary(self):
+        # is_overdue/days_remaining mudam com a data
+        return (timezone.localdate(),)
+    
     def get_serializer_class(self):
         if self.action == 'list':
             return DeadlineListSerializer
@@ -87,5 +95,10 @@ class DeadlineViewSet(viewsets.ModelViewSet):
             status='pending'
         )
         
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+        
         serializer = self.get_serializer(queryset, many=True)
         return Response(serializer.data)
\ No newline at end of file
@@ -10,16 +10,18 @@ from apps.api.serializers.documents import (
     DocumentListSerializer,
     DocumentUploadSerializer
 )
+from apps.api.filters import ConfidentialityFilterBackend, SparseFieldsetsFilterBackend
+from apps.shared.response_cache import CachedListMixin, ConditionalGetMixin
 from apps.shared.permissions_drf import CanViewConfidentialPermission
 from rest_framework.permissions import IsAuthenticated
 
-class DocumentViewSet(viewsets.ModelViewSet):
+class DocumentViewSet(ConditionalGetMixin, CachedListMixin, viewsets.ModelViewSet):
     """
     ViewSet para gerenciar documentos.
     """
     permission_classes = [IsAuthenticated]
     parser_classes = [MultiPartParser, FormParser]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [ConfidentialityFilterBackend, DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter, SparseFieldsetsFilterBackend]
     filterset_fields = ['category', 'is_confidential']
     search_fields = ['title', 'description']
     ordering_fields = ['title', 'created_at']
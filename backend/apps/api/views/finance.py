@@ -2,25 +2,30 @@ from rest_framework import viewsets, filters, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
+from django.utils import timezone
 
+from apps.customers.models import Customer
 from apps.finance.models import FeeAgreement, Payment
 from apps.api.serializers.finance import (
     FeeAgreementSerializer,
     FeeAgreementListSerializer,
     PaymentSerializer
 )
+from apps.api.filters import SparseFieldsetsFilterBackend
 from rest_framework.permissions import IsAuthenticated
+from apps.shared.response_cache import CachedListMixin, ConditionalGetMixin
 
-class FeeAgreementViewSet(viewsets.ModelViewSet):
+class FeeAgreementViewSet(ConditionalGetMixin, CachedListMixin, viewsets.ModelViewSet):
     """
     ViewSet para gerenciar contratos de honorários.
     """
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter, SparseFieldsetsFilterBackend]
     filterset_fields = ['type', 'status', 'customer']
     search_fields = ['title', 'customer__name']
     ordering_fields = ['start_date', 'amount', 'created_at']
     ordering = ['-created_at']
+    cache_models = [FeeAgreement, Customer, Payment]  # customer_name, percentage_received
     
     def get_queryset(self):
         return FeeAgreement.objects.for_request(self.request)
@@ -62,16 +67,21 @@ class FeeAgreementViewSet(viewsets.ModelViewSet):
         agreement = self.get_object()
         payments = agreement.payments.all()
         
+        page = self.paginate_queryset(payments)
+        if page is not None:
+            serializer = PaymentSerializer(page, many=True, context={'request': request})
+            return self.get_paginated_response(serializer.data)
+        
         serializer = PaymentSerializer(payments, many=True, context={'request': request})
         return Response(serializer.data)
 
 
-class PaymentViewSet(viewsets.ModelViewSet):
+class PaymentViewSet(ConditionalGetMixin, CachedListMixin, viewsets.ModelViewSet):
     """
     ViewSet para gerenciar pagamentos.
     """
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter, SparseFieldsetsFilterBackend]
     filterset_fields = ['status', 'payment_method', 'fee_agreement']
     search_fields = ['description']
     ordering_fields = ['due_date', 'payment_date', 'amount']
@@ -80,6 +90,10 @@ class PaymentViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         return Payment.objects.for_request(self.request)
     
+    def get_cache_vary(self):
+        # is_overdue/days_overdue mudam com a data
+        return (timezone.localdate(),)
+    
     def get_serializer_class(self):
         return PaymentSerializer
     
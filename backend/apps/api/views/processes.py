@@ -2,6 +2,7 @@ from rest_framework import viewsets, filters, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
+from django.db.models import Prefetch
 
 from apps.processes.models import Process, ProcessParty
 from apps.api.serializers.processes import (
@@ -10,21 +11,45 @@ from apps.api.serializers.processes import (
     ProcessCreateUpdateSerializer,
     ProcessPartySerializer
 )
+from apps.api.bulk import BulkMixin
+from apps.api.filters import ConfidentialityFilterBackend, SparseFieldsetsFilterBackend
 from apps.shared.permissions_drf import CanManageProcessesPermission
+from apps.shared.response_cache import CachedListMixin, ConditionalGetMixin
 
-class ProcessViewSet(viewsets.ModelViewSet):
+class ProcessViewSet(BulkMixin, ConditionalGetMixin, CachedListMixin, viewsets.ModelViewSet):
     """
     ViewSet para gerenciar processos.
     """
     permission_classes = [CanManageProcessesPermission]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [ConfidentialityFilterBackend, DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter, SparseFieldsetsFilterBackend]
     filterset_fields = ['area', 'phase', 'is_active', 'is_confidential']
     search_fields = ['number', 'internal_number', 'subject', 'court']
     ordering_fields = ['number', 'created_at', 'distribution_date']
     ordering = ['-created_at']
+    bulk_serializer_class = ProcessCreateUpdateSerializer
+    cache_models = [Process, ProcessParty]  # parties_count
+    keyset_ordering = None  # Por action (ver deadlines)
     
     def get_queryset(self):
-        return Process.objects.for_request(self.request)
+        """
+        Contagens anotadas (with_counts) e partes pré-carregadas no detalhe:
+        número constante de consultas por página. Com ?fields=/?omit=, só
+        o que vai para a resposta.
+        """
+        queryset = Process.objects.for_request(self.request)
+        serializer_class = self.get_serializer_class()
+        
+        def requested(name):
+            return serializer_class.is_field_requested(self.request, name)
+        
+        if self.action in ['list', 'retrieve'] and (requested('parties_count') or requested('deadlines_count')):
+            queryset = queryset.with_counts()
+        if self.action == 'retrieve' and requested('parties'):
+            queryset = queryset.prefetch_related(
+                Prefetch('parties', queryset=ProcessParty.objects.with_live_parents().select_related('customer'))
+            )
+        
+        return queryset
     
     def get_serializer_class(self):
         if self.action == 'list':
@@ -67,7 +92,7 @@ class ProcessViewSet(viewsets.ModelViewSet):
         process = self.get_object()
         
         if request.method == 'GET':
-            parties = process.parties.all()
+            parties = process.parties.with_live_parents()
             serializer = ProcessPartySerializer(parties, many=True, context={'request': request})
             return Response(serializer.data)
         
@@ -77,10 +102,12 @@ class ProcessViewSet(viewsets.ModelViewSet):
             serializer.save(process=process)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
     
-    @action(detail=True, methods=['get'])
+    # Cursor pelo vencimento: deadline_org_office_due_idx + id (due_time
+    # aceita NULL e não serve de chave)
+    @action(detail=True, methods=['get'], keyset_ordering=('due_date', 'id'))
     def deadlines(self, request, pk=None):
         """
-        Lista prazos vinculados ao processo.
+        Lista prazos vinculados ao processo (por vencimento).
         """
         process = self.get_object()
         from apps.deadlines.models import Deadline
@@ -88,10 +115,17 @@ class ProcessViewSet(viewsets.ModelViewSet):
         from apps.api.serializers.deadlines import DeadlineListSerializer
         
         ct = ContentType.objects.get_for_model(process)
-        deadlines = Deadline.objects.filter(
+        deadlines = Deadline.objects.for_organization(process.organization_id).for_office(
+            process.office_id
+        ).filter(
             content_type=ct,
             object_id=process.id
         )
         
+        page = self.paginate_queryset(deadlines)
+        if page is not None:
+            serializer = DeadlineListSerializer(page, many=True, context={'request': request})
+            return self.get_paginated_response(serializer.data)
+        
         serializer = DeadlineListSerializer(deadlines, many=True, context={'request': request})
         return Response(serializer.data)
\ No newline at end of file
@@ -68,13 +68,13 @@ class CustomerAdmin(admin.ModelAdmin):
     
     def activate_customers(self, request, queryset):
         """Ativa clientes selecionados"""
-        count = queryset.update(is_active=True)
+        count = queryset.audited_update(is_active=True)
         self.message_user(request, f'{count} cliente(s) ativado(s).')
     activate_customers.short_description = 'Ativar clientes selecionados'
     
     def deactivate_customers(self, request, queryset):
         """Desativa clientes selecionados"""
-        count = queryset.update(is_active=False)
+        count = queryset.audited_update(is_active=False)
         self.message_user(request, f'{count} cliente(s) desativado(s).')
     deactivate_customers.short_description = 'Desativar clientes selecionados'
 
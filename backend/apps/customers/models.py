@@ -1,6 +1,7 @@
 from django.db import models
-from apps.shared.models import OrganizationScopedModel
-from apps.shared.managers import OrganizationScopedManager
+from apps.shared.audit import audited
+from apps.shared.models import OrganizationScopedModel, SoftDeleteModel
+from apps.shared.managers import OrganizationScopedSoftDeleteManager
 import re
 from django.core.exceptions import ValidationError
 
@@ -14,7 +15,8 @@ def validate_document(value):
     
     return clean
 
-class Customer(OrganizationScopedModel):
+@audited
+class Customer(SoftDeleteModel, OrganizationScopedModel):
     """
     Cliente do escritório (pessoa física ou jurídica).
     Pode ser autor, réu ou terceiro em processos.
@@ -46,10 +48,14 @@ class Customer(OrganizationScopedModel):
         help_text='CPF (XXX.XXX.XXX-XX) ou CNPJ (XX.XXX.XXX/XXXX-XX)'
     )
     
-    def save(self, *args, **kwargs):
+    def prepare_for_save(self):
+        """Normalizações do save() (também usadas na gravação em lote)"""
         # Limpa o documento antes de salvar
         if self.document:
             self.document = re.sub(r'[^0-9]', '', self.document)
+    
+    def save(self, *args, **kwargs):
+        self.prepare_for_save()
         super().save(*args, **kwargs)
 
     # ===== CONTATO =====
@@ -112,19 +118,39 @@ class Customer(OrganizationScopedModel):
         help_text='Cliente ativo no sistema'
     )
     
-    # Manager customizado (herda filtros automáticos)
-    objects = OrganizationScopedManager()
+    # Manager customizado (filtros automáticos, sem os deletados)
+    objects = OrganizationScopedSoftDeleteManager()
     
     class Meta:
         verbose_name = 'Cliente'
         verbose_name_plural = 'Clientes'
         ordering = ['-created_at']
-        # Garante que não tem cliente duplicado na mesma org
-        unique_together = [['organization', 'document']]
+        constraints = [
+            # Garante que não tem cliente duplicado na mesma org (entre os não deletados)
+            models.UniqueConstraint(
+                fields=['organization', 'document'],
+                condition=models.Q(is_deleted=False),
+                name='customer_org_document_alive_uniq'
+            ),
+        ]
         indexes = [
-            models.Index(fields=['organization', 'office']),
+            # Tenant + ordenação padrão: filtra e ordena pelo mesmo índice
+            # (parcial: só linhas vivas)
+            models.Index(
+                fields=['organization', 'office', '-created_at'],
+                condition=models.Q(is_deleted=False),
+                name='cust_org_office_created_idx'
+            ),
+            # Sonda do GET condicional: MAX(updated_at), COUNT(*) só no índice
+            models.Index(
+                fields=['organization', 'office', 'updated_at'],
+                condition=models.Q(is_deleted=False),
+                name='cust_org_office_updated_idx'
+            ),
             models.Index(fields=['document']),
             models.Index(fields=['name']),
+            # Purge dos deletados
+            models.Index(fields=['deleted_at'], condition=models.Q(is_deleted=True), name='cust_tombstone_idx'),
         ]
     
     def __str__(self):
@@ -144,4 +170,4 @@ class Customer(OrganizationScopedModel):
     @property
     def total_processes(self):
         """Retorna total de processos associados ao cliente"""
-        return self.process_parties.values('process').distinct().count()
\ No newline at end of file
+        return self.process_parties.filter(process__is_deleted=False).values('process').distinct().count()
\ No newline at end of file
@@ -155,20 +155,18 @@ class DeadlineAdmin(admin.ModelAdmin):
     
     def mark_as_completed(self, request, queryset):
         """Marca como concluído"""
-        for deadline in queryset:
-            deadline.mark_as_completed()
-        count = queryset.count()
+        count = queryset.audited_update(status='completed', completed_at=timezone.now())
         self.message_user(request, f'{count} prazo(s) marcado(s) como concluído(s).')
     mark_as_completed.short_description = 'Marcar como concluído'
     
     def mark_as_pending(self, request, queryset):
         """Marca como pendente"""
-        count = queryset.update(status='pending', completed_at=None)
+        count = queryset.audited_update(status='pending', completed_at=None)
         self.message_user(request, f'{count} prazo(s) marcado(s) como pendente(s).')
     mark_as_pending.short_description = 'Marcar como pendente'
     
     def mark_as_cancelled(self, request, queryset):
         """Marca como cancelado"""
-        count = queryset.update(status='cancelled')
+        count = queryset.audited_update(status='cancelled')
         self.message_user(request, f'{count} prazo(s) cancelado(s).')
     mark_as_cancelled.short_description = 'Cancelar prazos'
\ No newline at end of file
@@ -1,12 +1,14 @@
 # apps/deadlines/models.py
 
 from django.db import models
+from apps.shared.audit import audited
 from apps.shared.models import OrganizationScopedModel
 from apps.shared.managers import OrganizationScopedManager
 from apps.accounts.models import User
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
 
+@audited
 class Deadline(OrganizationScopedModel):
     """
     Prazo ou compromisso.
@@ -142,12 +144,18 @@ class Deadline(OrganizationScopedModel):
     # Manager customizado
     objects = OrganizationScopedManager()
     
+    # Some das listagens com o processo/cliente vinculado na lixeira (for_request)
+    live_parents = ('content_object',)
+    
     class Meta:
         verbose_name = 'Prazo'
         verbose_name_plural = 'Prazos'
         ordering = ['due_date', 'due_time']
         indexes = [
-            models.Index(fields=['organization', 'office']),
+            # Tenant + ordenação padrão: filtra e ordena pelo mesmo índice
+            models.Index(fields=['organization', 'office', 'due_date', 'due_time'], name='deadline_org_office_due_idx'),
+            # Sonda do GET condicional: MAX(updated_at), COUNT(*) só no índice
+            models.Index(fields=['organization', 'office', 'updated_at'], name='deadline_org_office_upd_idx'),
             models.Index(fields=['due_date']),
             models.Index(fields=['status']),
             models.Index(fields=['priority']),
@@ -187,8 +195,11 @@ class Deadline(OrganizationScopedModel):
         self.completed_at = timezone.now()
         self.save()
     
-    def save(self, *args, **kwargs):
-        """Auto-atualiza status para atrasado se necessário"""
+    def prepare_for_save(self):
+        """Auto-atualiza status para atrasado se necessário (save e gravação em lote)"""
         if self.is_overdue and self.status == 'pending':
             self.status = 'overdue'
+    
+    def save(self, *args, **kwargs):
+        self.prepare_for_save()
         super().save(*args, **kwargs)
\ No newline at end of file
@@ -1,6 +1,7 @@
 # apps/documents/models.py
 
 from django.db import models
+from apps.shared.audit import audited
 from apps.shared.models import OrganizationScopedModel
 from apps.shared.managers import OrganizationScopedManager
 from apps.accounts.models import User
@@ -22,6 +23,7 @@ def document_upload_path(instance, filename):
     
     return f'documents/org_{org_id}/office_{office_id}/{year}/{month:02d}/{filename}'
 
+@audited
 class Document(OrganizationScopedModel):
     """
     Documento do escritório.
@@ -124,12 +126,16 @@ class Document(OrganizationScopedModel):
     # Manager customizado
     objects = OrganizationScopedManager()
     
+    # Some das listagens com o processo/cliente vinculado na lixeira (for_request)
+    live_parents = ('content_object',)
+    
     class Meta:
         verbose_name = 'Documento'
         verbose_name_plural = 'Documentos'
         ordering = ['-created_at']
         indexes = [
-            models.Index(fields=['organization', 'office']),
+            # Tenant + ordenação padrão: filtra e ordena pelo mesmo índice
+            models.Index(fields=['organization', 'office', '-created_at'], name='doc_org_office_created_idx'),
             models.Index(fields=['category']),
             models.Index(fields=['content_type', 'object_id']),
         ]
@@ -49,6 +49,7 @@ class FeeAgreementAdmin(admin.ModelAdmin):
         'updated_at',
         'installment_amount',
         'total_received',
+        'received_count',
         'total_pending',
         'percentage_received',
         'is_fully_paid'
@@ -82,6 +83,7 @@ class FeeAgreementAdmin(admin.ModelAdmin):
         ('Estatísticas', {
             'fields': (
                 'total_received',
+                'received_count',
                 'total_pending',
                 'percentage_received',
                 'is_fully_paid'
@@ -144,12 +146,12 @@ class FeeAgreementAdmin(admin.ModelAdmin):
     progress_bar.short_description = 'Progresso'
     
     def activate_agreements(self, request, queryset):
-        count = queryset.update(status='active')
+        count = queryset.audited_update(status='active')
         self.message_user(request, f'{count} contrato(s) ativado(s).')
     activate_agreements.short_description = 'Ativar contratos'
     
     def suspend_agreements(self, request, queryset):
-        count = queryset.update(status='suspended')
+        count = queryset.audited_update(status='suspended')
         self.message_user(request, f'{count} contrato(s) suspenso(s).')
     suspend_agreements.short_description = 'Suspender contratos'
 
@@ -264,6 +266,15 @@ class PaymentAdmin(admin.ModelAdmin):
     mark_as_received.short_description = 'Marcar como recebido'
     
     def mark_as_pending(self, request, queryset):
-        count = queryset.update(status='pending', payment_date=None)
+        # save() de cada um (não update()): desconta os recebidos dos totais do contrato
+        from django.db import transaction
+        
+        count = 0
+        with transaction.atomic():
+            for payment in queryset:
+                payment.status = 'pending'
+                payment.payment_date = None
+                payment.save()
+                count += 1
         self.message_user(request, f'{count} pagamento(s) marcado(s) como pendente(s).')
     mark_as_pending.short_description = 'Marcar como pendente'
\ No newline at end of file
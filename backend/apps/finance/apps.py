@@ -5,3 +5,10 @@ class FinanceConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.finance'
     verbose_name = 'Financeiro'
+    
+    def ready(self):
+        # Totais desnormalizados do contrato (ver Payment.save)
+        from django.db.models.signals import post_delete, pre_delete
+        from apps.finance.models import Payment, payment_deleted, payment_pre_delete
+        pre_delete.connect(payment_pre_delete, sender=Payment, dispatch_uid='finance_payment_pre_delete')
+        post_delete.connect(payment_deleted, sender=Payment, dispatch_uid='finance_payment_deleted')
@@ -0,0 +1,107 @@
+# apps/finance/management/commands/reconcile_fee_totals.py
+
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import models, transaction
+from django.db.models.functions import Coalesce
+
+from apps.finance.models import FeeAgreement, Payment
+
+
+def expected_totals():
+    """Anotações com os totais recalculados a partir dos pagamentos recebidos"""
+    received = Payment.objects.filter(
+        fee_agreement=models.OuterRef('pk'),
+        status='received'
+    ).order_by().values('fee_agreement')
+
+    return {
+        'expected_total': Coalesce(
+            models.Subquery(
+                received.annotate(total=models.Sum('amount')).values('total'),
+                output_field=models.DecimalField(max_digits=15, decimal_places=2)
+            ),
+            models.Value(Decimal('0.00')),
+            output_field=models.DecimalField(max_digits=15, decimal_places=2)
+        ),
+        'expected_count': Coalesce(
+            models.Subquery(
+                received.annotate(total=models.Count('pk')).values('total'),
+                output_field=models.IntegerField()
+            ),
+            0
+        ),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        'Reconstrói os totais desnormalizados dos contratos de honorários '
+        '(total_received, received_count) a partir dos pagamentos, em lotes.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--organization',
+            type=int,
+            default=None,
+            help='Só os contratos desta organização (id)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Contratos verificados por lote (padrão: 1000)'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Só conta os contratos divergentes, sem corrigir'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size deve ser pelo menos 1')
+
+        agreements = FeeAgreement.objects.all()
+        if options['organization']:
+            agreements = agreements.filter(organization_id=options['organization'])
+
+        checked = 0
+        fixed = 0
+        last_id = 0
+        while True:
+            ids = list(
+                agreements.filter(pk__gt=last_id).order_by('pk').values_list('pk', flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+
+            with transaction.atomic():
+                # Só as linhas divergentes, travadas até o fim do lote
+                stale = list(
+                    FeeAgreement.objects.select_for_update().filter(pk__in=ids).annotate(
+                        **expected_totals()
+                    ).exclude(
+                        total_received=models.F('expected_total'),
+                        received_count=models.F('expected_count')
+                    ).values_list('pk', 'expected_total', 'expected_count')
+                )
+
+                if not options['dry_run']:
+                    for pk, total, count in stale:
+                        FeeAgreement.objects.filter(pk=pk).update(
+                            total_received=total,
+                            received_count=count
+                        )
+
+            checked += len(ids)
+            fixed += len(stale)
+            last_id = ids[-1]
+
+        verb = 'divergente(s)' if options['dry_run'] else 'corrigido(s)'
+        self.stdout.write(self.style.SUCCESS(
+            f'{checked} contrato(s) verificado(s), {fixed} {verb}.'
+        ))
@@ -145,15 +145,39 @@ class FeeAgreement(OrganizationScopedModel):
         help_text='PDF do contrato assinado'
     )
     
+    # ===== TOTAIS (desnormalizados) =====
+    # Mantidos pelo Payment (save/delete) com UPDATE ... F(); reconstruídos
+    # em massa por manage.py reconcile_fee_totals
+    total_received = models.DecimalField(
+        'Total Recebido',
+        max_digits=15,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        editable=False
+    )
+    
+    received_count = models.PositiveIntegerField(
+        'Pagamentos Recebidos',
+        default=0,
+        editable=False
+    )
+    
+    # Campos que save() nunca sobrescreve (só o Payment os altera)
+    TOTAL_FIELDS = ('total_received', 'received_count')
+    
     # Manager customizado
     objects = OrganizationScopedManager()
     
+    # Some das listagens com o cliente na lixeira (for_request)
+    live_parents = ('customer',)
+    
     class Meta:
         verbose_name = 'Contrato de Honorários'
         verbose_name_plural = 'Contratos de Honorários'
         ordering = ['-created_at']
         indexes = [
-            models.Index(fields=['organization', 'office']),
+            # Tenant + ordenação padrão: filtra e ordena pelo mesmo índice
+            models.Index(fields=['organization', 'office', '-created_at'], name='fee_org_office_created_idx'),
             models.Index(fields=['customer']),
             models.Index(fields=['status']),
             models.Index(fields=['start_date']),
@@ -166,18 +190,18 @@ class FeeAgreement(OrganizationScopedModel):
         """Calcula valor da parcela automaticamente"""
         if self.amount and self.installments:
             self.installment_amount = self.amount / Decimal(self.installments)
+        
+        # Não grava os totais em memória por cima dos mantidos pelo Payment
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.TOTAL_FIELDS
+            ]
         super().save(*args, **kwargs)
     
-    @property
-    def total_received(self):
-        """Total já recebido"""
-        from apps.finance.models import Payment
-        return Payment.objects.filter(
-            fee_agreement=self,
-            status='received'
-        ).aggregate(
-            total=models.Sum('amount')
-        )['total'] or Decimal('0.00')
+    def refresh_totals(self):
+        """Relê os totais do banco (após pagamentos alterados)"""
+        self.refresh_from_db(fields=self.TOTAL_FIELDS)
     
     @property
     def total_pending(self):
@@ -290,12 +314,16 @@ class Payment(OrganizationScopedModel):
     # Manager customizado
     objects = OrganizationScopedManager()
     
+    # Some das listagens com o cliente do contrato na lixeira (for_request)
+    live_parents = ('fee_agreement__customer',)
+    
     class Meta:
         verbose_name = 'Pagamento'
         verbose_name_plural = 'Pagamentos'
         ordering = ['due_date']
         indexes = [
-            models.Index(fields=['organization', 'office']),
+            # Tenant + ordenação padrão: filtra e ordena pelo mesmo índice
+            models.Index(fields=['organization', 'office', 'due_date'], name='payment_org_office_due_idx'),
             models.Index(fields=['fee_agreement']),
             models.Index(fields=['status']),
             models.Index(fields=['due_date']),
@@ -304,6 +332,66 @@ class Payment(OrganizationScopedModel):
     def __str__(self):
         return f"{self.description} - R$ {self.amount}"
     
+    # ===== TOTAIS DO CONTRATO =====
+    
+    def _received_state(self, values):
+        """(contrato, valor, 1) se o pagamento conta como recebido, senão None"""
+        if values.get('status') != 'received' or values.get('fee_agreement_id') is None:
+            return None
+        return values['fee_agreement_id'], values['amount'] or Decimal('0.00'), 1
+    
+    def _stored_state(self):
+        """
+        Estado gravado no banco, com a linha travada até o fim da transação
+        (chamar dentro de atomic). Lê sempre o banco: duas instâncias do
+        mesmo pagamento não podem contar o mesmo recebimento duas vezes.
+        """
+        if self._state.adding or self.pk is None:
+            return None
+        
+        stored = Payment._base_manager.select_for_update().filter(pk=self.pk).values(
+            'status', 'fee_agreement_id', 'amount'
+        ).first()
+        return self._received_state(stored or {})
+    
+    def _current_state(self):
+        return self._received_state({
+            'status': self.status,
+            'fee_agreement_id': self.fee_agreement_id,
+            'amount': self.amount,
+        })
+    
+    def _apply_totals(self, old, new):
+        """Aplica a diferença entre dois estados nos totais (UPDATE ... F())"""
+        deltas = {}
+        for state, sign in ((old, -1), (new, 1)):
+            if state is None:
+                continue
+            agreement_id, amount, count = state
+            total, received = deltas.get(agreement_id, (Decimal('0.00'), 0))
+            deltas[agreement_id] = (total + sign * amount, received + sign * count)
+        
+        for agreement_id, (total, received) in deltas.items():
+            if not total and not received:
+                continue
+            FeeAgreement.objects.filter(pk=agreement_id).update(
+                total_received=models.F('total_received') + total,
+                received_count=models.F('received_count') + received
+            )
+        
+        # Contrato já carregado neste objeto: relê os totais
+        if deltas and Payment.fee_agreement.is_cached(self):
+            self.fee_agreement.refresh_totals()
+    
+    def save(self, *args, **kwargs):
+        """Salva e atualiza os totais do contrato na mesma transação"""
+        from django.db import transaction
+        
+        with transaction.atomic():
+            old = self._stored_state()
+            super().save(*args, **kwargs)
+            self._apply_totals(old, self._current_state())
+    
     @property
     def is_overdue(self):
         """Verifica se está atrasado"""
@@ -326,8 +414,25 @@ class Payment(OrganizationScopedModel):
         return delta.days
     
     def mark_as_received(self, payment_date=None):
-        """Marca como recebido"""
+        """Marca como recebido (save() atualiza os totais do contrato)"""
         from django.utils import timezone
         self.status = 'received'
         self.payment_date = payment_date or timezone.now().date()
-        self.save()
\ No newline at end of file
+        self.save()
+
+
+def payment_pre_delete(sender, instance, **kwargs):
+    """
+    Guarda o estado gravado (linha travada) antes de apagar: a instância
+    pode estar desatualizada. Roda na transação do delete.
+    """
+    instance._deleted_state = instance._stored_state()
+
+
+def payment_deleted(sender, instance, **kwargs):
+    """
+    Desconta dos totais do contrato o pagamento apagado (post_delete: vale
+    também para queryset.delete(), dentro da transação do delete).
+    Conectado em FinanceConfig.ready(), junto com payment_pre_delete.
+    """
+    instance._apply_totals(instance.__dict__.pop('_deleted_state', None), None)
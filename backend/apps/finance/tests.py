@@ -1,3 +1,155 @@
+import io
+from datetime import date
+from decimal import Decimal
+
 from django.test import TestCase
 
-# Create your tests here.
+from apps.organizations.models import Organization
+from apps.offices.models import Office
+from apps.customers.models import Customer
+from apps.finance.models import FeeAgreement, Payment
+
+
+class FeeAgreementTotalsTest(TestCase):
+    """
+    Testa os totais desnormalizados do contrato (mantidos pelo Payment).
+    """
+
+    def setUp(self):
+        self.org = Organization.objects.create(
+            name='Finance Org',
+            document='17171717171717'
+        )
+
+        self.office = Office.objects.create(
+            organization=self.org,
+            name='Finance Office'
+        )
+
+        customer = Customer.objects.create(
+            organization=self.org,
+            office=self.office,
+            name='Cliente Financeiro',
+            document='12345678901'
+        )
+
+        self.agreement = FeeAgreement.objects.create(
+            organization=self.org,
+            office=self.office,
+            customer=customer,
+            title='Contrato',
+            amount=Decimal('1000.00'),
+            start_date=date(2024, 1, 1)
+        )
+
+    def add_payment(self, amount, status='pending'):
+        return Payment.objects.create(
+            organization=self.org,
+            office=self.office,
+            fee_agreement=self.agreement,
+            description='Parcela',
+            amount=Decimal(amount),
+            due_date=date(2024, 2, 1),
+            status=status
+        )
+
+    def assertTotals(self, total, count):
+        self.agreement.refresh_from_db()
+        self.assertEqual(self.agreement.total_received, Decimal(total))
+        self.assertEqual(self.agreement.received_count, count)
+
+    def test_status_transitions_update_totals(self):
+        """Criar, receber, alterar valor, estornar e apagar mantêm os totais"""
+        first = self.add_payment('300.00', status='received')
+        second = self.add_payment('200.00')
+        self.assertTotals('300.00', 1)
+
+        second.mark_as_received()
+        self.assertTotals('500.00', 2)
+        self.assertEqual(self.agreement.percentage_received, Decimal('50'))
+
+        first.amount = Decimal('350.00')
+        first.save()
+        self.assertTotals('550.00', 2)
+
+        first.status = 'refunded'
+        first.save()
+        self.assertTotals('200.00', 1)
+
+        Payment.objects.filter(pk=second.pk).delete()
+        self.assertTotals('0.00', 0)
+
+    def test_stale_instances_count_once(self):
+        """Duas instâncias desatualizadas do mesmo pagamento: recebimento contado uma vez"""
+        payment = self.add_payment('100.00')
+        first = Payment.objects.get(pk=payment.pk)
+        second = Payment.objects.get(pk=payment.pk)
+        
+        first.mark_as_received()
+        second.mark_as_received()
+        self.assertTotals('100.00', 1)
+        
+        # Apagar uma instância desatualizada (ainda 'pending' em memória)
+        payment.delete()
+        self.assertTotals('0.00', 0)
+    
+    def test_admin_mark_as_pending_updates_totals(self):
+        """Action do admin que volta recebidos para pendente desconta dos totais"""
+        from django.contrib.auth import get_user_model
+        
+        received = self.add_payment('300.00', status='received')
+        pending = self.add_payment('200.00')
+        self.assertTotals('300.00', 1)
+        
+        admin = get_user_model().objects.create_superuser(
+            username='finance_admin',
+            email='admin@finance.com',
+            password='test123'
+        )
+        self.client.force_login(admin)
+        response = self.client.post('/admin/finance/payment/', {
+            'action': 'mark_as_pending',
+            '_selected_action': [received.pk, pending.pk],
+        })
+        self.assertEqual(response.status_code, 302)
+        
+        received.refresh_from_db()
+        self.assertEqual(received.status, 'pending')
+        self.assertIsNone(received.payment_date)
+        self.assertTotals('0.00', 0)
+    
+    def test_agreement_save_keeps_totals(self):
+        """Salvar um contrato desatualizado em memória não sobrescreve os totais"""
+        stale = FeeAgreement.objects.get(pk=self.agreement.pk)
+        self.add_payment('400.00', status='received')
+
+        stale.status = 'active'
+        stale.save()
+        self.assertTotals('400.00', 1)
+
+    def test_totals_without_aggregates(self):
+        """Propriedades usam as colunas (nenhuma consulta)"""
+        self.add_payment('1000.00', status='received')
+        self.agreement.refresh_from_db()
+
+        with self.assertNumQueries(0):
+            self.assertTrue(self.agreement.is_fully_paid)
+            self.assertEqual(self.agreement.total_pending, Decimal('0.00'))
+
+    def test_reconcile_command(self):
+        """reconcile_fee_totals corrige contratos divergentes"""
+        from django.core.management import call_command
+
+        self.add_payment('250.00', status='received')
+        FeeAgreement.objects.filter(pk=self.agreement.pk).update(
+            total_received=Decimal('0.00'),
+            received_count=0
+        )
+
+        output = io.StringIO()
+        call_command('reconcile_fee_totals', dry_run=True, stdout=output)
+        self.assertIn('1 divergente(s)', output.getvalue())
+        self.assertTotals('0.00', 0)
+
+        call_command('reconcile_fee_totals', batch_size=1, stdout=io.StringIO())
+        self.assertTotals('250.00', 1)
@@ -1,11 +1,14 @@
 # apps/memberships/models.py
 
 from django.db import models
+from apps.shared.audit import audited
+from apps.shared.models import AuditSnapshotModel
 from apps.accounts.models import User
 from apps.organizations.models import Organization
 from apps.offices.models import Office
 
-class Membership(models.Model):
+@audited(exclude=['version'])
+class Membership(AuditSnapshotModel):
     """
     Vínculo entre User, Organization, Office e Role.
     """
@@ -64,6 +67,13 @@ class Membership(models.Model):
         help_text='Configurações específicas deste membership'
     )
     
+    version = models.PositiveIntegerField(
+        'Versão',
+        default=1,
+        editable=False,
+        help_text='Incrementada a cada alteração; invalida claims de tokens JWT emitidos antes'
+    )
+    
     created_at = models.DateTimeField('Criado em', auto_now_add=True)
     updated_at = models.DateTimeField('Atualizado em', auto_now=True)
     
@@ -73,6 +83,15 @@ class Membership(models.Model):
         ordering = ['-created_at']
         unique_together = [['user', 'organization', 'office']]
     
+    def save(self, *args, **kwargs):
+        """Incrementa a versão a cada alteração de um membership existente"""
+        if self.pk:
+            self.version = (self.version or 0) + 1
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'version'}
+        super().save(*args, **kwargs)
+    
     def __str__(self):
         office_name = self.office.name if self.office else "Todas"
         return f"{self.user.email} - {self.role} em {office_name}"
\ No newline at end of file
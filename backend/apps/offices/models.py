@@ -1,9 +1,12 @@
 # apps/offices/models.py
 
 from django.db import models
+from apps.shared.audit import audited
+from apps.shared.models import AuditSnapshotModel
 from apps.organizations.models import Organization
 
-class Office(models.Model):
+@audited
+class Office(AuditSnapshotModel):
     """
     Escritório ou filial de uma organização.
     Exemplo: Matriz SP, Filial RJ, Departamento Trabalhista
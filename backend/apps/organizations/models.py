@@ -1,6 +1,9 @@
 from django.db import models
+from apps.shared.audit import audited
+from apps.shared.models import AuditSnapshotModel
 
-class Organization(models.Model):
+@audited
+class Organization(AuditSnapshotModel):
     PLAN_CHOICES = [
         ('free', 'Free'),
         ('basic', 'Basic'),
@@ -87,12 +87,12 @@ class ProcessAdmin(admin.ModelAdmin):
     actions = ['archive_processes', 'activate_processes']
     
     def archive_processes(self, request, queryset):
-        count = queryset.update(phase='archived', is_active=False)
+        count = queryset.audited_update(phase='archived', is_active=False)
         self.message_user(request, f'{count} processo(s) arquivado(s).')
     archive_processes.short_description = 'Arquivar processos selecionados'
     
     def activate_processes(self, request, queryset):
-        count = queryset.update(is_active=True)
+        count = queryset.audited_update(is_active=True)
         self.message_user(request, f'{count} processo(s) ativado(s).')
     activate_processes.short_description = 'Ativar processos selecionados'
 
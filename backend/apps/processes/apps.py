@@ -5,3 +5,9 @@ class ProcessesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.processes'
     verbose_name = 'Processos'
+    
+    def ready(self):
+        # Partes não têm organização própria: a versão é a da organização do processo
+        from apps.processes.models import ProcessParty
+        from apps.shared.response_cache import response_cache
+        response_cache.track(ProcessParty, 'process.organization_id')
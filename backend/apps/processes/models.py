@@ -1,9 +1,59 @@
 from django.db import models
-from apps.shared.models import OrganizationScopedModel
-from apps.shared.managers import OrganizationScopedManager
+from apps.shared.audit import audited
+from apps.shared.models import AuditSnapshotModel, OrganizationScopedModel, SoftDeleteModel
+from apps.shared.managers import (
+    LiveParentsManager,
+    OrganizationScopedSoftDeleteManager,
+    OrganizationScopedSoftDeleteQuerySet,
+)
 from apps.customers.models import Customer
 
-class Process(OrganizationScopedModel):
+
+class ProcessQuerySet(OrganizationScopedSoftDeleteQuerySet):
+    """
+    QuerySet de Process.
+    """
+    
+    def with_counts(self):
+        """
+        Anota as quantidades de partes e de prazos com subqueries (uma
+        consulta para a página inteira, em vez de um COUNT por processo).
+        As properties parties_count/deadlines_count usam os valores anotados.
+        """
+        from django.contrib.contenttypes.models import ContentType
+        from django.db.models import Count, IntegerField, OuterRef, Subquery
+        from django.db.models.functions import Coalesce
+        from apps.deadlines.models import Deadline
+        
+        def count_of(queryset, column):
+            return Coalesce(
+                Subquery(
+                    queryset.order_by().values(column).annotate(total=Count('pk')).values('total'),
+                    output_field=IntegerField()
+                ),
+                0
+            )
+        
+        return self.annotate(
+            _parties_count=count_of(
+                ProcessParty.objects.with_live_parents().filter(process=OuterRef('pk')),
+                'process'
+            ),
+            _deadlines_count=count_of(
+                Deadline.objects.filter(
+                    content_type=ContentType.objects.get_for_model(self.model),
+                    object_id=OuterRef('pk')
+                ),
+                'object_id'
+            ),
+        )
+
+
+class ProcessManager(OrganizationScopedSoftDeleteManager.from_queryset(ProcessQuerySet)):
+    """Manager de Process (tenant + soft delete + with_counts)"""
+
+@audited
+class Process(SoftDeleteModel, OrganizationScopedModel):
 
     """
     Processo judicial.
@@ -33,7 +83,6 @@ class Process(OrganizationScopedModel):
     number = models.CharField(
         'Número CNJ',
         max_length=25,
-        unique=True,
         help_text='Número único do processo (formato CNJ: NNNNNNN-DD.AAAA.J.TR.OOOO)'
     )
     
@@ -118,18 +167,40 @@ class Process(OrganizationScopedModel):
         help_text='Processo com segredo de justiça'
     )
     
-    # Manager customizado
-    objects = OrganizationScopedManager()
+    # Manager customizado (filtros automáticos, sem os deletados)
+    objects = ProcessManager()
     
     class Meta:
         verbose_name = 'Processo'
         verbose_name_plural = 'Processos'
         ordering = ['-created_at']
+        constraints = [
+            # Número CNJ único entre os processos não deletados
+            models.UniqueConstraint(
+                fields=['number'],
+                condition=models.Q(is_deleted=False),
+                name='process_number_alive_uniq'
+            ),
+        ]
         indexes = [
-            models.Index(fields=['organization', 'office']),
+            # Tenant + ordenação padrão: filtra e ordena pelo mesmo índice
+            # (parcial: só linhas vivas)
+            models.Index(
+                fields=['organization', 'office', '-created_at'],
+                condition=models.Q(is_deleted=False),
+                name='proc_org_office_created_idx'
+            ),
+            # Sonda do GET condicional: MAX(updated_at), COUNT(*) só no índice
+            models.Index(
+                fields=['organization', 'office', 'updated_at'],
+                condition=models.Q(is_deleted=False),
+                name='proc_org_office_updated_idx'
+            ),
             models.Index(fields=['number']),
             models.Index(fields=['phase']),
             models.Index(fields=['area']),
+            # Purge dos deletados
+            models.Index(fields=['deleted_at'], condition=models.Q(is_deleted=True), name='proc_tombstone_idx'),
         ]
     
     def __str__(self):
@@ -137,12 +208,16 @@ class Process(OrganizationScopedModel):
     
     @property
     def parties_count(self):
-        """Retorna quantidade de partes no processo"""
-        return self.parties.count()
+        """Retorna quantidade de partes no processo (anotada por with_counts(), se houver)"""
+        if hasattr(self, '_parties_count'):
+            return self._parties_count
+        return self.parties.with_live_parents().count()
 
     @property
     def deadlines_count(self):
-        """Retorna quantidade de prazos vinculados ao processo"""
+        """Retorna quantidade de prazos vinculados ao processo (anotada por with_counts(), se houver)"""
+        if hasattr(self, '_deadlines_count'):
+            return self._deadlines_count
         from apps.deadlines.models import Deadline
         from django.contrib.contenttypes.models import ContentType
         ct = ContentType.objects.get_for_model(self)
@@ -152,7 +227,8 @@ class Process(OrganizationScopedModel):
         ).count()
 
 
-class ProcessParty(models.Model):
+@audited
+class ProcessParty(AuditSnapshotModel):
     """
     Relacionamento entre Process e Customer.
     Define o papel de cada parte no processo (autor, réu, etc).
@@ -196,6 +272,10 @@ class ProcessParty(models.Model):
     
     created_at = models.DateTimeField('Criado em', auto_now_add=True)
     
+    # with_live_parents(): sem as partes de processo/cliente na lixeira
+    objects = LiveParentsManager()
+    live_parents = ('process', 'customer')
+    
     class Meta:
         verbose_name = 'Parte do Processo'
         verbose_name_plural = 'Partes do Processo'
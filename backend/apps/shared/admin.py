@@ -4,8 +4,30 @@ from django.contrib import admin
 from django.utils.html import format_html
 from django.utils.safestring import mark_safe
 import json
+from django.core.paginator import Paginator
+from django.utils.functional import cached_property
 from .models import AuditLog
 
+
+class LookaheadPaginator(Paginator):
+    """
+    Paginator sem COUNT(*): conta só até a página atual mais uma linha.
+    
+    O changelist mostra as páginas até a atual e a próxima (se existir),
+    com custo de um LIMIT, independente do tamanho da tabela.
+    """
+    
+    def __init__(self, object_list, per_page, page_number=1, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.page_number = page_number
+    
+    @cached_property
+    def count(self):
+        start = (self.page_number - 1) * self.per_page
+        ids = self.object_list.values_list('pk', flat=True)[start:start + self.per_page + 1]
+        return start + len(ids)
+
+
 @admin.register(AuditLog)
 class AuditLogAdmin(admin.ModelAdmin):
     """
@@ -23,13 +45,12 @@ class AuditLogAdmin(admin.ModelAdmin):
         'ip_address'
     ]
     
+    # Sem dropdowns de organização/escritório/usuário (DISTINCT em tabelas
+    # grandes); filtre pela URL, ex: ?organization__id__exact=1
     list_filter = [
         'action',
-        'model_name',
-        'organization',
-        'office',
-        'timestamp',
-        'user'
+        'model_type',
+        'timestamp'
     ]
     
     search_fields = [
@@ -37,9 +58,12 @@ class AuditLogAdmin(admin.ModelAdmin):
         'user__first_name',
         'user__last_name',
         'object_repr',
-        'ip_address'
+        'client__ip_address'
     ]
     
+    # model_name/ip_address vêm das tabelas de lookup (sem consulta por linha)
+    list_select_related = ['user', 'organization', 'office', 'model_type', 'client']
+    
     readonly_fields = [
         'user',
         'organization',
@@ -72,7 +96,81 @@ class AuditLogAdmin(admin.ModelAdmin):
         }),
     )
     
-    date_hierarchy = 'timestamp'
+    # Sem date_hierarchy e sem COUNT total (ver LookaheadPaginator)
+    show_full_result_count = False
+    
+    # O count do LookaheadPaginator é parcial; sem isso ?all= carregaria a tabela inteira
+    list_max_show_all = 0
+    
+    def get_paginator(self, request, queryset, per_page, orphans=0, allow_empty_first_page=True):
+        from django.contrib.admin.views.main import PAGE_VAR
+        
+        try:
+            page_number = max(int(request.GET.get(PAGE_VAR, 1)), 1)
+        except ValueError:
+            page_number = 1
+        
+        return LookaheadPaginator(
+            queryset,
+            per_page,
+            page_number=page_number,
+            orphans=orphans,
+            allow_empty_first_page=allow_empty_first_page
+        )
+    
+    # Link para os logs arquivados (ver archive_view)
+    change_list_template = 'admin/shared/auditlog/change_list.html'
+    
+    # Máximo de linhas exibidas na busca nos arquivos
+    archive_results_limit = 200
+    
+    def get_urls(self):
+        from django.urls import path
+        
+        urls = [
+            path(
+                'archive/',
+                self.admin_site.admin_view(self.archive_view),
+                name='shared_auditlog_archive'
+            ),
+        ]
+        return urls + super().get_urls()
+    
+    def archive_view(self, request):
+        """
+        Busca nos logs arquivados (manage.py archive_audit_logs).
+        Filtros: mês (YYYY-MM), organização e texto.
+        """
+        from itertools import islice
+        from django.core.exceptions import PermissionDenied
+        from django.template.response import TemplateResponse
+        from apps.shared.audit_archive import iter_archived, list_archives
+        
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+        
+        month = request.GET.get('month') or None
+        search = request.GET.get('q') or None
+        organization_id = request.GET.get('organization')
+        organization_id = int(organization_id) if organization_id and organization_id.isdigit() else None
+        
+        rows = list(islice(
+            iter_archived(organization_id=organization_id, month=month, search=search),
+            self.archive_results_limit
+        ))
+        
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': 'Logs de auditoria arquivados',
+            'months': sorted({name for name, _ in list_archives()}, reverse=True),
+            'rows': rows,
+            'month': month or '',
+            'search': search or '',
+            'organization': organization_id or '',
+            'limit': self.archive_results_limit,
+        }
+        return TemplateResponse(request, 'admin/shared/auditlog/archive.html', context)
     
     # Somente leitura - não permite edição
     def has_add_permission(self, request):
@@ -7,4 +7,15 @@ class SharedConfig(AppConfig):
     
     def ready(self):
         """Importa signals quando o app está pronto"""
-        import apps.shared.signals  # ← Adicionar
\ No newline at end of file
+        import apps.shared.signals  # ← Adicionar
+        import apps.shared.membership_cache  # Invalidação do cache de memberships
+        import apps.shared.tenant  # Versão dos memberships (claims JWT)
+        import apps.shared.permissions  # noqa: F401  Invalidação dos overrides de permissões
+        
+        # Receivers de auditoria só nos models registrados com @audited
+        from apps.shared.audit import audit_registry
+        audit_registry.connect()
+        
+        # Versões do cache de respostas (post_save/post_delete dos models do tenant)
+        from apps.shared.response_cache import response_cache
+        response_cache.connect()
@@ -0,0 +1,110 @@
+# apps/shared/audit.py
+
+from django.db.models.signals import post_save, post_delete
+
+# Campos nunca incluídos no diff de auditoria
+DEFAULT_EXCLUDE = frozenset({'id', 'created_at', 'updated_at'})
+
+
+class AuditOptions:
+    """Configuração de auditoria de um model"""
+
+    def __init__(self, model, include=None, exclude=None):
+        self.model = model
+        self.include = frozenset(include) if include is not None else None
+        self.exclude = DEFAULT_EXCLUDE | frozenset(exclude or ())
+
+    def tracks(self, field_name):
+        """Indica se o campo entra no diff"""
+        if field_name in self.exclude:
+            return False
+        return self.include is None or field_name in self.include
+
+
+class AuditRegistry:
+    """
+    Registro dos models auditados.
+
+    Os receivers de auditoria são conectados só aos models registrados
+    (sender=Model), então saves de outros models (sessões, tokens, AuditLog,
+    cargas em massa) não passam por eles.
+
+    Uso:
+        @audited(exclude=['version'])
+        class Membership(AuditSnapshotModel):
+            ...
+    """
+
+    def __init__(self):
+        self._registry = {}
+        self._connected = set()
+        self._snapshot_attnames = {}
+
+    def register(self, model=None, *, include=None, exclude=None):
+        """
+        Registra um model. Funciona como decorator, com ou sem argumentos.
+
+        include: só esses campos entram no diff
+        exclude: campos ignorados no diff (além de id/created_at/updated_at)
+        """
+        def decorator(model):
+            self._registry[model] = AuditOptions(model, include, exclude)
+            self._snapshot_attnames.pop(model, None)
+            # Registrado depois do ready(): conecta na hora
+            if self._connected:
+                self.connect()
+            return model
+
+        if model is not None:
+            return decorator(model)
+        return decorator
+
+    def is_registered(self, model):
+        return model in self._registry
+
+    def get_options(self, model):
+        """Opções do model (None se não for auditado)"""
+        return self._registry.get(model)
+
+    def get_snapshot_attnames(self, model):
+        """
+        Colunas (attname) que o snapshot do model guarda: os campos que
+        entram no diff + os `snapshot_fields` do model. None: sem snapshot
+        (model não auditado e sem opt-in). Calculado uma vez por model.
+        """
+        try:
+            return self._snapshot_attnames[model]
+        except KeyError:
+            pass
+
+        options = self.get_options(model)
+        extra = set(getattr(model, 'snapshot_fields', None) or ())
+        attnames = frozenset(
+            field.attname for field in model._meta.concrete_fields
+            if field.name in extra or (options is not None and options.tracks(field.name))
+        )
+        self._snapshot_attnames[model] = attnames or None
+        return self._snapshot_attnames[model]
+
+    @property
+    def models(self):
+        return list(self._registry)
+
+    def connect(self):
+        """Conecta os receivers a cada model registrado (SharedConfig.ready)"""
+        from apps.shared.signals import audit_post_save, audit_post_delete
+
+        for model in self._registry:
+            if model in self._connected:
+                continue
+
+            label = model._meta.label_lower
+            post_save.connect(audit_post_save, sender=model, dispatch_uid=f'audit_post_save:{label}')
+            post_delete.connect(audit_post_delete, sender=model, dispatch_uid=f'audit_post_delete:{label}')
+            self._connected.add(model)
+
+
+audit_registry = AuditRegistry()
+
+# Atalho para uso como decorator nos models
+audited = audit_registry.register
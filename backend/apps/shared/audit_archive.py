@@ -0,0 +1,276 @@
+# apps/shared/audit_archive.py
+
+import datetime
+import gzip
+import heapq
+import json
+import os
+from collections import deque
+from itertools import groupby
+from pathlib import Path
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+# Colunas gravadas em cada linha do arquivo (NDJSON)
+ARCHIVE_FIELDS = (
+    'id',
+    'timestamp',
+    'user_id',
+    'organization_id',
+    'office_id',
+    'action',
+    'object_id',
+    'object_repr',
+    'changes',
+)
+
+# Valores internados (tabelas de lookup), gravados por extenso no arquivo
+ARCHIVE_LOOKUPS = {
+    'model_name': 'model_type__name',
+    'ip_address': 'client__ip_address',
+    'user_agent': 'agent__value',
+}
+
+
+def get_archive_dir():
+    """Diretório dos arquivos (AUDIT_LOG_ARCHIVE['DIR'])"""
+    config = getattr(settings, 'AUDIT_LOG_ARCHIVE', {})
+    return Path(config.get('DIR', Path(settings.BASE_DIR) / 'audit_archive'))
+
+
+def month_start(value):
+    """Primeiro instante do mês de `value` (datetime aware)"""
+    value = timezone.localtime(value) if timezone.is_aware(value) else value
+    start = datetime.datetime(value.year, value.month, 1)
+    return timezone.make_aware(start) if settings.USE_TZ else start
+
+
+def add_months(value, months):
+    """Soma (ou subtrai) meses a um início de mês"""
+    index = value.year * 12 + value.month - 1 + months
+    return value.replace(year=index // 12, month=index % 12 + 1)
+
+
+def archive_cutoff(months, now=None):
+    """
+    Início da partição mais antiga que continua no banco.
+    Ex: months=6 em 15/07 → 01/01 (jan-jul ficam; dezembro para trás arquiva).
+    """
+    return add_months(month_start(now or timezone.now()), -months)
+
+
+def archive_name(month):
+    return f'audit-{month:%Y-%m}'
+
+
+def list_archives(archive_dir=None):
+    """
+    Arquivos existentes, do mês mais recente para o mais antigo.
+    Retorna [(mês 'YYYY-MM', path), ...]
+    """
+    archive_dir = Path(archive_dir or get_archive_dir())
+    if not archive_dir.exists():
+        return []
+
+    archives = []
+    for path in archive_dir.glob('audit-*.ndjson.gz'):
+        archives.append((path.name[len('audit-'):len('audit-YYYY-MM')], path))
+
+    return sorted(archives, key=lambda item: item[1].name, reverse=True)
+
+
+def archive_month(month, archive_dir=None, batch_size=1000):
+    """
+    Move uma partição mensal (AuditLogs de `month` até o mês seguinte)
+    para um arquivo NDJSON compactado e apaga as linhas do banco.
+
+    O arquivo é escrito em um temporário e renomeado antes de apagar,
+    então uma falha no meio não perde logs. Cada parte leva o menor id que
+    arquivou (audit-YYYY-MM.<id>.ndjson.gz): se o processo cair entre o
+    rename e o delete, rodar de novo lê as mesmas linhas e sobrescreve a
+    mesma parte, sem duplicar. Logs que chegarem ao mês depois de um
+    arquivamento completo vão para uma parte nova.
+
+    Retorna (quantidade arquivada, path ou None).
+    """
+    from apps.shared.models import AuditLog
+
+    archive_dir = Path(archive_dir or get_archive_dir())
+    archive_dir.mkdir(parents=True, exist_ok=True)
+
+    partition = AuditLog.objects.filter(
+        timestamp__gte=month,
+        timestamp__lt=add_months(month, 1)
+    )
+
+    # Limite superior fixo: logs gravados durante o arquivamento ficam no banco
+    last_id = partition.order_by('-id').values_list('id', flat=True).first()
+    if last_id is None:
+        return 0, None
+    partition = partition.filter(id__lte=last_id)
+    first_id = partition.order_by('id').values_list('id', flat=True).first()
+
+    path = archive_dir / f'{archive_name(month)}.{first_id}.ndjson.gz'
+
+    tmp_path = path.with_name(path.name + '.tmp')
+    count = 0
+    with gzip.open(tmp_path, 'wt', encoding='utf-8') as fh:
+        rows = partition.order_by('timestamp', 'id').values(
+            *ARCHIVE_FIELDS,
+            **{name: F(lookup) for name, lookup in ARCHIVE_LOOKUPS.items()}
+        )
+        for row in rows.iterator(chunk_size=batch_size):
+            fh.write(json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False))
+            fh.write('\n')
+            count += 1
+
+    os.replace(tmp_path, path)
+
+    with transaction.atomic():
+        partition.delete()
+
+    return count, path
+
+
+def archive_older_than(months, archive_dir=None, now=None):
+    """
+    Arquiva todas as partições mensais anteriores a `months` meses.
+    Retorna [(mês, quantidade, path), ...]
+    """
+    from apps.shared.models import AuditLog
+
+    cutoff = archive_cutoff(months, now)
+    oldest = AuditLog.objects.filter(
+        timestamp__lt=cutoff
+    ).order_by('timestamp').values_list('timestamp', flat=True).first()
+
+    results = []
+    if oldest is None:
+        return results
+
+    month = month_start(oldest)
+    while month < cutoff:
+        count, path = archive_month(month, archive_dir)
+        if count:
+            results.append((month, count, path))
+        month = add_months(month, 1)
+
+    return results
+
+
+def archive_month_range(name):
+    """[início, fim) do mês 'YYYY-MM' de um arquivo (mesmo fuso de month_start)"""
+    year, month = (int(part) for part in name.split('-'))
+    start = datetime.datetime(year, month, 1)
+    start = timezone.make_aware(start) if settings.USE_TZ else start
+    return start, add_months(start, 1)
+
+
+def archive_row_key(row):
+    """(timestamp, id) de uma linha arquivada: a ordem da API de auditoria"""
+    return parse_datetime(row['timestamp']), row['id']
+
+
+def read_archive(path):
+    with gzip.open(path, 'rt', encoding='utf-8') as fh:
+        for line in fh:
+            yield json.loads(line)
+
+
+def archived_page(organization_id, limit, before=None, after=None, match=None, archive_dir=None):
+    """
+    Até `limit` logs arquivados da organização, do mais novo para o mais
+    antigo em (timestamp, id), como a paginação por keyset da API.
+
+    before: (timestamp, id) exclusivo, posição do cursor
+    after: (timestamp, id) exclusivo; abaixo dele não precisa procurar
+    match: filtro extra por linha (dict)
+
+    Os meses são lidos do mais recente para trás, pulando os que estão fora
+    de (after, before). As partes de um mês são intercaladas em ordem
+    crescente guardando só as últimas `limit` linhas: a memória fica no
+    tamanho da página, não do mês.
+    """
+    rows = []
+
+    for name, entries in groupby(list_archives(archive_dir), key=lambda item: item[0]):
+        start, end = archive_month_range(name)
+        if before is not None and start > before[0]:
+            continue
+        if after is not None and end <= after[0]:
+            break
+
+        remaining = limit - len(rows)
+        last = deque(maxlen=remaining)
+        for row in heapq.merge(*(read_archive(path) for _, path in entries), key=archive_row_key):
+            if row['organization_id'] != organization_id:
+                continue
+            key = archive_row_key(row)
+            if before is not None and key >= tuple(before):
+                break
+            if after is not None and key <= tuple(after):
+                continue
+            if match is None or match(row):
+                last.append(row)
+
+        rows.extend(reversed(last))
+        if len(rows) >= limit:
+            break
+
+    return rows
+
+
+def archive_window(before=None, after=None, since=None, until=None):
+    """
+    (before, after) de archived_page limitados ao período since/until,
+    para não ler meses fora dele.
+    """
+    if since and (after is None or after < (since, 0)):
+        after = (since, 0)
+    if until and (before is None or (until, 0) < before):
+        before = (until, 0)
+    return before, after
+
+
+def merge_archived(entries, archived, limit, has_next=False):
+    """
+    Intercala a página do banco com a dos arquivos, ambas [(chave, dado)]
+    com chave (timestamp, id), do mais novo para o mais antigo.
+
+    has_next: o banco tem mais linhas depois da sua página
+    Retorna (os `limit` primeiros, se existe próxima página).
+    """
+    merged = sorted([*entries, *archived], key=lambda entry: entry[0], reverse=True)
+    return merged[:limit], has_next or len(merged) > limit
+
+
+def iter_archived(organization_id=None, month=None, search=None, archive_dir=None):
+    """
+    Lê os logs arquivados (mais recentes primeiro, por arquivo).
+
+    organization_id: só desta organização
+    month: 'YYYY-MM', só este mês
+    search: texto procurado em object_repr, model_name e ip_address
+    """
+    search = search.lower() if search else None
+
+    for archive_month_name, path in list_archives(archive_dir):
+        if month and archive_month_name != month:
+            continue
+
+        for row in read_archive(path):
+            if organization_id is not None and row['organization_id'] != organization_id:
+                continue
+
+            if search and not any(
+                search in str(row.get(field) or '').lower()
+                for field in ('object_repr', 'model_name', 'ip_address')
+            ):
+                continue
+
+            yield row
@@ -0,0 +1,83 @@
+# apps/shared/audit_export.py
+
+import csv
+import json
+import zlib
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F
+
+from apps.shared.audit_archive import ARCHIVE_FIELDS, ARCHIVE_LOOKUPS
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+# Mesmas colunas dos arquivos (audit_archive), na ordem do CSV
+EXPORT_COLUMNS = (*ARCHIVE_FIELDS, *ARCHIVE_LOOKUPS)
+
+
+class _Echo:
+    """Buffer do csv.writer que só devolve a linha escrita"""
+
+    def write(self, value):
+        return value
+
+
+def export_rows(queryset, chunk_size=2000):
+    """
+    Linhas (dicts) do queryset em ordem (timestamp, id), lidas em blocos
+    com iterator(): a memória não cresce com o tamanho do período.
+    """
+    return queryset.order_by('timestamp', 'id').values(
+        *ARCHIVE_FIELDS,
+        **{name: F(lookup) for name, lookup in ARCHIVE_LOOKUPS.items()}
+    ).iterator(chunk_size=chunk_size)
+
+
+def iter_export(queryset, output='ndjson', chunk_size=2000):
+    """
+    Gera o export linha a linha (str), em NDJSON ou CSV.
+
+    Uso:
+        StreamingHttpResponse(iter_export(queryset, 'csv'), content_type='text/csv')
+    """
+    if output not in EXPORT_FORMATS:
+        raise ValueError(f"Formato de export inválido: {output!r}")
+
+    rows = export_rows(queryset, chunk_size)
+
+    if output == 'ndjson':
+        for row in rows:
+            yield json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False) + '\n'
+        return
+
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_COLUMNS)
+    for row in rows:
+        row['changes'] = json.dumps(row['changes'], cls=DjangoJSONEncoder, ensure_ascii=False)
+        yield writer.writerow([row[column] for column in EXPORT_COLUMNS])
+
+
+def gzip_stream(chunks, level=6, min_chunk=64 * 1024):
+    """
+    Compacta um gerador de str em gzip enquanto ele é consumido.
+    Junta as linhas em blocos de ~min_chunk bytes antes de devolver.
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # 31 = formato gzip
+    buffer = []
+    size = 0
+
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            buffer.append(data)
+            size += len(data)
+        if size >= min_chunk:
+            yield b''.join(buffer)
+            buffer = []
+            size = 0
+
+    buffer.append(compressor.flush())
+    yield b''.join(buffer)
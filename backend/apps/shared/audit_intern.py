@@ -0,0 +1,165 @@
+# apps/shared/audit_intern.py
+
+import hashlib
+import threading
+
+from django.db import IntegrityError, transaction
+
+
+class InternTable:
+    """
+    Cache em memória de uma tabela de lookup (valor <-> id).
+
+    Os AuditLogs guardam só o id (FK pequena) de valores muito repetidos
+    (nome do model, IP, user agent). Na gravação, os valores já vistos são
+    resolvidos sem consulta; os novos são criados em lote.
+
+    O cache só recebe um id depois do commit da transação em que ele foi
+    lido/criado (on_commit; fora de transação, na hora): um id de linha
+    desfeita por rollback nunca fica no cache.
+
+    Uso:
+        model_names.get_ids(['Process', 'Customer'])  # {'Process': 1, ...}
+        model_names.get_value(1)                      # 'Process'
+    """
+
+    def __init__(self, model_path, key_field, value_field=None, key_func=None, max_size=10000):
+        self.model_path = model_path
+        self.key_field = key_field
+        self.value_field = value_field or key_field
+        self.key_func = key_func or (lambda value: value)
+        self.max_size = max_size
+        self._ids = {}
+        self._values = {}
+        self._lock = threading.Lock()
+
+    @property
+    def model(self):
+        from django.apps import apps
+        return apps.get_model(self.model_path)
+
+    def _remember(self, pairs):
+        """Guarda [(valor, id)] no cache quando a transação atual confirmar"""
+        transaction.on_commit(lambda: self._store(pairs))
+
+    def _store(self, pairs):
+        with self._lock:
+            for value, pk in pairs:
+                # Valores repetidos são poucos; se explodir, recomeça do zero
+                if len(self._ids) >= self.max_size:
+                    self._ids.clear()
+                    self._values.clear()
+                self._ids[value] = pk
+                self._values[pk] = value
+
+    def _fetch(self, keys):
+        """{key: (pk, value)} dos valores já existentes no banco"""
+        rows = self.model.objects.filter(
+            **{f'{self.key_field}__in': keys}
+        ).values_list(self.key_field, 'pk', self.value_field)
+        return {key: (pk, value) for key, pk, value in rows}
+
+    def get_ids(self, values):
+        """
+        Ids de vários valores, criando os que ainda não existem.
+        Valores vazios (None/'') não são internados.
+        """
+        result = {}
+        missing = {}
+        for value in set(values):
+            if value in (None, ''):
+                continue
+            pk = self._ids.get(value)
+            if pk is None:
+                missing[self.key_func(value)] = value
+            else:
+                result[value] = pk
+
+        if not missing:
+            return result
+
+        found = self._fetch(list(missing))
+        new = [key for key in missing if key not in found]
+        if new:
+            objects = []
+            for key in new:
+                data = {self.key_field: key, self.value_field: missing[key]}
+                objects.append(self.model(**data))
+            try:
+                with transaction.atomic():
+                    self.model.objects.bulk_create(objects, ignore_conflicts=True)
+            except IntegrityError:
+                # Outro processo criou ao mesmo tempo; basta reler
+                pass
+            found.update(self._fetch(new))
+
+        for key, (pk, value) in found.items():
+            result[missing[key]] = pk
+        self._remember([(missing[key], pk) for key, (pk, _) in found.items()])
+
+        return result
+
+    def get_id(self, value):
+        return self.get_ids([value]).get(value)
+
+    def find_id(self, value):
+        """Id de um valor existente, sem criar (None se não existir)"""
+        pk = self._ids.get(value)
+        if pk is None and value not in (None, ''):
+            pk = self.model.objects.filter(
+                **{self.key_field: self.key_func(value)}
+            ).values_list('pk', flat=True).first()
+            if pk is not None:
+                self._remember([(value, pk)])
+        return pk
+
+    def get_value(self, pk):
+        """Valor de um id (consulta o banco só na primeira vez)"""
+        if pk is None:
+            return None
+
+        value = self._values.get(pk)
+        if value is None:
+            value = self.model.objects.filter(pk=pk).values_list(self.value_field, flat=True).first()
+            if value is not None:
+                self._remember([(value, pk)])
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._ids.clear()
+            self._values.clear()
+
+
+def user_agent_hash(value):
+    return hashlib.sha256(value.encode('utf-8')).hexdigest()
+
+
+model_names = InternTable('shared.AuditModelName', 'name')
+clients = InternTable('shared.AuditClient', 'ip_address')
+user_agents = InternTable('shared.AuditUserAgent', 'value_hash', 'value', key_func=user_agent_hash)
+
+
+def clear_interned():
+    """Limpa os caches de lookup (testes / após apagar tabelas de lookup)"""
+    for table in (model_names, clients, user_agents):
+        table.clear()
+
+
+def resolve_interned(logs):
+    """
+    Converte model_name/ip_address/user_agent pendentes dos AuditLogs em
+    FKs, com no máximo uma leitura (e uma criação) por tabela para o lote.
+    """
+    for table, attr, fk in (
+        (model_names, '_model_name', 'model_type_id'),
+        (clients, '_ip_address', 'client_id'),
+        (user_agents, '_user_agent', 'agent_id'),
+    ):
+        pending = [log for log in logs if attr in log.__dict__]
+        if not pending:
+            continue
+
+        ids = table.get_ids(log.__dict__[attr] for log in pending)
+        for log in pending:
+            setattr(log, fk, ids.get(log.__dict__.pop(attr)))
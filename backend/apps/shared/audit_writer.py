@@ -0,0 +1,268 @@
+# apps/shared/audit_writer.py
+
+import atexit
+import logging
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+logger = logging.getLogger(__name__)
+
+# Políticas quando a fila está cheia
+BACKPRESSURE_POLICIES = ('block', 'drop_oldest', 'drop_newest', 'sync')
+
+
+class AuditLogWriter:
+    """
+    Grava AuditLogs em lote, fora do caminho do request.
+
+    Os signals entregam entradas (AuditLog ainda não salvos) com submit();
+    elas entram na fila quando a transação é confirmada (on_commit) e uma
+    thread em background grava com bulk_create ao atingir `batch_size`
+    entradas ou a cada `flush_interval` segundos. A fila é esvaziada também
+    no encerramento do processo (atexit).
+
+    Fila cheia (`max_queue`), conforme `backpressure`:
+    - drop_oldest (padrão): descarta a entrada mais antiga
+    - drop_newest: descarta a entrada nova
+    - block: espera espaço por até `block_timeout` segundos (depois
+      descarta). A espera acontece no on_commit, ou seja, na thread do
+      request: com o banco lento, cada commit pode levar até
+      block_timeout a mais.
+    - sync: grava a fila na thread do chamador (mesmo custo de latência)
+
+    As métricas são atualizadas sob um lock próprio: a thread de gravação,
+    o flush() do atexit e os requests (sync / descartes) mexem nelas ao
+    mesmo tempo.
+
+    Com async_mode=False não há thread: cada commit grava na hora.
+
+    Uso:
+        audit_writer.submit(AuditLog(...))
+        audit_writer.stats()
+    """
+
+    def __init__(self, batch_size=100, flush_interval=1.0, max_queue=10000,
+                 backpressure='drop_oldest', block_timeout=1.0, async_mode=True):
+        if backpressure not in BACKPRESSURE_POLICIES:
+            raise ValueError(f"Política de backpressure inválida: {backpressure!r}")
+
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.backpressure = backpressure
+        self.block_timeout = block_timeout
+        self.async_mode = async_mode
+
+        self._queue = deque()
+        self._condition = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._thread = None
+        self._stopping = False
+
+        # Métricas
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.errors = 0
+        self.flushes = 0
+        self.last_flush_latency = 0.0
+        self.max_flush_latency = 0.0
+        self._total_flush_latency = 0.0
+
+    # ===== ENTRADA =====
+
+    def submit(self, entry, using=None):
+        """
+        Agenda a entrada para quando a transação atual for confirmada.
+        Se a transação for desfeita, a entrada é descartada junto.
+        """
+        transaction.on_commit(lambda: self.enqueue(entry), using=using)
+
+    def enqueue(self, entry):
+        """Coloca a entrada na fila, aplicando a política de backpressure"""
+        if not self.async_mode:
+            self._write([entry])
+            return
+
+        self._ensure_started()
+
+        with self._condition:
+            if len(self._queue) >= self.max_queue:
+                if not self._make_room():
+                    return
+
+            self._queue.append(entry)
+            with self._stats_lock:
+                self.enqueued += 1
+
+            if len(self._queue) >= self.batch_size:
+                self._condition.notify_all()
+
+    def _make_room(self):
+        """
+        Trata fila cheia (chamado com o lock da condição).
+        Retorna False se a nova entrada deve ser descartada.
+        """
+        if self.backpressure == 'drop_oldest':
+            self._queue.popleft()
+            self._count_dropped(1)
+            return True
+
+        if self.backpressure == 'drop_newest':
+            self._count_dropped(1)
+            return False
+
+        if self.backpressure == 'sync':
+            batch = list(self._queue)
+            self._queue.clear()
+            self._condition.release()
+            try:
+                self._write(batch)
+            finally:
+                self._condition.acquire()
+            return True
+
+        # block
+        self._condition.notify_all()
+        has_room = self._condition.wait_for(
+            lambda: len(self._queue) < self.max_queue,
+            timeout=self.block_timeout
+        )
+        if not has_room:
+            self._count_dropped(1)
+        return has_room
+
+    def _count_dropped(self, count):
+        with self._stats_lock:
+            self.dropped += count
+
+    # ===== GRAVAÇÃO =====
+
+    def flush(self):
+        """Grava tudo o que está na fila. Retorna a quantidade gravada"""
+        written = 0
+        while True:
+            with self._condition:
+                batch = [
+                    self._queue.popleft()
+                    for _ in range(min(self.batch_size, len(self._queue)))
+                ]
+                # Libera quem está esperando espaço (política block)
+                self._condition.notify_all()
+
+            if not batch:
+                return written
+
+            written += self._write(batch)
+
+    def _write(self, batch):
+        from apps.shared.audit_intern import resolve_interned
+        from apps.shared.models import AuditLog
+
+        start = time.monotonic()
+        try:
+            with self._flush_lock:
+                # Model/IP/user agent viram FKs (cache de lookup, ver audit_intern)
+                resolve_interned(batch)
+                AuditLog.objects.bulk_create(batch, batch_size=self.batch_size)
+        except Exception:
+            # Não derruba a aplicação se a auditoria falhar
+            with self._stats_lock:
+                self.errors += 1
+                self.dropped += len(batch)
+            logger.exception("Erro ao gravar %d audit logs", len(batch))
+            return 0
+
+        latency = time.monotonic() - start
+        with self._stats_lock:
+            self.flushes += 1
+            self.written += len(batch)
+            self.last_flush_latency = latency
+            self.max_flush_latency = max(self.max_flush_latency, latency)
+            self._total_flush_latency += latency
+        return len(batch)
+
+    # ===== THREAD =====
+
+    def _ensure_started(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        with self._condition:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopping = False
+            self._thread = threading.Thread(
+                target=self._run,
+                name='audit-log-writer',
+                daemon=True
+            )
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(
+                    lambda: self._stopping or len(self._queue) >= self.batch_size,
+                    timeout=self.flush_interval
+                )
+                stopping = self._stopping
+
+            self.flush()
+            # A thread tem sua própria conexão com o banco
+            close_old_connections()
+
+            if stopping:
+                return
+
+    def stop(self, timeout=5.0):
+        """Para a thread e grava o que restou na fila"""
+        thread = self._thread
+        if thread is not None:
+            with self._condition:
+                self._stopping = True
+                self._condition.notify_all()
+            thread.join(timeout)
+            self._thread = None
+
+        self.flush()
+
+    # ===== MÉTRICAS =====
+
+    def stats(self):
+        """Métricas para monitoramento"""
+        with self._condition:
+            depth = len(self._queue)
+
+        with self._stats_lock:
+            return {
+                'queue_depth': depth,
+                'enqueued': self.enqueued,
+                'written': self.written,
+                'dropped': self.dropped,
+                'errors': self.errors,
+                'flushes': self.flushes,
+                'last_flush_latency': self.last_flush_latency,
+                'max_flush_latency': self.max_flush_latency,
+                'avg_flush_latency': self._total_flush_latency / self.flushes if self.flushes else 0.0,
+            }
+
+
+_config = getattr(settings, 'AUDIT_LOG_WRITER', {})
+
+audit_writer = AuditLogWriter(
+    batch_size=_config.get('BATCH_SIZE', 100),
+    flush_interval=_config.get('FLUSH_INTERVAL', 1.0),
+    max_queue=_config.get('MAX_QUEUE', 10000),
+    backpressure=_config.get('BACKPRESSURE', 'drop_oldest'),
+    block_timeout=_config.get('BLOCK_TIMEOUT', 1.0),
+    async_mode=_config.get('ASYNC', True),
+)
+
+# Grava o que estiver na fila quando o processo encerra
+atexit.register(audit_writer.stop)
@@ -13,10 +13,7 @@ def organization_admin_required(view_func):
         
         from apps.shared.permissions import IsOrganizationAdmin
         
-        if not IsOrganizationAdmin().has_permission(
-            request.user,
-            request.organization
-        ):
+        if not IsOrganizationAdmin().has_request_permission(request):
             raise PermissionDenied("Você não tem permissão para acessar esta página.")
         
         return view_func(request, *args, **kwargs)
@@ -35,11 +32,7 @@ def office_admin_required(view_func):
         
         from apps.shared.permissions import IsOfficeAdmin
         
-        if not IsOfficeAdmin().has_permission(
-            request.user,
-            request.organization,
-            request.office
-        ):
+        if not IsOfficeAdmin().has_request_permission(request):
             raise PermissionDenied("Você não tem permissão para acessar esta página.")
         
         return view_func(request, *args, **kwargs)
@@ -63,11 +56,7 @@ def permission_required(permission_class):
                 return redirect('admin:login')
             
             permission = permission_class()
-            if not permission.has_permission(
-                request.user,
-                request.organization,
-                request.office
-            ):
+            if not permission.has_request_permission(request):
                 raise PermissionDenied("Você não tem permissão.")
             
             return view_func(request, *args, **kwargs)
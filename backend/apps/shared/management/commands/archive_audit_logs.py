@@ -0,0 +1,44 @@
+# apps/shared/management/commands/archive_audit_logs.py
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.shared.audit_archive import archive_cutoff, archive_older_than, get_archive_dir
+
+
+class Command(BaseCommand):
+    help = (
+        'Move partições mensais de AuditLog mais antigas que N meses para '
+        'arquivos NDJSON compactados (gzip) e apaga as linhas do banco.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--months',
+            type=int,
+            default=None,
+            help='Meses mantidos no banco (padrão: AUDIT_LOG_ARCHIVE["KEEP_MONTHS"])'
+        )
+        parser.add_argument(
+            '--dir',
+            default=None,
+            help='Diretório dos arquivos (padrão: AUDIT_LOG_ARCHIVE["DIR"])'
+        )
+
+    def handle(self, *args, **options):
+        from django.conf import settings
+
+        months = options['months']
+        if months is None:
+            months = getattr(settings, 'AUDIT_LOG_ARCHIVE', {}).get('KEEP_MONTHS', 12)
+        if months < 1:
+            raise CommandError('--months deve ser pelo menos 1')
+
+        archive_dir = options['dir'] or get_archive_dir()
+        self.stdout.write(f'Arquivando logs anteriores a {archive_cutoff(months):%Y-%m} em {archive_dir}')
+
+        results = archive_older_than(months, archive_dir)
+        for month, count, path in results:
+            self.stdout.write(f'  {month:%Y-%m}: {count} log(s) -> {path.name}')
+
+        total = sum(count for _, count, _ in results)
+        self.stdout.write(self.style.SUCCESS(f'{total} log(s) arquivado(s).'))
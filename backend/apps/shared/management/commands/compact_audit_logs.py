@@ -0,0 +1,153 @@
+# apps/shared/management/commands/compact_audit_logs.py
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from apps.shared import audit_intern
+from apps.shared.models import AuditClient, AuditLog, AuditModelName, AuditUserAgent
+
+# Coluna antiga -> (tabela de lookup, FK nova)
+LEGACY_COLUMNS = {
+    'model_name': (audit_intern.model_names, 'model_type'),
+    'ip_address': (audit_intern.clients, 'client'),
+    'user_agent': (audit_intern.user_agents, 'agent'),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Compacta a tabela de AuditLog: move model_name, ip_address e '
+        'user_agent (texto repetido em cada linha) para tabelas de lookup '
+        'referenciadas por FK e remove as colunas antigas.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Linhas convertidas por lote (padrão: 5000)'
+        )
+        parser.add_argument(
+            '--keep-columns',
+            action='store_true',
+            help='Só preenche as FKs, sem remover as colunas antigas'
+        )
+
+    def handle(self, *args, **options):
+        table = AuditLog._meta.db_table
+
+        with connection.cursor() as cursor:
+            columns = {
+                column.name
+                for column in connection.introspection.get_table_description(cursor, table)
+            }
+
+        legacy = [column for column in LEGACY_COLUMNS if column in columns]
+        if not legacy:
+            self.stdout.write(self.style.SUCCESS('Tabela já compactada.'))
+            return
+
+        self.ensure_schema(columns)
+
+        total = self.convert_rows(table, legacy, options['batch_size'])
+        self.stdout.write(f'{total} log(s) convertido(s).')
+
+        if not options['keep_columns']:
+            self.drop_legacy(table, legacy)
+            self.stdout.write(f'Colunas removidas: {", ".join(legacy)}')
+
+        self.stdout.write(self.style.SUCCESS(
+            'Compactação concluída. Rode VACUUM (SQLite) para liberar o espaço em disco.'
+        ))
+
+    def ensure_schema(self, columns):
+        """Cria as tabelas de lookup e as colunas de FK que faltarem"""
+        existing_tables = set(connection.introspection.table_names())
+        missing_models = [
+            model for model in (AuditModelName, AuditClient, AuditUserAgent)
+            if model._meta.db_table not in existing_tables
+        ]
+        missing_fields = [
+            AuditLog._meta.get_field(name)
+            for _, name in LEGACY_COLUMNS.values()
+            if AuditLog._meta.get_field(name).column not in columns
+        ]
+
+        if not missing_models and not missing_fields:
+            return
+
+        with connection.schema_editor() as schema_editor:
+            for model in missing_models:
+                schema_editor.create_model(model)
+            for field in missing_fields:
+                schema_editor.add_field(AuditLog, field)
+
+    def convert_rows(self, table, legacy, batch_size):
+        """Preenche as FKs a partir das colunas antigas, em lotes por id"""
+        qn = connection.ops.quote_name
+        select = (
+            f'SELECT id, {", ".join(qn(column) for column in legacy)} '
+            f'FROM {qn(table)} WHERE id > %s ORDER BY id LIMIT %s'
+        )
+
+        total = 0
+        last_id = 0
+        while True:
+            with connection.cursor() as cursor:
+                cursor.execute(select, [last_id, batch_size])
+                rows = cursor.fetchall()
+
+            if not rows:
+                return total
+
+            with transaction.atomic():
+                for index, column in enumerate(legacy, start=1):
+                    lookup, fk_name = LEGACY_COLUMNS[column]
+                    fk_column = AuditLog._meta.get_field(fk_name).column
+
+                    ids = lookup.get_ids(row[index] for row in rows)
+
+                    # Um UPDATE por valor distinto do lote (são poucos)
+                    by_value = {}
+                    for row in rows:
+                        pk = ids.get(row[index])
+                        if pk is not None:
+                            by_value.setdefault(pk, []).append(row[0])
+
+                    with connection.cursor() as cursor:
+                        for pk, log_ids in by_value.items():
+                            placeholders = ', '.join(['%s'] * len(log_ids))
+                            cursor.execute(
+                                f'UPDATE {qn(table)} SET {qn(fk_column)} = %s '
+                                f'WHERE id IN ({placeholders})',
+                                [pk, *log_ids]
+                            )
+
+            total += len(rows)
+            last_id = rows[-1][0]
+
+    def drop_legacy(self, table, legacy):
+        """Remove índices das colunas antigas, as colunas, e cria os índices novos"""
+        qn = connection.ops.quote_name
+
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, table)
+
+            for name, info in constraints.items():
+                if info['primary_key'] or not info['index']:
+                    continue
+                if set(info['columns']) & set(legacy):
+                    cursor.execute(f'DROP INDEX {qn(name)}')
+
+            for column in legacy:
+                cursor.execute(f'ALTER TABLE {qn(table)} DROP COLUMN {qn(column)}')
+
+            # Índices declarados no Meta que ainda não existem (ex: model_type + object_id)
+            for index in AuditLog._meta.indexes:
+                if index.name not in constraints:
+                    fields = [AuditLog._meta.get_field(field).column for field in index.fields]
+                    cursor.execute(
+                        f'CREATE INDEX {qn(index.name)} ON {qn(table)} '
+                        f'({", ".join(qn(column) for column in fields)})'
+                    )
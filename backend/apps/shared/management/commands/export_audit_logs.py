@@ -0,0 +1,70 @@
+# apps/shared/management/commands/export_audit_logs.py
+
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime, parse_date
+
+from apps.shared.audit_export import EXPORT_FORMATS, gzip_stream, iter_export
+from apps.shared.models import AuditLog
+
+
+class Command(BaseCommand):
+    help = (
+        'Exporta os AuditLogs de uma organização/período em NDJSON ou CSV, '
+        'em streaming (memória constante), opcionalmente compactado em gzip.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--organization', type=int, required=True, help='ID da organização')
+        parser.add_argument('--since', help='Início (inclusivo), data ou data/hora ISO')
+        parser.add_argument('--until', help='Fim (exclusivo), data ou data/hora ISO')
+        parser.add_argument('--output-format', choices=list(EXPORT_FORMATS), default='ndjson')
+        parser.add_argument('--gzip', action='store_true', help='Compacta a saída em gzip')
+        parser.add_argument('--file', help='Arquivo de saída (padrão: stdout do comando)')
+
+    def parse_moment(self, value, option):
+        if not value:
+            return None
+
+        moment = parse_datetime(value)
+        if moment is None:
+            day = parse_date(value)
+            if day is None:
+                raise CommandError(f'{option} inválido: {value}')
+            moment = datetime.datetime.combine(day, datetime.time.min)
+
+        if timezone.is_naive(moment):
+            moment = timezone.make_aware(moment)
+        return moment
+
+    def handle(self, *args, **options):
+        queryset = AuditLog.objects.filter(organization_id=options['organization'])
+
+        since = self.parse_moment(options['since'], '--since')
+        until = self.parse_moment(options['until'], '--until')
+        if since:
+            queryset = queryset.filter(timestamp__gte=since)
+        if until:
+            queryset = queryset.filter(timestamp__lt=until)
+
+        stream = iter_export(queryset, options['output_format'])
+
+        if options['file']:
+            chunks = gzip_stream(stream) if options['gzip'] else (line.encode('utf-8') for line in stream)
+            with open(options['file'], 'wb') as fh:
+                for chunk in chunks:
+                    fh.write(chunk)
+        elif options['gzip']:
+            # gzip é binário: só no buffer de um stdout de verdade (não num StringIO)
+            out = getattr(self.stdout, 'buffer', None)
+            if out is None:
+                raise CommandError('--gzip sem --file precisa de uma saída binária; use --file.')
+            self.stdout.flush()
+            for chunk in gzip_stream(stream):
+                out.write(chunk)
+            out.flush()
+        else:
+            for line in stream:
+                self.stdout.write(line, ending='')
@@ -0,0 +1,51 @@
+# apps/shared/management/commands/purge_deleted.py
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.shared.purge import get_purge_config, purge_expired
+
+
+class Command(BaseCommand):
+    help = (
+        'Apaga de verdade (com CASCADE), em lotes pequenos, os objetos com '
+        'soft delete mais antigos que o prazo de retenção. Feito para rodar '
+        'em background (cron), fora do request que deletou.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=None,
+            help='Dias de retenção dos deletados (padrão: SOFT_DELETE["RETENTION_DAYS"])'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=None,
+            help='Objetos apagados por transação (padrão: SOFT_DELETE["PURGE_BATCH_SIZE"])'
+        )
+        parser.add_argument(
+            '--pause',
+            type=float,
+            default=None,
+            help='Segundos de pausa entre lotes (padrão: SOFT_DELETE["PURGE_PAUSE"])'
+        )
+
+    def handle(self, *args, **options):
+        config = get_purge_config()
+
+        days = config['RETENTION_DAYS'] if options['days'] is None else options['days']
+        if days < 0:
+            raise CommandError('--days não pode ser negativo')
+
+        batch_size = options['batch_size'] or config['BATCH_SIZE']
+        if batch_size < 1:
+            raise CommandError('--batch-size deve ser pelo menos 1')
+
+        results = purge_expired(days, batch_size, options['pause'])
+        for model, count in results:
+            self.stdout.write(f'  {model._meta.verbose_name_plural}: {count}')
+
+        total = sum(count for _, count in results)
+        self.stdout.write(self.style.SUCCESS(f'{total} objeto(s) apagado(s).'))
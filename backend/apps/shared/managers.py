@@ -1,29 +1,93 @@
 from django.db import models
+from django.utils import timezone
 
-class OrganizationScopedManager(models.Manager):
+
+class LiveParentsQuerySet(models.QuerySet):
     """
-    Manager que filtra automaticamente por organização e escritório.
+    QuerySet que esconde objetos cujo pai está na lixeira (soft delete):
+    eles só somem de verdade no purge, junto com o pai.
+    
+    Os pais vêm de `live_parents` no model: caminhos de FK para models de
+    soft delete (ex: 'fee_agreement__customer') ou o nome de uma FK
+    genérica (ex: 'content_object'), comparada com cada model de soft delete.
     
     Uso:
-        Customer.objects.for_request(request)
-        # Retorna só customers da org/office do request
+        class Payment(OrganizationScopedModel):
+            live_parents = ('fee_agreement__customer',)
+        
+        Payment.objects.with_live_parents()
+    """
+    
+    def with_live_parents(self):
+        queryset = self
+        for path in getattr(self.model, 'live_parents', ()):
+            generic = self._get_generic_parent(path)
+            if generic is None:
+                queryset = queryset.filter(**{f'{path}__is_deleted': False})
+            else:
+                condition = self._deleted_generic_parent(generic)
+                if condition is not None:
+                    queryset = queryset.exclude(condition)
+        return queryset
+    
+    def _get_generic_parent(self, name):
+        from django.contrib.contenttypes.fields import GenericForeignKey
+        
+        for field in self.model._meta.private_fields:
+            if isinstance(field, GenericForeignKey) and field.name == name:
+                return field
+        return None
+    
+    def _deleted_generic_parent(self, field):
+        """Q de "a FK genérica aponta para um objeto na lixeira" (ou None)"""
+        from django.apps import apps
+        from django.contrib.contenttypes.models import ContentType
+        from django.db.models import Exists, OuterRef, Q
+        from apps.shared.models import SoftDeleteModel
+        
+        soft_delete_models = [model for model in apps.get_models() if issubclass(model, SoftDeleteModel)]
+        condition = None
+        for model, content_type in ContentType.objects.get_for_models(*soft_delete_models).items():
+            deleted = model._base_manager.filter(pk=OuterRef(field.fk_field), is_deleted=True)
+            branch = Q(**{field.ct_field: content_type}) & Q(Exists(deleted))
+            condition = branch if condition is None else condition | branch
+        return condition
+
+
+class OrganizationScopedQuerySet(LiveParentsQuerySet):
+    """
+    QuerySet dos models com organização e escritório.
+    
+    Os filtros de tenant ficam aqui (e não só no manager) para encadear
+    com qualquer outro filtro, em qualquer ordem:
+        Process.objects.filter(phase='active').for_request(request)
+        Process.objects.for_request(request).select_related('customer')
+    
+    Os índices compostos (organization, office, <ordenação padrão>) dos
+    models cobrem o filtro de tenant e a ordenação na mesma busca.
+    for_request também esconde os filhos de pais na lixeira (live_parents).
     """
     
     def for_request(self, request):
         """
         Filtra por organização e escritório do request.
+        Usa só os ids (claims/cache), sem carregar os objetos.
         """
-        if not hasattr(request, 'organization') or not request.organization:
+        from apps.shared.tenant import get_tenant_ids
+        
+        organization_id, office_id = get_tenant_ids(request)
+        
+        if not organization_id:
             # Se não tem organização no request, retorna vazio (segurança)
             return self.none()
         
-        queryset = self.filter(organization=request.organization)
+        queryset = self.filter(organization_id=organization_id)
         
         # Se tem office no request, filtra também por office
-        if hasattr(request, 'office') and request.office:
-            queryset = queryset.filter(office=request.office)
+        if office_id:
+            queryset = queryset.filter(office_id=office_id)
         
-        return queryset
+        return queryset.with_live_parents()
     
     def for_organization(self, organization):
         """
@@ -37,9 +101,121 @@ class OrganizationScopedManager(models.Manager):
         Filtra por escritório específico.
         """
         return self.filter(office=office)
+    
+    def audited_update(self, batch_size=500, **fields):
+        """
+        update() com auditoria: UPDATE por pk em blocos de batch_size (sem
+        um IN com todos os ids de uma vez), numa transação, e um AuditLog
+        compacto por organização (ids afetados + campos alterados), em vez
+        de save() objeto a objeto.
+        
+        Uso (ex: actions do admin):
+            count = queryset.audited_update(phase='archived', is_active=False)
+        
+        Models não registrados na auditoria ficam sem o AuditLog, mas o
+        resto vale igual: updated_at (ETag das listagens) e nova versão no
+        cache de respostas. Use no lugar de update() sempre que a API
+        listar o model.
+        """
+        from django.db import transaction
+        from apps.shared.audit import audit_registry
+        
+        # update() não aplica auto_now: mantém updated_at (ETag das listagens)
+        values = dict(fields)
+        if any(field.name == 'updated_at' for field in self.model._meta.concrete_fields):
+            values.setdefault('updated_at', timezone.now())
+        
+        with transaction.atomic():
+            rows = list(self.values_list('pk', 'organization_id', 'office_id'))
+            if not rows:
+                return 0
+            
+            count = 0
+            updated = self.model._base_manager.all()
+            for start in range(0, len(rows), batch_size):
+                count += updated.filter(
+                    pk__in=[pk for pk, _, _ in rows[start:start + batch_size]]
+                ).update(**values)
+            
+            if audit_registry.is_registered(self.model):
+                from apps.shared.signals import audit_bulk_update
+                audit_bulk_update(self.model, rows, fields)
+            
+            # update() não dispara post_save: invalida o cache de respostas aqui
+            from apps.shared.response_cache import response_cache
+            if response_cache.active:
+                for organization_id in {organization_id for _, organization_id, _ in rows}:
+                    response_cache.bump_on_commit(organization_id, self.model)
+        
+        return count
+
 
+class LiveParentsManager(models.Manager.from_queryset(LiveParentsQuerySet)):
+    """
+    Manager de models sem tenant próprio que dependem de pais com soft
+    delete (ex: ProcessParty). Ver LiveParentsQuerySet.
+    """
 
-class SoftDeleteManager(models.Manager):
+
+class OrganizationScopedManager(models.Manager.from_queryset(OrganizationScopedQuerySet)):
+    """
+    Manager que filtra automaticamente por organização e escritório.
+    
+    Os filtros de tenant vêm do OrganizationScopedQuerySet, então funcionam
+    no manager e em qualquer ponto da cadeia.
+    
+    Uso:
+        Customer.objects.for_request(request)
+        # Retorna só customers da org/office do request
+        
+        Customer.objects.filter(is_active=True).for_request(request)
+    """
+
+
+class SoftDeleteQuerySet(models.QuerySet):
+    """
+    QuerySet de models com soft delete.
+    
+    delete() só marca (is_deleted/deleted_at), com um único UPDATE; as
+    linhas somem das consultas do manager e são apagadas de verdade depois,
+    em lotes, pelo purge (manage.py purge_deleted).
+    """
+    
+    def _mark_deleted(self, **fields):
+        return self.update(**fields)
+    
+    def delete(self):
+        """Soft delete em massa (retorna a quantidade marcada)"""
+        return self._mark_deleted(is_deleted=True, deleted_at=timezone.now())
+    
+    delete.alters_data = True
+    delete.queryset_only = True
+    
+    def restore(self):
+        """Desfaz o soft delete"""
+        return self._mark_deleted(is_deleted=False, deleted_at=None)
+    
+    restore.alters_data = True
+    
+    def hard_delete(self):
+        """DELETE de verdade (com CASCADE)"""
+        return super().delete()
+    
+    hard_delete.alters_data = True
+    hard_delete.queryset_only = True
+
+
+class OrganizationScopedSoftDeleteQuerySet(SoftDeleteQuerySet, OrganizationScopedQuerySet):
+    """
+    Soft delete + filtros de tenant. A marcação passa por audited_update
+    (AuditLog e invalidação do cache de respostas).
+    """
+    
+    def _mark_deleted(self, **fields):
+        return self.audited_update(**fields)
+
+
+class SoftDeleteManager(models.Manager.from_queryset(SoftDeleteQuerySet)):
     """
     Manager que exclui automaticamente itens deletados (soft delete).
     """
@@ -54,4 +230,15 @@ class SoftDeleteManager(models.Manager):
     
     def deleted_only(self):
         """Retorna só os deletados"""
-        return super().get_queryset().filter(is_deleted=True)
\ No newline at end of file
+        return super().get_queryset().filter(is_deleted=True)
+
+
+class OrganizationScopedSoftDeleteManager(SoftDeleteManager.from_queryset(OrganizationScopedSoftDeleteQuerySet)):
+    """
+    Manager dos models com organização/escritório e soft delete.
+    
+    Uso:
+        Customer.objects.for_request(request)      # só os não deletados
+        Customer.objects.with_deleted()            # inclui deletados
+        Customer.objects.filter(pk=1).delete()     # soft delete
+    """
@@ -0,0 +1,137 @@
+# apps/shared/membership_cache.py
+
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from apps.memberships.models import Membership
+from apps.offices.models import Office
+from apps.organizations.models import Organization
+
+
+class MembershipCache:
+    """
+    Cache LRU + TTL, local ao processo, do membership ativo de cada usuário.
+
+    Guarda o Membership já com organization e office carregados, evitando
+    o JOIN em memberships a cada request autenticado.
+
+    Uso:
+        membership = membership_cache.get(request.user.pk)
+    """
+
+    def __init__(self, max_size=1024, ttl=300):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def load(self, user_id):
+        """Busca o membership ativo no banco (usado em caso de miss)"""
+        return Membership.objects.filter(
+            user_id=user_id,
+            is_active=True
+        ).select_related('organization', 'office').first()
+
+    def get(self, user_id):
+        """
+        Retorna o membership ativo do usuário (ou None).
+
+        Cada chamada recebe uma cópia, para que alterações feitas durante
+        um request não vazem para os próximos.
+        """
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[1] > now:
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return copy.deepcopy(entry[0])
+            self.misses += 1
+            generation = self._generation
+
+        membership = self.load(user_id)
+
+        with self._lock:
+            # Se houve invalidação durante a consulta, não guarda valor possivelmente velho
+            if generation == self._generation:
+                self._entries[user_id] = (membership, now + self.ttl)
+                self._entries.move_to_end(user_id)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+
+        return copy.deepcopy(membership)
+
+    def invalidate(self, user_id):
+        """Remove o membership de um usuário"""
+        with self._lock:
+            self._generation += 1
+            self._entries.pop(user_id, None)
+
+    def invalidate_where(self, predicate):
+        """Remove todos os memberships que satisfazem o predicado"""
+        with self._lock:
+            self._generation += 1
+            for user_id, (membership, _) in list(self._entries.items()):
+                if membership is not None and predicate(membership):
+                    del self._entries[user_id]
+
+    def clear(self):
+        """Limpa o cache e zera os contadores"""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """Contadores de hit/miss para monitoramento"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self._entries),
+                'hit_rate': self.hits / total if total else 0.0,
+            }
+
+
+_config = getattr(settings, 'MEMBERSHIP_CACHE', {})
+
+membership_cache = MembershipCache(
+    max_size=_config.get('MAX_SIZE', 1024),
+    ttl=_config.get('TTL', 300),
+)
+
+
+# ===== INVALIDAÇÃO =====
+
+@receiver([post_save, post_delete], sender=Membership, dispatch_uid='membership_cache_membership')
+def invalidate_membership(sender, instance, **kwargs):
+    membership_cache.invalidate(instance.user_id)
+
+
+@receiver([post_save, post_delete], sender=Office, dispatch_uid='membership_cache_office')
+def invalidate_office(sender, instance, **kwargs):
+    membership_cache.invalidate_where(lambda m: m.office_id == instance.pk)
+
+
+@receiver([post_save, post_delete], sender=Organization, dispatch_uid='membership_cache_organization')
+def invalidate_organization(sender, instance, **kwargs):
+    membership_cache.invalidate_where(lambda m: m.organization_id == instance.pk)
+
+
+@receiver([post_save, post_delete], sender=get_user_model(), dispatch_uid='membership_cache_user')
+def invalidate_user(sender, instance, **kwargs):
+    # Usuário desativado/removido não deve continuar resolvendo tenant pelo cache
+    membership_cache.invalidate(instance.pk)
@@ -1,39 +1,52 @@
-from apps.memberships.models import Membership
-import threading
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.utils.functional import SimpleLazyObject
+
+from apps.shared.request_context import request_context
+from apps.shared.tenant import TenantContext
 
 class OrganizationMiddleware:
     """
     Middleware que injeta organização e escritório no request.
+    
+    request.organization, request.office e request.membership são lazy:
+    o membership só é resolvido no primeiro acesso. request.tenant
+    (TenantContext) expõe também ids e papel, que em requests com access
+    token JWT vêm direto dos claims.
+    
+    Funciona em modo síncrono (WSGI) e assíncrono (ASGI). Em views
+    assíncronas, use `await request.tenant.aload()` antes de acessar os
+    objetos, pois a resolução pode consultar o banco.
     """
+    sync_capable = True
+    async_capable = True
     
     def __init__(self, get_response):
         self.get_response = get_response
+        
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
     
     def __call__(self, request):
-        # Inicializa como None
-        request.organization = None
-        request.office = None
-        request.membership = None
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
         
-        # Se usuário está autenticado
-        if request.user.is_authenticated:
-            membership = Membership.objects.filter(
-                user=request.user,
-                is_active=True
-            ).select_related('organization', 'office').first()
-            
-            if membership:
-                request.organization = membership.organization
-                request.office = membership.office
-                request.membership = membership
+        self.process_request(request)
         
-        # ⭐ Adicionar request no thread local (para signals)
-        threading.current_thread().request = request
-        
-        response = self.get_response(request)
+        # Request disponível para os signals durante a view
+        with request_context(request):
+            return self.get_response(request)
+    
+    async def __acall__(self, request):
+        self.process_request(request)
         
-        # Limpar request do thread
-        if hasattr(threading.current_thread(), 'request'):
-            delattr(threading.current_thread(), 'request')
+        with request_context(request):
+            return await self.get_response(request)
+    
+    def process_request(self, request):
+        """Anexa o tenant (lazy) ao request. Não acessa o banco."""
+        tenant = TenantContext(request)
         
-        return response
\ No newline at end of file
+        request.tenant = tenant
+        request.organization = SimpleLazyObject(lambda: tenant.organization)
+        request.office = SimpleLazyObject(lambda: tenant.office)
+        request.membership = SimpleLazyObject(lambda: tenant.membership)
@@ -1,6 +1,11 @@
 # apps/shared/models.py
 
+import copy
+
 from django.db import models
+from django.utils import timezone
+
+from apps.shared.audit import audit_registry
 
 class TimestampedModel(models.Model):
     """Adiciona timestamps automáticos"""
@@ -11,7 +16,61 @@ class TimestampedModel(models.Model):
         abstract = True
 
 
-class OrganizationScopedModel(TimestampedModel):
+def _snapshot_value(value):
+    # JSONField devolve dict/list mutáveis: copia para o diff enxergar alterações in-place
+    if isinstance(value, (dict, list)):
+        return copy.deepcopy(value)
+    return value
+
+
+class AuditSnapshotModel(models.Model):
+    """
+    Guarda os valores das colunas (attname) como vieram do banco.
+    
+    A auditoria compara o estado atual com esse snapshot, sem precisar
+    buscar a versão antiga do objeto nem carregar FKs. Só models auditados
+    (audit_registry) ou com `snapshot_fields` guardam snapshot, e só das
+    colunas que entram no diff (+ snapshot_fields): os demais carregam
+    sem custo extra por linha.
+    """
+    
+    # Campos guardados no snapshot mesmo sem auditoria (opt-in)
+    snapshot_fields = None
+    
+    class Meta:
+        abstract = True
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        attnames = audit_registry.get_snapshot_attnames(cls)
+        if attnames is not None:
+            # field_names só traz os campos carregados (sem os deferidos)
+            instance._audit_snapshot = {
+                name: _snapshot_value(value)
+                for name, value in zip(field_names, values)
+                if name in attnames
+            }
+        return instance
+    
+    def refresh_audit_snapshot(self):
+        """Atualiza o snapshot com os valores atuais (após salvar)"""
+        attnames = audit_registry.get_snapshot_attnames(type(self))
+        if attnames is None:
+            return
+        deferred = self.get_deferred_fields()
+        self._audit_snapshot = {
+            field.attname: _snapshot_value(getattr(self, field.attname))
+            for field in self._meta.concrete_fields
+            if field.attname in attnames and field.attname not in deferred
+        }
+    
+    def get_audit_snapshot(self):
+        """Snapshot atual (None para objetos que não vieram do banco ou sem snapshot)"""
+        return getattr(self, '_audit_snapshot', None)
+
+
+class OrganizationScopedModel(AuditSnapshotModel, TimestampedModel):
     """
     Base para models que pertencem a organização + escritório.
     
@@ -37,17 +96,126 @@ class OrganizationScopedModel(TimestampedModel):
 
 
 class SoftDeleteModel(models.Model):
-    """Soft delete"""
+    """
+    Soft delete: delete() só marca o objeto; o CASCADE de verdade fica para
+    o purge (manage.py purge_deleted), depois do prazo de retenção.
+    
+    Nos models concretos, use índices parciais (condition=Q(is_deleted=False))
+    para as consultas do dia a dia não passarem pelas linhas deletadas.
+    """
     is_deleted = models.BooleanField('Deletado', default=False)
     deleted_at = models.DateTimeField('Deletado em', null=True, blank=True)
     
     class Meta:
         abstract = True
+    
+    def _save_deleted(self):
+        fields = ['is_deleted', 'deleted_at']
+        if hasattr(self, 'updated_at'):
+            fields.append('updated_at')
+        self.save(update_fields=fields)
+    
+    def delete(self, using=None, keep_parents=False):
+        """Soft delete (post_save: auditoria registra como deleção)"""
+        if self.is_deleted:
+            return 0, {}
+        self.is_deleted = True
+        self.deleted_at = timezone.now()
+        self._save_deleted()
+        return 1, {self._meta.label: 1}
+    
+    delete.alters_data = True
+    
+    def restore(self):
+        """Desfaz o soft delete"""
+        self.is_deleted = False
+        self.deleted_at = None
+        self._save_deleted()
+    
+    restore.alters_data = True
+    
+    def hard_delete(self, using=None, keep_parents=False):
+        """DELETE de verdade (com CASCADE)"""
+        return super().delete(using=using, keep_parents=keep_parents)
+    
+    hard_delete.alters_data = True
+
+# ===== TABELAS DE LOOKUP DA AUDITORIA =====
+# Valores muito repetidos nos logs ficam uma vez só, referenciados por FK
+# (ver apps.shared.audit_intern)
+
+class AuditModelName(models.Model):
+    """Nome de model auditado"""
+    name = models.CharField('Nome', max_length=100, unique=True)
+    
+    class Meta:
+        verbose_name = 'Model auditado'
+        verbose_name_plural = 'Models auditados'
+    
+    def __str__(self):
+        return self.name
+
+
+class AuditClient(models.Model):
+    """Endereço IP de origem"""
+    ip_address = models.GenericIPAddressField('IP', unique=True)
+    
+    class Meta:
+        verbose_name = 'Cliente'
+        verbose_name_plural = 'Clientes'
+    
+    def __str__(self):
+        return self.ip_address
+
+
+class AuditUserAgent(models.Model):
+    """User agent (único pelo hash SHA-256)"""
+    value_hash = models.CharField('Hash', max_length=64, unique=True)
+    value = models.TextField('User Agent')
+    
+    class Meta:
+        verbose_name = 'User Agent'
+        verbose_name_plural = 'User Agents'
+    
+    def __str__(self):
+        return self.value[:100]
+
+
+def _interned_property(attr, fk, table_name):
+    """
+    Property de leitura/escrita para um valor internado.
+    
+    Escrita guarda o valor pendente (resolvido para FK no save()/bulk
+    do audit_writer); leitura usa o objeto relacionado, se carregado,
+    ou o cache de lookup.
+    """
+    def getter(self):
+        if attr in self.__dict__:
+            return self.__dict__[attr]
+        
+        from apps.shared import audit_intern
+        
+        field = self._meta.get_field(fk)
+        if field.is_cached(self):
+            related = field.get_cached_value(self)
+            return getattr(related, getattr(audit_intern, table_name).value_field) if related else None
+        return getattr(audit_intern, table_name).get_value(getattr(self, field.attname))
+    
+    def setter(self, value):
+        self.__dict__[attr] = value
+    
+    return property(getter, setter)
+
 
 class AuditLog(models.Model):
     """
     Log de auditoria de todas as ações no sistema
     registra quem fez o que e quando.
+    
+    model_name, ip_address e user_agent são internados em tabelas de
+    lookup (model_type, client, agent); continuam aceitos no construtor:
+        AuditLog(model_name='Process', ip_address='10.0.0.1', ...)
+    Para filtrar, use os relacionamentos (model_type__name='Process').
     """
 
     ACTION_CHOICES = [
@@ -95,10 +263,14 @@ class AuditLog(models.Model):
         choices=ACTION_CHOICES
     )
     
-    model_name = models.CharField(
-        'Model',
-        max_length=100,
-        help_text='Nome do model afetado'
+    model_type = models.ForeignKey(
+        AuditModelName,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name='Model',
+        help_text='Model afetado'
     )
     
     object_id = models.PositiveIntegerField(
@@ -122,21 +294,30 @@ class AuditLog(models.Model):
         help_text='Detalhes das alterações (antes/depois)'
     )
     
-    ip_address = models.GenericIPAddressField(
-        'IP',
+    client = models.ForeignKey(
+        AuditClient,
+        on_delete=models.PROTECT,
         null=True,
-        blank=True
+        blank=True,
+        related_name='+',
+        verbose_name='IP'
     )
     
-    user_agent = models.TextField(
-        'User Agent',
-        blank=True
+    agent = models.ForeignKey(
+        AuditUserAgent,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name='User Agent'
     )
     
     # Quando
+    # Default (e não auto_now_add): a hora é a do evento, não a da gravação em lote
     timestamp = models.DateTimeField(
         'Data/Hora',
-        auto_now_add=True,
+        default=timezone.now,
+        editable=False,
         db_index=True
     )
     
@@ -147,8 +328,18 @@ class AuditLog(models.Model):
         indexes = [
             models.Index(fields=['organization', 'timestamp']),
             models.Index(fields=['user', 'timestamp']),
-            models.Index(fields=['model_name', 'object_id']),
+            models.Index(fields=['model_type', 'object_id']),
         ]
     
+    model_name = _interned_property('_model_name', 'model_type', 'model_names')
+    ip_address = _interned_property('_ip_address', 'client', 'clients')
+    user_agent = _interned_property('_user_agent', 'agent', 'user_agents')
+    
+    def save(self, *args, **kwargs):
+        """Resolve os valores internados antes de gravar"""
+        from apps.shared.audit_intern import resolve_interned
+        resolve_interned([self])
+        super().save(*args, **kwargs)
+    
     def __str__(self):
         return f"{self.user} - {self.get_action_display()} - {self.model_name} - {self.timestamp}"
\ No newline at end of file
@@ -1,89 +1,284 @@
 # apps/shared/permissions.py
 
+import enum
+import threading
+import time
+
+from django.conf import settings
 from django.core.exceptions import PermissionDenied
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from apps.memberships.models import Membership
+from apps.organizations.models import Organization
+
+
+class Capability(enum.IntFlag):
+    """Capacidades verificáveis (um bit cada)"""
+    ORGANIZATION_ADMIN = enum.auto()
+    OFFICE_ADMIN = enum.auto()
+    MANAGE_CUSTOMERS = enum.auto()
+    MANAGE_PROCESSES = enum.auto()
+    VIEW_CONFIDENTIAL = enum.auto()
+
+
+NO_CAPABILITIES = Capability(0)
+
+# Capacidades de cada papel (Membership.role).
+# Papéis de Membership.ROLE_CHOICES ausentes aqui não têm capacidades.
+ROLE_CAPABILITIES = {
+    'org_admin': [
+        'organization_admin',
+        'office_admin',
+        'manage_customers',
+        'manage_processes',
+        'view_confidential',
+    ],
+    'office_admin': [
+        'office_admin',
+        'manage_customers',
+        'manage_processes',
+        'view_confidential',
+    ],
+    'lawyer': [
+        'manage_customers',
+        'manage_processes',
+        'view_confidential',
+    ],
+    'intern': [],
+    'accountant': [],
+    'finance': [],
+    'guest': [],
+}
+
+
+def to_capability(names):
+    """Converte nomes de capacidades ('manage_customers', ...) em bitmask"""
+    mask = NO_CAPABILITIES
+    for name in names:
+        try:
+            mask |= Capability[name.upper()]
+        except KeyError:
+            raise ValueError(f"Capacidade desconhecida: {name!r}") from None
+    return mask
+
+
+def compile_role_capabilities(table):
+    """
+    Compila a tabela declarativa em {papel: bitmask}.
+    
+    Feito uma vez no import; papéis fora de Membership.ROLE_CHOICES são erro
+    de configuração.
+    """
+    roles = {role for role, _ in Membership.ROLE_CHOICES}
+    
+    unknown = set(table) - roles
+    if unknown:
+        raise ValueError(f"Papéis desconhecidos em ROLE_CAPABILITIES: {sorted(unknown)}")
+    
+    return {role: to_capability(table.get(role, ())) for role in sorted(roles)}
+
+
+ROLE_MASKS = compile_role_capabilities(ROLE_CAPABILITIES)
+
+
+# ===== OVERRIDES POR ORGANIZAÇÃO =====
+
+def compile_overrides(org_settings):
+    """
+    Compila os overrides de Organization.settings['permissions'].
+    
+    Formato:
+        {'permissions': {'intern': {'grant': ['manage_customers'], 'revoke': []}}}
+    
+    Retorna {papel: bitmask} apenas para os papéis alterados.
+    Overrides inválidos são ignorados (não podem derrubar o request).
+    """
+    overrides = (org_settings or {}).get('permissions') or {}
+    if not isinstance(overrides, dict):
+        return {}
+    
+    masks = {}
+    for role, change in overrides.items():
+        if role not in ROLE_MASKS or not isinstance(change, dict):
+            continue
+        try:
+            grant = to_capability(change.get('grant', ()))
+            revoke = to_capability(change.get('revoke', ()))
+        except (TypeError, ValueError, AttributeError):
+            continue
+        masks[role] = (ROLE_MASKS[role] | grant) & ~revoke
+    
+    return masks
+
+
+class OrganizationCapabilityCache:
+    """
+    Cache (por processo, com TTL) dos overrides compilados de cada organização.
+    
+    Sem overrides, a verificação é só o bitmask de ROLE_MASKS.
+    """
+    
+    def __init__(self, ttl=300):
+        self.ttl = ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+    
+    def get(self, organization_id, organization=None):
+        """
+        Overrides compilados da organização.
+        
+        Se o objeto Organization já estiver carregado, usa seus settings
+        em vez de consultar o banco.
+        """
+        if organization_id is None:
+            return {}
+        
+        now = time.monotonic()
+        entry = self._entries.get(organization_id)
+        if entry is not None and entry[1] > now:
+            return entry[0]
+        
+        if organization is not None:
+            org_settings = organization.settings
+        else:
+            org_settings = Organization.objects.filter(
+                pk=organization_id
+            ).values_list('settings', flat=True).first()
+        
+        masks = compile_overrides(org_settings)
+        with self._lock:
+            self._entries[organization_id] = (masks, now + self.ttl)
+        return masks
+    
+    def invalidate(self, organization_id):
+        with self._lock:
+            self._entries.pop(organization_id, None)
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+organization_capabilities = OrganizationCapabilityCache(
+    ttl=getattr(settings, 'CAPABILITY_OVERRIDES', {}).get('TTL', 300),
+)
+
+
+@receiver([post_save, post_delete], sender=Organization, dispatch_uid='permissions_organization_overrides')
+def invalidate_organization_capabilities(sender, instance, **kwargs):
+    organization_capabilities.invalidate(instance.pk)
+
+
+def get_role_capabilities(role, organization_id=None, organization=None):
+    """
+    Bitmask de capacidades de um papel (com overrides da organização).
+    """
+    overrides = organization_capabilities.get(organization_id, organization)
+    if role in overrides:
+        return overrides[role]
+    return ROLE_MASKS.get(role, NO_CAPABILITIES)
+
+
+def get_request_capabilities(request):
+    """
+    Capacidades do usuário no tenant do request.
+    
+    Calculadas uma única vez por request, a partir do papel já resolvido
+    (claims JWT ou request.membership), e reaproveitadas por todas as
+    verificações de permissão. Não acessa o banco (exceto para carregar os
+    overrides de uma organização ainda fora do cache).
+    """
+    from apps.shared.tenant import TenantContext, get_request_role, get_tenant_ids
+    
+    # Guarda no TenantContext (compartilhado entre HttpRequest e Request do DRF)
+    holder = getattr(request, 'tenant', None)
+    if not isinstance(holder, TenantContext):
+        holder = request
+    
+    capabilities = getattr(holder, '_capabilities', None)
+    if capabilities is None:
+        organization = None
+        if isinstance(holder, TenantContext) and holder._membership_loaded and holder._membership:
+            organization = holder._membership.organization
+        
+        capabilities = get_role_capabilities(
+            get_request_role(request),
+            get_tenant_ids(request)[0],
+            organization,
+        )
+        holder._capabilities = capabilities
+    
+    return capabilities
+
 
 class BasePermission:
     """
     Base para permissões customizadas.
+    
+    `capability` é a capacidade exigida (ver Capability/ROLE_CAPABILITIES).
     """
+    capability = NO_CAPABILITIES
     
     def has_permission(self, user, organization=None, office=None):
-        """Verifica se usuário tem permissão genérica"""
-        return False
+        """Verifica se usuário tem permissão genérica (consulta o membership)"""
+        if not self.capability:
+            return False
+        
+        organization_id = getattr(organization, 'pk', organization)
+        roles = Membership.objects.filter(
+            user=user,
+            organization_id=organization_id,
+            is_active=True
+        ).values_list('role', flat=True)
+        
+        return any(
+            get_role_capabilities(role, organization_id) & self.capability
+            for role in roles
+        )
     
     def has_object_permission(self, user, obj):
         """Verifica se usuário tem permissão sobre objeto específico"""
         return False
+    
+    def has_request_permission(self, request):
+        """Verifica pelas capacidades do request, sem acessar o banco"""
+        if not self.capability:
+            return False
+        return bool(get_request_capabilities(request) & self.capability)
+    
+    def has_object_request_permission(self, request, obj):
+        """Verifica sobre um objeto pelas capacidades do request"""
+        from apps.shared.tenant import get_tenant_ids
+        
+        if obj.organization_id != get_tenant_ids(request)[0]:
+            return False
+        return self.has_request_permission(request)
 
 
 class IsOrganizationAdmin(BasePermission):
     """Apenas Organization Admin"""
-    
-    def has_permission(self, user, organization=None, office=None):
-        from apps.memberships.models import Membership
-        
-        return Membership.objects.filter(
-            user=user,
-            organization=organization,
-            role='org_admin',
-            is_active=True
-        ).exists()
+    capability = Capability.ORGANIZATION_ADMIN
 
 
 class IsOfficeAdmin(BasePermission):
     """Organization Admin ou Office Admin"""
-    
-    def has_permission(self, user, organization=None, office=None):
-        from apps.memberships.models import Membership
-        
-        return Membership.objects.filter(
-            user=user,
-            organization=organization,
-            role__in=['org_admin', 'office_admin'],
-            is_active=True
-        ).exists()
+    capability = Capability.OFFICE_ADMIN
 
 
 class CanManageCustomers(BasePermission):
     """Pode gerenciar clientes"""
-    
-    def has_permission(self, user, organization=None, office=None):
-        from apps.memberships.models import Membership
-        
-        return Membership.objects.filter(
-            user=user,
-            organization=organization,
-            role__in=['org_admin', 'office_admin', 'lawyer'],
-            is_active=True
-        ).exists()
+    capability = Capability.MANAGE_CUSTOMERS
 
 
 class CanManageProcesses(BasePermission):
     """Pode gerenciar processos"""
-    
-    def has_permission(self, user, organization=None, office=None):
-        from apps.memberships.models import Membership
-        
-        return Membership.objects.filter(
-            user=user,
-            organization=organization,
-            role__in=['org_admin', 'office_admin', 'lawyer'],
-            is_active=True
-        ).exists()
+    capability = Capability.MANAGE_PROCESSES
 
 
 class CanViewConfidential(BasePermission):
     """Pode ver documentos/processos confidenciais"""
-    
-    def has_permission(self, user, organization=None, office=None):
-        from apps.memberships.models import Membership
-        
-        return Membership.objects.filter(
-            user=user,
-            organization=organization,
-            role__in=['org_admin', 'office_admin', 'lawyer'],
-            is_active=True
-        ).exists()
+    capability = Capability.VIEW_CONFIDENTIAL
     
     def has_object_permission(self, user, obj):
         """Verifica se pode ver este objeto específico"""
@@ -92,13 +287,15 @@ class CanViewConfidential(BasePermission):
             return True
         
         # Se é confidencial, precisa ser admin ou lawyer
-        from apps.memberships.models import Membership
-        return Membership.objects.filter(
-            user=user,
-            organization=obj.organization,
-            role__in=['org_admin', 'office_admin', 'lawyer'],
-            is_active=True
-        ).exists()
+        return self.has_permission(user, obj.organization_id)
+    
+    def has_object_request_permission(self, request, obj):
+        """Mesma regra, usando as capacidades já calculadas do request"""
+        # Quem tem a capacidade não depende do objeto (só do tenant)
+        if self.has_request_permission(request):
+            return super().has_object_request_permission(request, obj)
+        
+        return hasattr(obj, 'is_confidential') and not obj.is_confidential
 
 
 # Helper function
@@ -109,10 +306,27 @@ def check_permission(user, permission_class, organization=None, office=None, obj
     Uso:
         if check_permission(request.user, CanManageCustomers, request.organization):
             # faz algo
+    
+    Dentro de um request, prefira check_request_permission (sem consultas).
     """
     permission = permission_class()
     
     if obj:
         return permission.has_object_permission(user, obj)
     else:
-        return permission.has_permission(user, organization, office)
\ No newline at end of file
+        return permission.has_permission(user, organization, office)
+
+
+def check_request_permission(request, permission_class, obj=None):
+    """
+    Verifica permissão usando as capacidades do request.
+    
+    Uso:
+        if check_request_permission(request, CanManageCustomers):
+            # faz algo
+    """
+    permission = permission_class()
+    
+    if obj is not None:
+        return permission.has_object_request_permission(request, obj)
+    return permission.has_request_permission(request)
@@ -17,12 +17,7 @@ class IsOrganizationAdminPermission(permissions.BasePermission):
         if not request.user.is_authenticated:
             return False
         
-        permission = IsOrganizationAdmin()
-        return permission.has_permission(
-            request.user,
-            request.organization,
-            request.office
-        )
+        return IsOrganizationAdmin().has_request_permission(request)
 
 
 class IsOfficeAdminPermission(permissions.BasePermission):
@@ -35,12 +30,7 @@ class IsOfficeAdminPermission(permissions.BasePermission):
         if not request.user.is_authenticated:
             return False
         
-        permission = IsOfficeAdmin()
-        return permission.has_permission(
-            request.user,
-            request.organization,
-            request.office
-        )
+        return IsOfficeAdmin().has_request_permission(request)
 
 
 class CanManageCustomersPermission(permissions.BasePermission):
@@ -58,12 +48,7 @@ class CanManageCustomersPermission(permissions.BasePermission):
             return True
         
         # Escrita: org_admin, office_admin, lawyer
-        permission = CanManageCustomers()
-        return permission.has_permission(
-            request.user,
-            request.organization,
-            request.office
-        )
+        return CanManageCustomers().has_request_permission(request)
 
 
 class CanManageProcessesPermission(permissions.BasePermission):
@@ -79,12 +64,7 @@ class CanManageProcessesPermission(permissions.BasePermission):
         if request.method in permissions.SAFE_METHODS:
             return True
         
-        permission = CanManageProcesses()
-        return permission.has_permission(
-            request.user,
-            request.organization,
-            request.office
-        )
+        return CanManageProcesses().has_request_permission(request)
 
 
 class CanViewConfidentialPermission(permissions.BasePermission):
@@ -97,5 +77,4 @@ class CanViewConfidentialPermission(permissions.BasePermission):
         if not request.user.is_authenticated:
             return False
         
-        permission = CanViewConfidential()
-        return permission.has_object_permission(request.user, obj)
\ No newline at end of file
+        return CanViewConfidential().has_object_request_permission(request, obj)
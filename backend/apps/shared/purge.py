@@ -0,0 +1,78 @@
+# apps/shared/purge.py
+
+import datetime
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+
+def get_purge_config():
+    """SOFT_DELETE de settings, com os padrões"""
+    config = getattr(settings, 'SOFT_DELETE', {})
+    return {
+        'RETENTION_DAYS': config.get('RETENTION_DAYS', 30),
+        'BATCH_SIZE': config.get('PURGE_BATCH_SIZE', 200),
+        'PAUSE': config.get('PURGE_PAUSE', 0.0),
+    }
+
+
+def soft_delete_models():
+    """Models concretos com soft delete (SoftDeleteModel)"""
+    from django.apps import apps
+    from apps.shared.models import SoftDeleteModel
+
+    return [model for model in apps.get_models() if issubclass(model, SoftDeleteModel)]
+
+
+def purge_cutoff(retention_days, now=None):
+    """Deletados antes deste instante já podem ser apagados de verdade"""
+    return (now or timezone.now()) - datetime.timedelta(days=retention_days)
+
+
+def purge_model(model, cutoff, batch_size=200, pause=0.0):
+    """
+    Apaga de verdade (com CASCADE) os objetos de `model` deletados antes de
+    `cutoff`, em lotes pequenos: cada lote é uma transação curta, então o
+    CASCADE nunca segura locks por muito tempo. `pause` (segundos) entre
+    lotes alivia o banco em horário de uso.
+
+    Retorna a quantidade de objetos de `model` apagados.
+    """
+    expired = model.objects.deleted_only().filter(
+        deleted_at__lt=cutoff
+    ).order_by('deleted_at', 'pk')
+
+    total = 0
+    while True:
+        pks = list(expired.values_list('pk', flat=True)[:batch_size])
+        if not pks:
+            return total
+
+        with transaction.atomic():
+            model.objects.with_deleted().filter(pk__in=pks).hard_delete()
+
+        total += len(pks)
+        if pause:
+            time.sleep(pause)
+
+
+def purge_expired(retention_days=None, batch_size=None, pause=None, models=None):
+    """
+    Purge de todos os models com soft delete.
+    Retorna [(model, quantidade), ...]
+    """
+    config = get_purge_config()
+    if retention_days is None:
+        retention_days = config['RETENTION_DAYS']
+    if batch_size is None:
+        batch_size = config['BATCH_SIZE']
+    if pause is None:
+        pause = config['PAUSE']
+
+    cutoff = purge_cutoff(retention_days)
+    return [
+        (model, purge_model(model, cutoff, batch_size, pause))
+        for model in (models or soft_delete_models())
+    ]
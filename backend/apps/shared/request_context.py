@@ -0,0 +1,42 @@
+# apps/shared/request_context.py
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Request atual (usado pelos signals de auditoria).
+# ContextVar funciona tanto em WSGI (uma thread por request) quanto em ASGI
+# (várias corrotinas na mesma thread); o asgiref propaga o contexto para as
+# views síncronas executadas via sync_to_async.
+_current_request = ContextVar('current_request', default=None)
+
+
+def get_current_request():
+    """Retorna o request atual (ou None fora de um request)"""
+    return _current_request.get()
+
+
+def set_current_request(request):
+    """Define o request atual. Retorna o token para reset_current_request()"""
+    return _current_request.set(request)
+
+
+def reset_current_request(token):
+    """Restaura o request anterior"""
+    _current_request.reset(token)
+
+
+@contextmanager
+def request_context(request):
+    """
+    Define o request atual durante o bloco, restaurando ao sair
+    (mesmo se houver exceção).
+    
+    Uso:
+        with request_context(request):
+            customer.save()  # auditoria enxerga o request
+    """
+    token = set_current_request(request)
+    try:
+        yield request
+    finally:
+        reset_current_request(token)
@@ -0,0 +1,384 @@
+# apps/shared/response_cache.py
+
+import hashlib
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+
+class ResponseCache:
+    """
+    Cache das respostas de listagem da API, invalidado por versão.
+
+    Cada (organização, model) tem um contador de versão. A chave de uma
+    resposta leva o tenant, o papel/capabilities, o endpoint, os query
+    params normalizados e as versões dos models de que ela depende.
+    Salvar/apagar um objeto só incrementa o contador (O(1)): as respostas
+    antigas deixam de ser lidas e expiram sozinhas pelo TTL.
+
+    O backend é um alias de CACHES e precisa ser compartilhado entre os
+    processos (Redis, memcached, banco...): com locmem cada worker teria
+    os próprios contadores e continuaria servindo respostas que outro
+    worker já invalidou. Num backend local (LocMemCache / DummyCache) o
+    cache fica desligado, a não ser com allow_local (testes / um único
+    processo).
+
+    Uso:
+        response_cache.track(ProcessParty, 'process.organization_id')
+        response_cache.bump(organization_id, Process)
+    """
+
+    prefix = 'resp'
+
+    def __init__(self, alias='default', ttl=300, enabled=True, allow_local=False):
+        self.alias = alias
+        self.ttl = ttl
+        self.enabled = enabled
+        self.allow_local = allow_local
+        self._tracked = {}
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def is_shared(self):
+        """O backend é visto por todos os processos?"""
+        from django.core.cache.backends.dummy import DummyCache
+        from django.core.cache.backends.locmem import LocMemCache
+
+        return not isinstance(self.cache, (LocMemCache, DummyCache))
+
+    @property
+    def active(self):
+        """Ligado em settings e num backend compartilhado (ou allow_local)"""
+        return self.enabled and (self.allow_local or self.is_shared())
+
+    # ===== VERSÕES =====
+
+    def version_key(self, organization_id, model):
+        return f'{self.prefix}:v:{organization_id}:{model._meta.label_lower}'
+
+    def get_versions(self, organization_id, models):
+        """
+        Versões atuais dos models na organização (uma leitura em lote).
+        Contadores ausentes começam no relógio (ns): se o backend descartar
+        um contador, o novo valor nunca repete uma versão já usada.
+        """
+        keys = [self.version_key(organization_id, model) for model in models]
+        found = self.cache.get_many(keys)
+
+        missing = [key for key in keys if key not in found]
+        if missing:
+            for key in missing:
+                self.cache.add(key, time.time_ns(), timeout=None)
+            found.update(self.cache.get_many(missing))
+
+        return [found.get(key) for key in keys]
+
+    def bump(self, organization_id, model):
+        """Nova versão do model na organização (invalida as respostas dele)"""
+        if organization_id is None:
+            return
+
+        key = self.version_key(organization_id, model)
+        try:
+            self.cache.incr(key)
+        except ValueError:
+            self.cache.set(key, time.time_ns(), timeout=None)
+
+    def bump_on_commit(self, organization_id, model):
+        """
+        Incrementa agora (leituras na mesma transação) e de novo no commit:
+        uma resposta montada com os dados antigos entre os dois incrementos
+        fica presa a uma versão que ninguém mais lê.
+        """
+        self.bump(organization_id, model)
+        transaction.on_commit(lambda: self.bump(organization_id, model))
+
+    def is_tracked(self, model):
+        """As versões do model acompanham as alterações (ver track())?"""
+        return self.active and model in self._tracked
+
+    # ===== RESPOSTAS =====
+
+    def get_request_parts(self, request):
+        """
+        O que identifica uma resposta além dos dados: endpoint, query params
+        normalizados e papel/capabilities do usuário no tenant.
+        """
+        from apps.shared.permissions import get_request_capabilities
+        from apps.shared.tenant import get_request_role
+
+        # Query params normalizados: ordem fixa, sem valores vazios
+        params = sorted(
+            (name, value)
+            for name in request.query_params
+            for value in request.query_params.getlist(name)
+            if value != ''
+        )
+
+        return [
+            request.scheme,
+            request.get_host(),
+            request.path,
+            urlencode(params),
+            get_request_role(request),
+            int(get_request_capabilities(request)),
+        ]
+
+    def digest(self, parts):
+        return hashlib.sha1('|'.join(str(part) for part in parts).encode('utf-8')).hexdigest()
+
+    def get_key(self, request, models, vary=()):
+        """
+        Chave da resposta para o request, ou None se não der para cachear
+        (sem organização ou versão indisponível).
+        """
+        from apps.shared.tenant import get_tenant_ids
+
+        organization_id, office_id = get_tenant_ids(request)
+        if not organization_id:
+            return None
+
+        versions = self.get_versions(organization_id, models)
+        if None in versions:
+            return None
+
+        digest = self.digest([*self.get_request_parts(request), *versions, *vary])
+        return f'{self.prefix}:r:{organization_id}:{office_id}:{digest}'
+
+    def get(self, key):
+        return self.cache.get(key)
+
+    def set(self, key, data):
+        self.cache.set(key, data, self.ttl)
+
+    # ===== SIGNALS =====
+
+    def track(self, model, organization_path='organization_id'):
+        """
+        Incrementa a versão do model a cada post_save/post_delete.
+        organization_path: atributo (com pontos) até o id da organização.
+        """
+        self._tracked[model] = organization_path
+        dispatch_uid = f'response_cache_{model._meta.label_lower}'
+        post_save.connect(self._changed, sender=model, dispatch_uid=dispatch_uid)
+        post_delete.connect(self._changed, sender=model, dispatch_uid=dispatch_uid)
+
+    def connect(self):
+        """Acompanha todos os models com organização e escritório"""
+        from django.apps import apps
+        from apps.shared.models import OrganizationScopedModel
+
+        for model in apps.get_models():
+            if issubclass(model, OrganizationScopedModel):
+                self.track(model)
+
+        # Ids de organização podem ser reaproveitados (ex: SQLite): uma
+        # organização nova começa sem nenhuma resposta válida
+        post_save.connect(
+            self._organization_created,
+            sender='organizations.Organization',
+            dispatch_uid='response_cache_organization'
+        )
+
+    def get_organization_id(self, instance):
+        value = instance
+        try:
+            for attr in self._tracked[type(instance)].split('.'):
+                value = getattr(value, attr)
+        except ObjectDoesNotExist:
+            return None
+        return value
+
+    def _changed(self, sender, instance, **kwargs):
+        if self.active:
+            self.bump_on_commit(self.get_organization_id(instance), sender)
+
+    def _organization_created(self, sender, instance, created, **kwargs):
+        if self.active and created:
+            for model in self._tracked:
+                self.bump(instance.pk, model)
+
+
+def _build_response_cache():
+    config = getattr(settings, 'RESPONSE_CACHE', {})
+    return ResponseCache(
+        alias=config.get('ALIAS', 'default'),
+        ttl=config.get('TTL', 300),
+        enabled=config.get('ENABLED', True),
+        allow_local=config.get('ALLOW_LOCAL', False),
+    )
+
+
+response_cache = _build_response_cache()
+
+
+class ResponseVersionsMixin:
+    """
+    De que a resposta de um ViewSet depende (ver ResponseCache).
+
+    cache_models: models de que a resposta depende (padrão: model do queryset).
+    get_cache_vary(): valores extras da chave (ex: data de hoje, para campos
+    calculados como is_overdue).
+    """
+
+    cache_models = None
+
+    def get_cache_models(self):
+        return self.cache_models or [self.get_queryset().model]
+
+    def get_cache_vary(self):
+        return ()
+
+
+class CachedListMixin(ResponseVersionsMixin):
+    """
+    Cache da action list de um ViewSet (ver ResponseCache e
+    ResponseVersionsMixin).
+
+    As permissões do DRF continuam sendo verificadas antes (initial()).
+    Respostas trazem X-Cache: HIT ou MISS.
+    """
+
+    def list(self, request, *args, **kwargs):
+        from rest_framework.response import Response
+
+        key = None
+        if response_cache.active:
+            key = response_cache.get_key(request, self.get_cache_models(), self.get_cache_vary())
+
+        if key is not None:
+            data = response_cache.get(key)
+            if data is not None:
+                response = Response(data)
+                response['X-Cache'] = 'HIT'
+                return response
+
+        response = super().list(request, *args, **kwargs)
+
+        if key is not None and response.status_code == 200:
+            response_cache.set(key, response.data)
+            response['X-Cache'] = 'MISS'
+
+        return response
+
+
+class ConditionalGetMixin(ResponseVersionsMixin):
+    """
+    GET condicional em list e retrieve: ETag forte e Last-Modified;
+    If-None-Match / If-Modified-Since que batem devolvem 304 antes de
+    qualquer serialização (e antes do CachedListMixin, se vier depois
+    na herança). As permissões já foram verificadas em initial().
+
+    list: sonda MAX(<timestamp>), COUNT(*) no queryset já filtrado (uma
+    consulta agregada) + versões dos demais cache_models (ex: partes de
+    um processo, pagamentos de um contrato).
+    retrieve: o objeto é lido antes (get_object(): 404 e permissões por
+    objeto valem também para o 304) e reaproveitado pelo retrieve. O ETag
+    usa as versões do tenant só com o cache de respostas ativo (backend
+    compartilhado); sem ele, o timestamp do objeto.
+    Sem versões para os demais cache_models, não há validador e a
+    resposta segue normal.
+
+    Uso:
+        class ProcessViewSet(ConditionalGetMixin, CachedListMixin, viewsets.ModelViewSet):
+            cache_models = [Process, ProcessParty]
+    """
+
+    conditional_timestamp_field = 'updated_at'
+
+    def probe(self, queryset):
+        """(último timestamp, quantidade) do queryset, numa consulta"""
+        from django.db.models import Count, Max
+
+        result = queryset.order_by().aggregate(
+            last_modified=Max(self.conditional_timestamp_field),
+            count=Count('pk')
+        )
+        return result['last_modified'], result['count']
+
+    def get_validators(self, detail=False):
+        """(etag, last_modified em segundos ou None), ou None se não der para validar"""
+        from django.utils.http import quote_etag
+        from apps.shared.tenant import get_tenant_ids
+
+        organization_id, office_id = get_tenant_ids(self.request)
+        if not organization_id:
+            return None
+
+        model = self.get_queryset().model
+        models = self.get_cache_models()
+        parts = [
+            organization_id,
+            office_id,
+            *response_cache.get_request_parts(self.request),
+            *self.get_cache_vary(),
+        ]
+        last_modified = None
+
+        if detail:
+            instance = self.get_object()
+            last_modified = instance.__dict__.get(self.conditional_timestamp_field)
+            if response_cache.is_tracked(model):
+                versioned = models
+            else:
+                parts.append(last_modified.isoformat() if last_modified else '')
+                versioned = [related for related in models if related is not model]
+        else:
+            last_modified, count = self.probe(self.filter_queryset(self.get_queryset()))
+            parts += [last_modified.isoformat() if last_modified else '', count]
+            versioned = [related for related in models if related is not model]
+
+        if versioned:
+            if not response_cache.active:
+                return None
+            versions = response_cache.get_versions(organization_id, versioned)
+            if None in versions:
+                return None
+            parts += versions
+
+        etag = quote_etag(response_cache.digest(parts))
+        return etag, int(last_modified.timestamp()) if last_modified else None
+
+    def get_object(self):
+        # Lido uma vez por requisição (validadores + retrieve)
+        instance = getattr(self, '_conditional_instance', None)
+        if instance is None:
+            instance = self._conditional_instance = super().get_object()
+        return instance
+
+    def conditional_response(self, handler, detail, request, *args, **kwargs):
+        from django.utils.cache import get_conditional_response
+        from django.utils.http import http_date
+
+        validators = None
+        if request.method in ('GET', 'HEAD'):
+            validators = self.get_validators(detail)
+        if validators is None:
+            return handler(request, *args, **kwargs)
+
+        etag, last_modified = validators
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+        elif response.status_code != 304:
+            return response
+
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(super().list, False, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(super().retrieve, True, request, *args, **kwargs)
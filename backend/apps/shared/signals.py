@@ -1,54 +1,49 @@
-from django.db.models.signals import post_save, post_delete, pre_save
-from django.dispatch import receiver
 from django.contrib.contenttypes.models import ContentType
+from apps.shared.audit import audit_registry
 from apps.shared.models import AuditLog
+from apps.shared.audit_writer import audit_writer
+from apps.shared.request_context import get_current_request
 import json
+import logging
 
-# Lista de models que devem ser auditados
-AUDITED_MODELS = [
-    'Customer',
-    'Process',
-    'ProcessParty',
-    'Deadline',
-    'Document',
-    'Organization',
-    'Office',
-    'Membership',
-]
-
+logger = logging.getLogger(__name__)
 
 def get_request():
     """
-    Pega o request atual do thread local.
-    Será configurado no middleware.
+    Pega o request atual do contexto (ContextVar).
+    Configurado pelo OrganizationMiddleware; funciona em WSGI e ASGI.
     """
-    import threading
-    return getattr(threading.current_thread(), 'request', None)
+    return get_current_request()
 
 
-def get_changes(instance, old_instance=None):
+def get_changes(instance, snapshot=None):
     """
-    Calcula as mudanças entre versões do objeto.
+    Calcula as mudanças entre o snapshot (valores vindos do banco) e o objeto.
+    
+    Compara valores de coluna (attname, ex: organization_id), então FKs não
+    são carregadas. Campos deferidos (fora do snapshot) são ignorados.
     """
-    if not old_instance:
+    if snapshot is None:
         return {'action': 'created'}
     
+    options = audit_registry.get_options(type(instance))
+    
     changes = {}
-    for field in instance._meta.fields:
+    for field in instance._meta.concrete_fields:
         field_name = field.name
         
-        # Pula campos de auditoria
-        if field_name in ['created_at', 'updated_at', 'id']:
+        # Pula campos de auditoria e os excluídos no registro (ver apps.shared.audit)
+        if options is not None:
+            if not options.tracks(field_name):
+                continue
+        elif field_name in ['created_at', 'updated_at', 'id']:
             continue
         
-        old_value = getattr(old_instance, field_name, None)
-        new_value = getattr(instance, field_name, None)
+        if field.attname not in snapshot:
+            continue
         
-        # Serializa valores complexos
-        if hasattr(old_value, 'pk'):
-            old_value = str(old_value)
-        if hasattr(new_value, 'pk'):
-            new_value = str(new_value)
+        old_value = snapshot[field.attname]
+        new_value = getattr(instance, field.attname, None)
         
         if old_value != new_value:
             changes[field_name] = {
@@ -59,55 +54,67 @@ def get_changes(instance, old_instance=None):
     return changes
 
 
-@receiver(post_save)
+def get_audit_scope(request, instance):
+    """
+    (organization_id, office_id) do log: do objeto, se tiver, senão do request.
+    Usa só ids (não carrega Organization/Office).
+    """
+    from apps.shared.tenant import get_tenant_ids
+    
+    organization_id, office_id = get_tenant_ids(request)
+    
+    if hasattr(instance, 'organization_id'):
+        organization_id = instance.organization_id
+    if hasattr(instance, 'office_id'):
+        office_id = instance.office_id
+    
+    return organization_id, office_id
+
+
 def audit_post_save(sender, instance, created, **kwargs):
     """
     Audita criação e atualização de objetos.
-    """
-    # Verifica se é um model auditado
-    if sender.__name__ not in AUDITED_MODELS:
-        return
     
-    # Verifica se tem AuditLog (evita loop infinito)
-    if sender.__name__ == 'AuditLog':
-        return
+    Conectado apenas aos models registrados em audit_registry.
+    """
+    # Snapshot de antes do save; o próximo save compara com o estado atual
+    snapshot = getattr(instance, '_audit_snapshot', None)
+    if hasattr(instance, 'refresh_audit_snapshot'):
+        instance.refresh_audit_snapshot()
     
     # Pega o request
     request = get_request()
     if not request or not request.user.is_authenticated:
         return
     
-    # Pega organização e office
-    organization = getattr(request, 'organization', None)
-    office = getattr(request, 'office', None)
+    # Pega organização e office (do objeto, se tiver)
+    organization_id, office_id = get_audit_scope(request, instance)
     
-    # Se o objeto tem organization, usa ela
-    if hasattr(instance, 'organization'):
-        organization = instance.organization
-    if hasattr(instance, 'office'):
-        office = instance.office
-    
-    if not organization:
+    if not organization_id:
         return
     
     # Determina a ação
     action = 'create' if created else 'update'
     
-    # Calcula mudanças (para updates)
+    # Calcula mudanças (para updates), a partir do snapshot carregado do banco
     changes = {}
-    if not created and hasattr(instance, '_old_instance'):
-        changes = get_changes(instance, instance._old_instance)
+    if not created and snapshot is not None:
+        changes = get_changes(instance, snapshot)
+        
+        # Soft delete (SoftDeleteModel) é registrado como deleção
+        if 'is_deleted' in changes and getattr(instance, 'is_deleted', False):
+            action = 'delete'
     
     # IP do usuário
     ip_address = request.META.get('REMOTE_ADDR')
     user_agent = request.META.get('HTTP_USER_AGENT', '')
     
-    # Cria log
+    # Cria log (gravado em lote após o commit, ver audit_writer)
     try:
-        AuditLog.objects.create(
+        audit_writer.submit(AuditLog(
             user=request.user,
-            organization=organization,
-            office=office,
+            organization_id=organization_id,
+            office_id=office_id,
             action=action,
             model_name=sender.__name__,
             object_id=instance.pk,
@@ -115,73 +122,90 @@ def audit_post_save(sender, instance, created, **kwargs):
             changes=changes,
             ip_address=ip_address,
             user_agent=user_agent[:500] if user_agent else ''
-        )
-    except Exception as e:
+        ))
+    except Exception:
         # Não falha a operação principal se auditoria falhar
-        print(f"Erro ao criar audit log: {e}")
+        logger.exception("Erro ao criar audit log (%s)", sender.__name__)
 
 
-@receiver(post_delete)
 def audit_post_delete(sender, instance, **kwargs):
     """
     Audita deleção de objetos.
-    """
-    # Verifica se é um model auditado
-    if sender.__name__ not in AUDITED_MODELS:
-        return
-    
-    if sender.__name__ == 'AuditLog':
-        return
     
+    Conectado apenas aos models registrados em audit_registry.
+    """
     request = get_request()
     if not request or not request.user.is_authenticated:
         return
     
-    organization = getattr(request, 'organization', None)
-    office = getattr(request, 'office', None)
+    organization_id, office_id = get_audit_scope(request, instance)
     
-    if hasattr(instance, 'organization'):
-        organization = instance.organization
-    if hasattr(instance, 'office'):
-        office = instance.office
-    
-    if not organization:
+    if not organization_id:
         return
     
     ip_address = request.META.get('REMOTE_ADDR')
     user_agent = request.META.get('HTTP_USER_AGENT', '')
     
     try:
-        AuditLog.objects.create(
+        audit_writer.submit(AuditLog(
             user=request.user,
-            organization=organization,
-            office=office,
+            organization_id=organization_id,
+            office_id=office_id,
             action='delete',
             model_name=sender.__name__,
             object_id=instance.pk,
             object_repr=str(instance)[:255],
             ip_address=ip_address,
             user_agent=user_agent[:500] if user_agent else ''
-        )
-    except Exception as e:
-        print(f"Erro ao criar audit log: {e}")
+        ))
+    except Exception:
+        logger.exception("Erro ao criar audit log (%s)", sender.__name__)
 
 
-@receiver(pre_save)
-def store_old_instance(sender, instance, **kwargs):
-    """
-    Armazena versão antiga do objeto antes de salvar (para detectar mudanças).
+def audit_bulk_update(model, rows, fields):
     """
-    if sender.__name__ not in AUDITED_MODELS:
-        return
+    Registra um update em massa (queryset.audited_update).
+    
+    Um AuditLog por organização, com os ids afetados e os campos alterados,
+    em vez de um log por objeto. rows: [(pk, organization_id, office_id), ...]
     
-    if sender.__name__ == 'AuditLog':
+    Fora de um request (shell, commands) o log é gravado sem usuário.
+    """
+    if not rows:
         return
     
-    if instance.pk:
+    request = get_request()
+    user = None
+    ip_address = None
+    user_agent = ''
+    if request is not None:
+        if request.user.is_authenticated:
+            user = request.user
+        ip_address = request.META.get('REMOTE_ADDR')
+        user_agent = request.META.get('HTTP_USER_AGENT', '')
+    
+    by_organization = {}
+    for pk, organization_id, office_id in rows:
+        by_organization.setdefault(organization_id, []).append((pk, office_id))
+    
+    changed = {name: str(value) if value is not None else None for name, value in fields.items()}
+    
+    for organization_id, items in by_organization.items():
+        ids = sorted(pk for pk, _ in items)
+        offices = {office_id for _, office_id in items}
+        
         try:
-            instance._old_instance = sender.objects.get(pk=instance.pk)
-        except sender.DoesNotExist:
-            instance._old_instance = None
-    else:
-        instance._old_instance = None
\ No newline at end of file
+            audit_writer.submit(AuditLog(
+                user=user,
+                organization_id=organization_id,
+                # Office só quando todos os objetos são do mesmo escritório
+                office_id=offices.pop() if len(offices) == 1 else None,
+                action='update',
+                model_name=model.__name__,
+                object_repr=f'{len(ids)} registro(s) (em massa)'[:255],
+                changes={'bulk': True, 'ids': ids, 'fields': changed},
+                ip_address=ip_address,
+                user_agent=user_agent[:500] if user_agent else ''
+            ))
+        except Exception:
+            logger.exception("Erro ao criar audit log em massa (%s)", model.__name__)
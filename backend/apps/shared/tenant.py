@@ -0,0 +1,257 @@
+# apps/shared/tenant.py
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from apps.memberships.models import Membership
+from apps.shared.membership_cache import membership_cache
+
+# Claims de tenant adicionados aos tokens JWT (ver apps.api.tokens)
+TENANT_CLAIMS = ('org_id', 'office_id', 'membership_id', 'role', 'membership_version')
+
+MEMBERSHIP_VERSION_KEY = 'tenant:membership_version:{}'
+
+
+def tenant_claims(membership):
+    """
+    Monta os claims de tenant de um membership.
+    """
+    return {
+        'org_id': membership.organization_id,
+        'office_id': membership.office_id,
+        'membership_id': membership.pk,
+        'role': membership.role,
+        'membership_version': membership.version,
+    }
+
+
+def get_membership_version(membership_id):
+    """
+    Versão atual do membership (0 = inativo/removido).
+
+    Fica no cache do Django; o banco só é consultado quando a chave expira.
+    """
+    key = MEMBERSHIP_VERSION_KEY.format(membership_id)
+    version = cache.get(key)
+
+    if version is None:
+        version = Membership.objects.filter(
+            pk=membership_id,
+            is_active=True
+        ).values_list('version', flat=True).first() or 0
+        cache.set(key, version, membership_cache.ttl)
+
+    return version
+
+
+def get_access_token(request):
+    """
+    Retorna o access token JWT validado do header Authorization (ou None).
+    Não acessa o banco: só verifica assinatura, tipo e expiração.
+    """
+    authentication = JWTAuthentication()
+    header = authentication.get_header(request)
+    if header is None:
+        return None
+
+    try:
+        raw_token = authentication.get_raw_token(header)
+        if raw_token is None:
+            return None
+        return authentication.get_validated_token(raw_token)
+    except (AuthenticationFailed, InvalidToken, TokenError):
+        # A autenticação do DRF devolve o erro adequado na view
+        return None
+
+
+def has_current_claims(token):
+    """Verifica se os claims de tenant do token ainda valem (versão confere)"""
+    membership_id = token.get('membership_id')
+    if not membership_id or not token.get('membership_version'):
+        return False
+
+    return token['membership_version'] == get_membership_version(membership_id)
+
+
+class TenantContext:
+    """
+    Tenant do request, resolvido sob demanda.
+
+    Nada é consultado até o primeiro acesso a um atributo, então views que
+    não usam tenant (landing page, contato, Swagger/Redoc, arquivos
+    estáticos) não pagam a resolução.
+
+    - Ids e papel: dos claims do access token JWT quando a
+      membership_version confere; senão, do membership ativo do usuário
+      (sessão ou user_id do token), via cache de memberships.
+    - Objetos (membership, organization, office): carregados só quando lidos.
+    """
+
+    def __init__(self, request):
+        self._request = request
+        self._ids = None
+        self._membership = None
+        self._membership_loaded = False
+
+    def _get_user_id(self, token):
+        if token is not None:
+            user_id = token.get(jwt_settings.USER_ID_CLAIM)
+            return int(user_id) if user_id is not None else None
+
+        user = getattr(self._request, 'user', None)
+        if user is not None and user.is_authenticated:
+            return user.pk
+        return None
+
+    def _resolve_ids(self):
+        if self._ids is not None:
+            return self._ids
+
+        token = get_access_token(self._request)
+        user_id = self._get_user_id(token)
+
+        ids = {
+            'user_id': user_id,
+            'membership_id': None,
+            'organization_id': None,
+            'office_id': None,
+            'role': None,
+        }
+
+        if user_id is not None:
+            if token is not None and has_current_claims(token):
+                ids.update(
+                    membership_id=token['membership_id'],
+                    organization_id=token['org_id'],
+                    office_id=token['office_id'],
+                    role=token['role'],
+                )
+            else:
+                self._set_membership(membership_cache.get(user_id))
+                if self._membership is not None:
+                    ids.update(
+                        membership_id=self._membership.pk,
+                        organization_id=self._membership.organization_id,
+                        office_id=self._membership.office_id,
+                        role=self._membership.role,
+                    )
+
+        self._ids = ids
+        return ids
+
+    def _set_membership(self, membership):
+        self._membership = membership
+        self._membership_loaded = True
+
+    @property
+    def user_id(self):
+        return self._resolve_ids()['user_id']
+
+    @property
+    def membership_id(self):
+        return self._resolve_ids()['membership_id']
+
+    @property
+    def organization_id(self):
+        return self._resolve_ids()['organization_id']
+
+    @property
+    def office_id(self):
+        return self._resolve_ids()['office_id']
+
+    @property
+    def role(self):
+        return self._resolve_ids()['role']
+
+    @property
+    def membership(self):
+        if not self._membership_loaded:
+            ids = self._resolve_ids()
+
+            if not self._membership_loaded:
+                membership = None
+                if ids['membership_id'] is not None:
+                    membership = membership_cache.get(ids['user_id'])
+
+                    # Usuário com mais de um membership: o token define qual vale
+                    if membership is None or membership.pk != ids['membership_id']:
+                        membership = Membership.objects.filter(
+                            pk=ids['membership_id'],
+                            user_id=ids['user_id'],
+                            is_active=True
+                        ).select_related('organization', 'office').first()
+
+                self._set_membership(membership)
+
+        return self._membership
+
+    @property
+    def organization(self):
+        membership = self.membership
+        return membership.organization if membership else None
+
+    @property
+    def office(self):
+        membership = self.membership
+        return membership.office if membership else None
+
+    async def aload(self):
+        """
+        Resolve o tenant (incluindo os objetos) fora do event loop.
+        Para views assíncronas, antes de acessar organization/office/membership.
+        """
+        await sync_to_async(lambda: self.membership)()
+        return self
+
+    @property
+    def is_resolved(self):
+        """Indica se a resolução já aconteceu (útil em testes/diagnóstico)"""
+        return self._ids is not None
+
+
+def get_tenant_ids(request):
+    """
+    Retorna (organization_id, office_id) do request sem carregar objetos.
+
+    Aceita requests sem TenantContext (ex: RequestFactory em testes com
+    request.organization/request.office definidos manualmente).
+    """
+    tenant = getattr(request, 'tenant', None)
+    if isinstance(tenant, TenantContext):
+        return tenant.organization_id, tenant.office_id
+
+    organization = getattr(request, 'organization', None)
+    office = getattr(request, 'office', None)
+    return (
+        organization.pk if organization else None,
+        office.pk if office else None,
+    )
+
+
+def get_request_role(request):
+    """Papel do usuário no tenant do request (ou None)"""
+    tenant = getattr(request, 'tenant', None)
+    if isinstance(tenant, TenantContext):
+        return tenant.role
+
+    membership = getattr(request, 'membership', None)
+    return membership.role if membership else None
+
+
+# ===== VERSÃO DO MEMBERSHIP =====
+
+@receiver(post_save, sender=Membership, dispatch_uid='tenant_membership_version_save')
+def update_membership_version(sender, instance, **kwargs):
+    version = instance.version if instance.is_active else 0
+    cache.set(MEMBERSHIP_VERSION_KEY.format(instance.pk), version, membership_cache.ttl)
+
+
+@receiver(post_delete, sender=Membership, dispatch_uid='tenant_membership_version_delete')
+def revoke_membership_version(sender, instance, **kwargs):
+    cache.set(MEMBERSHIP_VERSION_KEY.format(instance.pk), 0, membership_cache.ttl)
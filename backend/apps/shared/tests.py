@@ -243,4 +243,1094 @@ class PermissionTest(TestCase):
         # Intern não pode
         self.assertFalse(
             permission.has_permission(self.intern, self.org)
-        )
\ No newline at end of file
+        )
+    
+    def request_for(self, user):
+        """Request com tenant resolvido pelo middleware"""
+        request = RequestFactory().get('/')
+        request.user = user
+        OrganizationMiddleware(lambda r: None).process_request(request)
+        return request
+    
+    def test_request_capabilities_computed_once(self):
+        """Capacidades vêm do membership do request, uma vez por request"""
+        from apps.shared.permissions import (
+            CanManageCustomers,
+            CanViewConfidential,
+            IsOrganizationAdmin,
+            check_request_permission,
+        )
+        
+        request = self.request_for(self.lawyer)
+        request.tenant.membership  # Resolve o tenant antes de contar
+        
+        confidential = [
+            Process(organization=self.org, office=self.office, is_confidential=True)
+            for _ in range(25)
+        ]
+        
+        with self.assertNumQueries(0):
+            self.assertTrue(check_request_permission(request, CanManageCustomers))
+            self.assertFalse(check_request_permission(request, IsOrganizationAdmin))
+            for process in confidential:
+                self.assertTrue(check_request_permission(request, CanViewConfidential, obj=process))
+        
+        intern_request = self.request_for(self.intern)
+        self.assertFalse(
+            check_request_permission(intern_request, CanViewConfidential, obj=confidential[0])
+        )
+    
+    def test_role_masks_compiled(self):
+        """Todos os papéis de ROLE_CHOICES viram um bitmask"""
+        from apps.shared.permissions import ROLE_MASKS, Capability
+        
+        self.assertEqual(set(ROLE_MASKS), {role for role, _ in Membership.ROLE_CHOICES})
+        self.assertTrue(ROLE_MASKS['lawyer'] & Capability.VIEW_CONFIDENTIAL)
+        self.assertFalse(ROLE_MASKS['lawyer'] & Capability.ORGANIZATION_ADMIN)
+        self.assertFalse(ROLE_MASKS['guest'])
+    
+    def test_organization_overrides(self):
+        """Overrides de Organization.settings valem para a organização"""
+        from apps.shared.permissions import CanManageCustomers, CanViewConfidential
+        
+        self.org.settings = {
+            'permissions': {
+                'intern': {'grant': ['manage_customers']},
+                'lawyer': {'revoke': ['view_confidential']},
+            }
+        }
+        self.org.save()
+        
+        self.assertTrue(CanManageCustomers().has_permission(self.intern, self.org))
+        self.assertFalse(CanViewConfidential().has_permission(self.lawyer, self.org))
+        
+        request = self.request_for(self.intern)
+        self.assertTrue(CanManageCustomers().has_request_permission(request))
+        
+        # Salvar a organização invalida os overrides em cache
+        self.org.settings = {}
+        self.org.save()
+        self.assertFalse(CanManageCustomers().has_permission(self.intern, self.org))
+
+
+class MembershipCacheTest(TestCase):
+    """
+    Testa o cache de memberships usado pelo middleware.
+    """
+    
+    def setUp(self):
+        from apps.shared.membership_cache import membership_cache
+        
+        self.cache = membership_cache
+        self.cache.clear()
+        
+        self.org = Organization.objects.create(
+            name='Cache Org',
+            document='33333333333333'
+        )
+        
+        self.office = Office.objects.create(
+            organization=self.org,
+            name='Cache Office'
+        )
+        
+        self.user = User.objects.create_user(
+            username='cached',
+            email='cached@test.com',
+            password='test123'
+        )
+        
+        self.membership = Membership.objects.create(
+            user=self.user,
+            organization=self.org,
+            office=self.office,
+            role='lawyer'
+        )
+        
+        self.factory = RequestFactory()
+    
+    def test_hit_does_not_query(self):
+        """Segundo acesso vem do cache, sem consulta"""
+        with self.assertNumQueries(1):
+            self.cache.get(self.user.pk)
+        
+        with self.assertNumQueries(0):
+            membership = self.cache.get(self.user.pk)
+        
+        self.assertEqual(membership.organization, self.org)
+        self.assertEqual(self.cache.stats()['hits'], 1)
+        self.assertEqual(self.cache.stats()['misses'], 1)
+    
+    def test_invalidated_on_membership_change(self):
+        """Alterar o membership invalida a entrada do usuário"""
+        self.cache.get(self.user.pk)
+        
+        self.membership.role = 'intern'
+        self.membership.save()
+        
+        with self.assertNumQueries(1):
+            membership = self.cache.get(self.user.pk)
+        self.assertEqual(membership.role, 'intern')
+        
+        self.membership.delete()
+        self.assertIsNone(self.cache.get(self.user.pk))
+    
+    def test_invalidated_on_office_change(self):
+        """Alterar o escritório invalida os memberships dele"""
+        self.cache.get(self.user.pk)
+        
+        self.office.name = 'Renomeado'
+        self.office.save()
+        
+        membership = self.cache.get(self.user.pk)
+        self.assertEqual(membership.office.name, 'Renomeado')
+    
+    def test_middleware_uses_cache(self):
+        """Middleware resolve o tenant pelo cache"""
+        middleware = OrganizationMiddleware(lambda request: request)
+        
+        for _ in range(2):
+            request = self.factory.get('/')
+            request.user = self.user
+            middleware(request)
+            self.assertEqual(request.organization, self.org)
+            self.assertEqual(request.office, self.office)
+        
+        self.assertEqual(self.cache.stats()['hits'], 1)
+
+
+class LazyTenantTest(TestCase):
+    """
+    Testa que rotas sem tenant não resolvem membership.
+    """
+    
+    def setUp(self):
+        from apps.shared.membership_cache import membership_cache
+        membership_cache.clear()
+        
+        self.org = Organization.objects.create(
+            name='Lazy Org',
+            document='55555555555555'
+        )
+        
+        self.office = Office.objects.create(
+            organization=self.org,
+            name='Lazy Office'
+        )
+        
+        self.user = User.objects.create_user(
+            username='lazy',
+            email='lazy@test.com',
+            password='test123'
+        )
+        
+        Membership.objects.create(
+            user=self.user,
+            organization=self.org,
+            office=self.office,
+            role='lawyer'
+        )
+    
+    def assertNoTenantLookups(self, url):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.wsgi_request.tenant.is_resolved)
+        for query in context.captured_queries:
+            self.assertNotIn('memberships_membership', query['sql'])
+        return context
+    
+    def test_anonymous_routes_do_no_queries(self):
+        """Landing page e docs anônimos não fazem nenhuma consulta"""
+        with self.assertNumQueries(0):
+            self.client.get('/')
+            self.client.get('/api/docs/')
+    
+    def test_authenticated_non_tenant_routes(self):
+        """Usuário logado em rotas sem tenant não resolve membership"""
+        self.client.force_login(self.user)
+        
+        self.assertNoTenantLookups('/')
+        self.assertNoTenantLookups('/api/docs/')
+        self.assertNoTenantLookups('/api/redoc/')
+    
+    def test_tenant_resolved_on_access(self):
+        """Membership é resolvido no primeiro acesso"""
+        self.client.force_login(self.user)
+        
+        response = self.client.get('/api/customers/')
+        
+        self.assertEqual(response.status_code, 200)
+        request = response.wsgi_request
+        self.assertTrue(request.tenant.is_resolved)
+        self.assertEqual(request.organization, self.org)
+        self.assertEqual(request.office, self.office)
+
+
+class RequestContextTest(TestCase):
+    """
+    Testa o request atual via ContextVar (WSGI e ASGI).
+    """
+    
+    def setUp(self):
+        self.factory = RequestFactory()
+    
+    def test_sync_middleware_sets_and_resets(self):
+        """Request fica disponível durante a view e é limpo depois"""
+        from apps.shared.request_context import get_current_request
+        
+        seen = []
+        middleware = OrganizationMiddleware(lambda request: seen.append(get_current_request()))
+        request = self.factory.get('/')
+        
+        middleware(request)
+        
+        self.assertIs(seen[0], request)
+        self.assertIsNone(get_current_request())
+    
+    def test_reset_on_exception(self):
+        """Exceção na view não deixa o request vazar"""
+        from apps.shared.request_context import get_current_request
+        
+        def view(request):
+            raise ValueError('erro')
+        
+        middleware = OrganizationMiddleware(view)
+        
+        with self.assertRaises(ValueError):
+            middleware(self.factory.get('/'))
+        
+        self.assertIsNone(get_current_request())
+    
+    async def test_async_requests_are_isolated(self):
+        """Corrotinas concorrentes enxergam cada uma o seu request"""
+        import asyncio
+        from apps.shared.request_context import get_current_request
+        
+        async def view(request):
+            await asyncio.sleep(0.01)
+            return get_current_request()
+        
+        middleware = OrganizationMiddleware(view)
+        requests = [self.factory.get(f'/{i}/') for i in range(5)]
+        
+        results = await asyncio.gather(*(middleware(request) for request in requests))
+        
+        for request, seen in zip(requests, results):
+            self.assertIs(seen, request)
+        self.assertIsNone(get_current_request())
+
+
+class AuditWriterTest(TestCase):
+    """
+    Testa a gravação em lote dos audit logs.
+    """
+    
+    def setUp(self):
+        from apps.shared.audit_intern import clear_interned
+        clear_interned()
+        
+        self.org = Organization.objects.create(
+            name='Audit Org',
+            document='66666666666666'
+        )
+    
+    def entry(self, object_id=1):
+        from apps.shared.models import AuditLog
+        
+        return AuditLog(
+            organization=self.org,
+            action='update',
+            model_name='Customer',
+            object_id=object_id
+        )
+    
+    def test_submit_waits_for_commit(self):
+        """Entrada só é gravada quando a transação é confirmada"""
+        from apps.shared.audit_writer import AuditLogWriter
+        from apps.shared.models import AuditLog
+        
+        writer = AuditLogWriter(async_mode=False)
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            writer.submit(self.entry())
+            self.assertEqual(AuditLog.objects.count(), 0)
+        
+        self.assertEqual(AuditLog.objects.count(), 1)
+        self.assertEqual(writer.stats()['written'], 1)
+    
+    def test_flush_uses_bulk_create(self):
+        """A fila é gravada em uma única consulta"""
+        from apps.shared.audit_intern import model_names
+        from apps.shared.audit_writer import AuditLogWriter
+        from apps.shared.models import AuditLog
+        
+        writer = AuditLogWriter(batch_size=50, flush_interval=3600)
+        try:
+            for i in range(10):
+                writer.enqueue(self.entry(i))
+            self.assertEqual(writer.stats()['queue_depth'], 10)
+            
+            # Com o cache de lookup aquecido (no commit), só o INSERT em lote
+            with self.captureOnCommitCallbacks(execute=True):
+                model_names.get_ids(['Customer'])
+            with self.assertNumQueries(1):
+                self.assertEqual(writer.flush(), 10)
+        finally:
+            writer.stop()
+        
+        stats = writer.stats()
+        self.assertEqual(AuditLog.objects.count(), 10)
+        self.assertEqual(stats['queue_depth'], 0)
+        self.assertEqual(stats['flushes'], 1)
+        self.assertGreater(stats['last_flush_latency'], 0)
+    
+    def test_backpressure_drop(self):
+        """Fila cheia descarta conforme a política e conta os descartes"""
+        from apps.shared.audit_writer import AuditLogWriter
+        
+        for policy, kept in [('drop_oldest', [1, 2]), ('drop_newest', [0, 1])]:
+            writer = AuditLogWriter(max_queue=2, flush_interval=3600, backpressure=policy)
+            try:
+                for i in range(3):
+                    writer.enqueue(self.entry(i))
+                
+                self.assertEqual([e.object_id for e in writer._queue], kept)
+                self.assertEqual(writer.stats()['dropped'], 1)
+            finally:
+                writer._queue.clear()
+                writer.stop()
+    
+    def test_intern_cache_ignores_rolled_back_ids(self):
+        """Id criado numa transação desfeita não fica no cache de lookup"""
+        from django.db import transaction
+        from apps.shared.audit_intern import model_names
+        from apps.shared.models import AuditModelName
+        
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                stale = model_names.get_id('Desfeito')
+                self.assertTrue(AuditModelName.objects.filter(pk=stale).exists())
+                raise RuntimeError
+        
+        self.assertFalse(AuditModelName.objects.filter(pk=stale).exists())
+        self.assertNotIn('Desfeito', model_names._ids)
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            pk = model_names.get_id('Desfeito')
+        self.assertTrue(AuditModelName.objects.filter(pk=pk).exists())
+        self.assertEqual(model_names._ids['Desfeito'], pk)
+    
+    def test_concurrent_drops_are_counted(self):
+        """Padrão drop_oldest; descartes de várias threads somam certo"""
+        import threading
+        from apps.shared.audit_writer import AuditLogWriter
+        
+        writer = AuditLogWriter(max_queue=1, flush_interval=3600)
+        self.assertEqual(writer.backpressure, 'drop_oldest')
+        try:
+            def submit_many():
+                for i in range(200):
+                    writer.enqueue(self.entry(i))
+            
+            threads = [threading.Thread(target=submit_many) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            
+            stats = writer.stats()
+            self.assertEqual(stats['enqueued'], 800)
+            self.assertEqual(stats['dropped'] + stats['queue_depth'], 800)
+        finally:
+            writer._queue.clear()
+            writer.stop()
+
+
+class AuditDiffTest(TestCase):
+    """
+    Testa o diff de auditoria a partir do snapshot carregado do banco.
+    """
+    
+    def setUp(self):
+        from apps.shared.audit_intern import clear_interned
+        clear_interned()
+        
+        from apps.shared.audit_writer import audit_writer
+        
+        self.org = Organization.objects.create(
+            name='Diff Org',
+            document='77777777777777'
+        )
+        
+        self.office = Office.objects.create(
+            organization=self.org,
+            name='Diff Office'
+        )
+        
+        self.user = User.objects.create_user(
+            username='diff',
+            email='diff@test.com',
+            password='test123'
+        )
+        
+        Membership.objects.create(
+            user=self.user,
+            organization=self.org,
+            office=self.office,
+            role='lawyer'
+        )
+        
+        Process.objects.create(
+            organization=self.org,
+            office=self.office,
+            number='0000003-00.2024.8.26.0001',
+            subject='Assunto',
+            court='TJSP'
+        )
+        
+        # Grava no commit, na thread do teste
+        self.addCleanup(setattr, audit_writer, 'async_mode', audit_writer.async_mode)
+        audit_writer.async_mode = False
+        
+        self.request = RequestFactory().get('/')
+        self.request.user = self.user
+        OrganizationMiddleware(lambda r: None).process_request(self.request)
+        self.request.tenant.organization_id
+    
+    def test_update_costs_one_update_plus_audit_insert(self):
+        """Salvar um processo: 1 UPDATE + 1 INSERT de auditoria, sem SELECTs"""
+        from apps.shared.models import AuditLog
+        from apps.shared.request_context import request_context
+        
+        process = Process.objects.get()
+        
+        with request_context(self.request):
+            # Primeiro save aquece o cache de lookup (model/IP)
+            with self.captureOnCommitCallbacks(execute=True):
+                process.save()
+            
+            process.subject = 'Novo assunto'
+            with self.assertNumQueries(2):
+                with self.captureOnCommitCallbacks(execute=True):
+                    process.save()
+        
+        log = AuditLog.objects.latest('id')
+        self.assertEqual(log.action, 'update')
+        self.assertEqual(log.organization_id, self.org.pk)
+        self.assertEqual(
+            log.changes,
+            {'subject': {'old': 'Assunto', 'new': 'Novo assunto'}}
+        )
+    
+    def test_snapshot_follows_saves(self):
+        """Saves seguidos comparam com o último estado salvo"""
+        from apps.shared.models import AuditLog
+        from apps.shared.request_context import request_context
+        
+        process = Process.objects.get()
+        
+        with request_context(self.request):
+            with self.captureOnCommitCallbacks(execute=True):
+                process.subject = 'Primeiro'
+                process.save()
+                process.court = 'STJ'
+                process.save()
+        
+        last = AuditLog.objects.order_by('-id').first()
+        self.assertEqual(last.changes, {'court': {'old': 'TJSP', 'new': 'STJ'}})
+    
+    def test_registry_exclude(self):
+        """Campos excluídos no registro não entram no diff"""
+        from apps.shared.models import AuditLog
+        from apps.shared.request_context import request_context
+        
+        membership = Membership.objects.get()
+        membership.role = 'intern'
+        
+        with request_context(self.request):
+            with self.captureOnCommitCallbacks(execute=True):
+                membership.save()
+        
+        log = AuditLog.objects.get(model_type__name='Membership')
+        self.assertEqual(log.changes, {'role': {'old': 'lawyer', 'new': 'intern'}})
+    
+    def test_snapshot_only_for_audited_fields(self):
+        """Snapshot só com as colunas do diff; models não auditados não guardam nada"""
+        from datetime import date
+        from apps.customers.models import Customer
+        from apps.finance.models import FeeAgreement
+        
+        process = Process.objects.get()
+        snapshot = process.get_audit_snapshot()
+        self.assertIn('subject', snapshot)
+        self.assertNotIn('updated_at', snapshot)
+        self.assertNotIn('id', snapshot)
+        
+        self.assertNotIn('version', Membership.objects.get().get_audit_snapshot())
+        
+        customer = Customer.objects.create(
+            organization=self.org,
+            office=self.office,
+            name='Cliente Snapshot',
+            document='12345678909'
+        )
+        FeeAgreement.objects.create(
+            organization=self.org,
+            office=self.office,
+            customer=customer,
+            title='Contrato',
+            amount=1000,
+            start_date=date(2024, 1, 1)
+        )
+        self.assertIsNone(FeeAgreement.objects.get().get_audit_snapshot())
+
+
+class AuditRegistryTest(TestCase):
+    """
+    Testa o registro de models auditados.
+    """
+    
+    def test_receivers_only_on_audited_models(self):
+        """Models não auditados não têm receivers de auditoria"""
+        from django.contrib.sessions.models import Session
+        from django.db.models.signals import post_save
+        from apps.shared.audit import audit_registry
+        from apps.shared.models import AuditLog
+        
+        self.assertTrue(audit_registry.is_registered(Process))
+        self.assertTrue(post_save.has_listeners(Process))
+        
+        self.assertFalse(audit_registry.is_registered(AuditLog))
+        self.assertFalse(post_save.has_listeners(AuditLog))
+        self.assertFalse(post_save.has_listeners(Session))
+
+
+class AuditedUpdateTest(TestCase):
+    """
+    Testa o update em massa com auditoria.
+    """
+    
+    def setUp(self):
+        from apps.shared.audit_intern import clear_interned
+        clear_interned()
+        
+        from apps.shared.audit_writer import audit_writer
+        
+        self.org = Organization.objects.create(
+            name='Bulk Org',
+            document='88888888888888'
+        )
+        
+        self.office = Office.objects.create(
+            organization=self.org,
+            name='Bulk Office'
+        )
+        
+        self.processes = [
+            Process.objects.create(
+                organization=self.org,
+                office=self.office,
+                number=f'000000{i}-00.2024.8.26.0002',
+                subject=f'Processo {i}',
+                court='TJSP'
+            )
+            for i in range(5)
+        ]
+        
+        self.addCleanup(setattr, audit_writer, 'async_mode', audit_writer.async_mode)
+        audit_writer.async_mode = False
+    
+    def test_single_update_and_single_log(self):
+        """Update em massa: consultas constantes e um log com os ids"""
+        from apps.shared.audit_intern import model_names
+        from apps.shared.models import AuditLog
+        
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            model_names.get_ids(['Process'])
+        
+        # SELECT dos ids + UPDATE + INSERT do log (fora os SAVEPOINTs da transação)
+        with CaptureQueriesContext(connection) as context:
+            with self.captureOnCommitCallbacks(execute=True):
+                count = Process.objects.all().audited_update(phase='archived', is_active=False)
+        queries = [q['sql'] for q in context.captured_queries if 'SAVEPOINT' not in q['sql']]
+        self.assertEqual(len(queries), 3)
+        
+        self.assertEqual(count, 5)
+        self.assertEqual(Process.objects.filter(phase='archived').count(), 5)
+        
+        log = AuditLog.objects.get()
+        self.assertEqual(log.model_name, 'Process')
+        self.assertEqual(log.office_id, self.office.pk)
+        self.assertEqual(log.changes['ids'], sorted(p.pk for p in self.processes))
+        self.assertEqual(log.changes['fields'], {'phase': 'archived', 'is_active': 'False'})
+    
+    def test_update_in_batches(self):
+        """Os pks vão em blocos de batch_size; o log continua único"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from apps.shared.models import AuditLog
+        
+        with CaptureQueriesContext(connection) as context:
+            with self.captureOnCommitCallbacks(execute=True):
+                count = Process.objects.all().audited_update(batch_size=2, phase='archived')
+        
+        updates = [q['sql'] for q in context.captured_queries if q['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 3)
+        self.assertEqual(count, 5)
+        self.assertEqual(Process.objects.filter(phase='archived').count(), 5)
+        self.assertEqual(len(AuditLog.objects.get().changes['ids']), 5)
+
+
+class AuditArchiveTest(TestCase):
+    """
+    Testa o arquivamento de partições mensais de AuditLog.
+    """
+    
+    def setUp(self):
+        from apps.shared.audit_intern import clear_interned
+        clear_interned()
+        
+        import shutil
+        import tempfile
+        from datetime import timedelta
+        from django.utils import timezone
+        from apps.shared.models import AuditLog
+        
+        self.archive_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.archive_dir, True)
+        
+        self.org = Organization.objects.create(
+            name='Archive Org',
+            document='99999999999999'
+        )
+        
+        now = timezone.now()
+        for days, repr_ in [(0, 'Recente'), (200, 'Antigo 1'), (230, 'Antigo 2')]:
+            AuditLog.objects.create(
+                organization=self.org,
+                action='update',
+                model_name='Customer',
+                object_repr=repr_,
+                timestamp=now - timedelta(days=days)
+            )
+    
+    def test_archive_and_read_back(self):
+        """Partições antigas vão para arquivos gzip e podem ser lidas"""
+        import io
+        from django.core.management import call_command
+        from apps.shared.audit_archive import iter_archived, list_archives
+        from apps.shared.models import AuditLog
+        
+        call_command('archive_audit_logs', months=3, dir=self.archive_dir, stdout=io.StringIO())
+        
+        self.assertEqual(list(AuditLog.objects.values_list('object_repr', flat=True)), ['Recente'])
+        self.assertTrue(list_archives(self.archive_dir))
+        
+        archived = list(iter_archived(organization_id=self.org.pk, archive_dir=self.archive_dir))
+        self.assertEqual(sorted(row['object_repr'] for row in archived), ['Antigo 1', 'Antigo 2'])
+        
+        found = list(iter_archived(search='antigo 2', archive_dir=self.archive_dir))
+        self.assertEqual(len(found), 1)
+    
+    def test_rerun_after_crash_overwrites_part(self):
+        """Queda entre o rename e o delete: a nova execução reescreve a mesma parte"""
+        from django.db import transaction
+        from apps.shared.audit_archive import archive_month, iter_archived, list_archives, month_start
+        from apps.shared.models import AuditLog
+        
+        month = month_start(AuditLog.objects.get(object_repr='Antigo 1').timestamp)
+        
+        # Arquivo gravado, delete desfeito
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                first_count, first_path = archive_month(month, self.archive_dir)
+                raise RuntimeError
+        self.assertEqual(AuditLog.objects.filter(object_repr='Antigo 1').count(), 1)
+        
+        count, path = archive_month(month, self.archive_dir)
+        self.assertEqual((count, path), (first_count, first_path))
+        self.assertEqual([p for _, p in list_archives(self.archive_dir)], [path])
+        archived = [row['object_repr'] for row in iter_archived(archive_dir=self.archive_dir)]
+        self.assertEqual(len(archived), count)
+        self.assertIn('Antigo 1', archived)
+        self.assertFalse(AuditLog.objects.filter(object_repr='Antigo 1').exists())
+    
+    def test_admin_archive_view(self):
+        """Admin lista os logs arquivados"""
+        import io
+        from django.test import override_settings
+        from django.core.management import call_command
+        
+        call_command('archive_audit_logs', months=3, dir=self.archive_dir, stdout=io.StringIO())
+        
+        admin = User.objects.create_superuser(
+            username='admin',
+            email='admin@test.com',
+            password='test123'
+        )
+        self.client.force_login(admin)
+        
+        with override_settings(AUDIT_LOG_ARCHIVE={'DIR': self.archive_dir}):
+            response = self.client.get('/admin/shared/auditlog/archive/', {'q': 'Antigo'})
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Antigo 1')
+
+
+class AuditCompactTest(TestCase):
+    """
+    Testa a compactação de logs no formato antigo (colunas de texto).
+    """
+    
+    def test_compact_legacy_rows(self):
+        """Colunas antigas viram FKs para as tabelas de lookup"""
+        import io
+        from django.core.management import call_command
+        from django.db import connection
+        from apps.shared.audit_intern import clear_interned
+        from apps.shared.models import AuditLog
+        
+        clear_interned()
+        org = Organization.objects.create(name='Compact Org', document='10101010101010')
+        
+        # Simula a tabela antiga
+        with connection.cursor() as cursor:
+            cursor.execute("ALTER TABLE shared_auditlog ADD COLUMN model_name varchar(100) NOT NULL DEFAULT ''")
+            cursor.execute("ALTER TABLE shared_auditlog ADD COLUMN ip_address char(39) NULL")
+            cursor.execute("ALTER TABLE shared_auditlog ADD COLUMN user_agent text NOT NULL DEFAULT ''")
+            cursor.execute("CREATE INDEX legacy_model_idx ON shared_auditlog (model_name, object_id)")
+            for i in range(3):
+                cursor.execute(
+                    "INSERT INTO shared_auditlog (organization_id, action, object_repr, changes, timestamp, "
+                    "model_name, ip_address, user_agent) VALUES (%s, 'update', '', '{}', %s, %s, %s, %s)",
+                    [org.pk, '2024-01-01 00:00:00', 'Process', '10.0.0.1', 'Mozilla/5.0']
+                )
+        
+        call_command('compact_audit_logs', stdout=io.StringIO())
+        
+        with connection.cursor() as cursor:
+            columns = {c.name for c in connection.introspection.get_table_description(cursor, 'shared_auditlog')}
+        self.assertFalse(columns & {'model_name', 'ip_address', 'user_agent'})
+        
+        logs = list(AuditLog.objects.all())
+        self.assertEqual(len(logs), 3)
+        self.assertEqual(len({log.model_type_id for log in logs}), 1)
+        self.assertEqual(logs[0].model_name, 'Process')
+        self.assertEqual(logs[0].ip_address, '10.0.0.1')
+        self.assertEqual(logs[0].user_agent, 'Mozilla/5.0')
+
+
+class AuditAdminTest(TestCase):
+    """
+    Testa o changelist de auditoria sem COUNT.
+    """
+    
+    def test_changelist_without_count(self):
+        """Changelist não executa COUNT(*)"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from apps.shared.audit_intern import clear_interned
+        from apps.shared.models import AuditLog
+        
+        clear_interned()
+        org = Organization.objects.create(name='Admin Org', document='14141414141414')
+        for i in range(3):
+            AuditLog.objects.create(organization=org, action='update', model_name='Process', object_id=i)
+        
+        admin = User.objects.create_superuser(username='admin', email='admin@test.com', password='test123')
+        self.client.force_login(admin)
+        
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/admin/shared/auditlog/')
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Process')
+        self.assertFalse([q for q in queries if 'COUNT(' in q['sql'] and 'shared_auditlog' in q['sql']])
+    
+    def test_changelist_show_all_disabled(self):
+        """?all= não carrega a tabela inteira"""
+        from apps.shared.admin import AuditLogAdmin
+        from apps.shared.audit_intern import clear_interned
+        from apps.shared.models import AuditLog
+        
+        clear_interned()
+        org = Organization.objects.create(name='Admin Org', document='14141414141414')
+        for i in range(AuditLogAdmin.list_per_page + 5):
+            AuditLog.objects.create(organization=org, action='update', model_name='Process', object_id=i)
+        
+        admin = User.objects.create_superuser(username='admin', email='admin@test.com', password='test123')
+        self.client.force_login(admin)
+        
+        response = self.client.get('/admin/shared/auditlog/', {'all': ''})
+        
+        self.assertEqual(response.status_code, 200)
+        changelist = response.context['cl']
+        self.assertFalse(changelist.can_show_all)
+        self.assertEqual(len(changelist.result_list), AuditLogAdmin.list_per_page)
+
+
+class AuditExportTest(TestCase):
+    """
+    Testa o export de logs pelo management command.
+    """
+    
+    def test_command_exports_organization_range(self):
+        """Exporta só a organização e o período pedidos"""
+        import gzip
+        import json
+        import os
+        import tempfile
+        from datetime import timedelta
+        from django.core.management import call_command
+        from django.utils import timezone
+        from apps.shared.audit_intern import clear_interned
+        from apps.shared.models import AuditLog
+        
+        clear_interned()
+        org = Organization.objects.create(name='Export Org', document='15151515151515')
+        other = Organization.objects.create(name='Outra', document='16161616161616')
+        
+        now = timezone.now()
+        AuditLog.objects.create(organization=org, action='create', model_name='Customer', object_id=1)
+        AuditLog.objects.create(organization=org, action='create', model_name='Customer', object_id=2,
+                                timestamp=now - timedelta(days=10))
+        AuditLog.objects.create(organization=other, action='create', model_name='Customer', object_id=3)
+        
+        fd, path = tempfile.mkstemp(suffix='.ndjson.gz')
+        os.close(fd)
+        self.addCleanup(os.remove, path)
+        
+        call_command(
+            'export_audit_logs',
+            organization=org.pk,
+            since=(now - timedelta(days=1)).date().isoformat(),
+            gzip=True,
+            file=path
+        )
+        
+        with gzip.open(path, 'rt') as fh:
+            rows = [json.loads(line) for line in fh]
+        
+        self.assertEqual([row['object_id'] for row in rows], [1])
+    
+    def test_command_writes_to_command_stdout(self):
+        """Sem --file a saída vai para self.stdout (call_command(stdout=...))"""
+        import json
+        from io import StringIO
+        from django.core.management import call_command
+        from django.core.management.base import CommandError
+        from apps.shared.audit_intern import clear_interned
+        from apps.shared.models import AuditLog
+        
+        clear_interned()
+        org = Organization.objects.create(name='Stdout Org', document='17171717171717')
+        AuditLog.objects.create(organization=org, action='create', model_name='Customer', object_id=7)
+        
+        out = StringIO()
+        call_command('export_audit_logs', organization=org.pk, stdout=out)
+        rows = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual([row['object_id'] for row in rows], [7])
+        
+        # gzip num stdout de texto: pede --file
+        with self.assertRaises(CommandError):
+            call_command('export_audit_logs', organization=org.pk, gzip=True, stdout=StringIO())
+
+
+class ScopedQuerySetTest(TestCase):
+    """
+    Testa os filtros de tenant encadeáveis e os índices compostos.
+    """
+    
+    def setUp(self):
+        self.org = Organization.objects.create(
+            name='Scope Org',
+            document='12121212121212'
+        )
+        
+        self.office = Office.objects.create(
+            organization=self.org,
+            name='Scope Office'
+        )
+        
+        self.other_office = Office.objects.create(
+            organization=self.org,
+            name='Other Office'
+        )
+        
+        self.customer = Customer.objects.create(
+            organization=self.org,
+            office=self.office,
+            name='Cliente Ativo',
+            document='12345678901'
+        )
+        
+        Customer.objects.create(
+            organization=self.org,
+            office=self.office,
+            name='Cliente Inativo',
+            document='12345678902',
+            is_active=False
+        )
+        
+        Customer.objects.create(
+            organization=self.org,
+            office=self.other_office,
+            name='Cliente Outro Office',
+            document='12345678903'
+        )
+    
+    def test_for_request_chains_after_filter(self):
+        """for_request funciona no meio da cadeia"""
+        request = RequestFactory().get('/')
+        request.organization = self.org
+        request.office = self.office
+        
+        queryset = Customer.objects.filter(is_active=True).for_request(request)
+        self.assertEqual(list(queryset), [self.customer])
+        
+        queryset = Customer.objects.for_request(request).filter(is_active=True)
+        self.assertEqual(list(queryset), [self.customer])
+        
+        request.organization = None
+        self.assertFalse(Customer.objects.filter(is_active=True).for_request(request).exists())
+    
+    def test_for_office_chains(self):
+        """for_organization/for_office encadeiam entre si e com filtros"""
+        queryset = Customer.objects.filter(is_active=True).for_organization(self.org)
+        self.assertEqual(queryset.count(), 2)
+        self.assertEqual(queryset.for_office(self.other_office).count(), 1)
+    
+    def test_tenant_queries_use_composite_index(self):
+        """Filtro de tenant + ordenação padrão usam o índice composto (sem sort extra)"""
+        from django.db import connection
+        from apps.deadlines.models import Deadline
+        from apps.documents.models import Document
+        from apps.finance.models import FeeAgreement, Payment
+        
+        if connection.vendor != 'sqlite':
+            self.skipTest('Plano de consulta verificado só no SQLite')
+        
+        expected = {
+            Customer: 'cust_org_office_created_idx',
+            Process: 'proc_org_office_created_idx',
+            Deadline: 'deadline_org_office_due_idx',
+            Document: 'doc_org_office_created_idx',
+            FeeAgreement: 'fee_org_office_created_idx',
+            Payment: 'payment_org_office_due_idx',
+        }
+        
+        for model, index_name in expected.items():
+            with self.subTest(model=model.__name__):
+                self.assertIn(index_name, [index.name for index in model._meta.indexes])
+                
+                plan = model.objects.for_organization(self.org).for_office(self.office).explain()
+                self.assertIn(index_name, plan)
+                self.assertNotIn('TEMP B-TREE', plan)
+
+
+class SoftDeleteTest(TestCase):
+    """
+    Testa soft delete de Customer/Process e o purge em lotes.
+    """
+    
+    def setUp(self):
+        self.org = Organization.objects.create(
+            name='Soft Org',
+            document='13131313131313'
+        )
+        
+        self.office = Office.objects.create(
+            organization=self.org,
+            name='Soft Office'
+        )
+        
+        self.customer = Customer.objects.create(
+            organization=self.org,
+            office=self.office,
+            name='Cliente Soft',
+            document='12345678901'
+        )
+        
+        self.process = Process.objects.create(
+            organization=self.org,
+            office=self.office,
+            number='0000009-00.2024.8.26.0009',
+            subject='Processo Soft',
+            court='TJSP'
+        )
+    
+    def test_delete_only_marks(self):
+        """delete() esconde o objeto sem apagar a linha; o documento pode ser reutilizado"""
+        self.customer.delete()
+        
+        self.assertFalse(Customer.objects.filter(pk=self.customer.pk).exists())
+        self.assertTrue(Customer.objects.with_deleted().filter(pk=self.customer.pk).exists())
+        self.assertIsNotNone(Customer.objects.deleted_only().get().deleted_at)
+        
+        # Constraint único só vale para os vivos
+        Customer.objects.create(
+            organization=self.org,
+            office=self.office,
+            name='Cliente Soft 2',
+            document='12345678901'
+        )
+    
+    def test_queryset_delete_and_restore(self):
+        """delete() em massa marca; restore() desfaz"""
+        self.assertEqual(Process.objects.filter(pk=self.process.pk).delete(), 1)
+        self.assertFalse(Process.objects.exists())
+        
+        Process.objects.with_deleted().restore()
+        self.assertTrue(Process.objects.filter(pk=self.process.pk).exists())
+    
+    def test_purge_hard_deletes_expired_in_batches(self):
+        """purge_deleted apaga (com CASCADE) só os deletados fora da retenção"""
+        import io
+        from datetime import timedelta
+        from django.core.management import call_command
+        from django.utils import timezone
+        from apps.processes.models import ProcessParty
+        
+        ProcessParty.objects.create(process=self.process, customer=self.customer, role='plaintiff')
+        recent = Process.objects.create(
+            organization=self.org,
+            office=self.office,
+            number='0000010-00.2024.8.26.0009',
+            subject='Recente',
+            court='TJSP'
+        )
+        
+        self.process.delete()
+        recent.delete()
+        Process.objects.with_deleted().filter(pk=self.process.pk).update(
+            deleted_at=timezone.now() - timedelta(days=60)
+        )
+        
+        call_command('purge_deleted', days=30, batch_size=1, stdout=io.StringIO())
+        
+        self.assertFalse(Process.objects.with_deleted().filter(pk=self.process.pk).exists())
+        self.assertFalse(ProcessParty.objects.exists())
+        self.assertTrue(Process.objects.with_deleted().filter(pk=recent.pk).exists())
+        self.assertTrue(Customer.objects.filter(pk=self.customer.pk).exists())
+    
+    def test_alive_and_tombstone_partial_indexes(self):
+        """Consultas do dia a dia e do purge usam os índices parciais"""
+        from django.db import connection
+        from django.utils import timezone
+        
+        if connection.vendor != 'sqlite':
+            self.skipTest('Plano de consulta verificado só no SQLite')
+        
+        plan = Process.objects.for_organization(self.org).for_office(self.office).explain()
+        self.assertIn('proc_org_office_created_idx', plan)
+        
+        plan = Process.objects.deleted_only().filter(deleted_at__lt=timezone.now()).explain()
+        self.assertIn('proc_tombstone_idx', plan)
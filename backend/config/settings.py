@@ -264,8 +264,8 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ],
     
-    # Paginação
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    # Paginação (por página; ?paginate=cursor para keyset, ver apps.api.pagination)
+    'DEFAULT_PAGINATION_CLASS': 'apps.api.pagination.OptInKeysetPagination',
     'PAGE_SIZE': 25,
     
     # Filtros
@@ -313,6 +313,9 @@ SIMPLE_JWT = {
     
     'AUTH_TOKEN_CLASSES': ('rest_framework_simplejwt.tokens.AccessToken',),
     'TOKEN_TYPE_CLAIM': 'token_type',
+    
+    # Refresh recalcula os claims de tenant (org_id, office_id, role...)
+    'TOKEN_REFRESH_SERIALIZER': 'apps.api.serializers.auth.TenantTokenRefreshSerializer',
 }
 
 # ===== CORS SETTINGS =====
@@ -420,4 +423,74 @@ SPECTACULAR_SETTINGS = {
         {'name': 'documents', 'description': 'Documentos e arquivos'},
         {'name': 'finance', 'description': 'Honorários e pagamentos'},
     ],
-}
\ No newline at end of file
+}
+
+# ===== MULTI-TENANT =====
+# Cache (por processo) do membership resolvido pelo OrganizationMiddleware
+MEMBERSHIP_CACHE = {
+    'MAX_SIZE': 1024,  # Quantidade máxima de usuários em cache (LRU)
+    'TTL': 300,        # Segundos até reconsultar o banco
+}
+
+# Overrides de permissões por organização (Organization.settings['permissions'])
+CAPABILITY_OVERRIDES = {
+    'TTL': 300,  # Segundos até recompilar os overrides de uma organização
+}
+
+# ===== CACHE =====
+# Backend do cache. Com vários processos/servidores use um backend
+# compartilhado, ex:
+#   'django.core.cache.backends.filebased.FileBasedCache' (LOCATION: diretório)
+#   'django.core.cache.backends.redis.RedisCache' (LOCATION: 'redis://127.0.0.1:6379')
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+}
+
+# Cache das listagens da API por tenant (apps.shared.response_cache).
+# Só funciona com ALIAS num backend compartilhado entre os processos
+# (Redis, memcached, banco): com locmem cada worker guardaria as próprias
+# versões e serviria respostas já invalidadas por outro. Com LocMemCache /
+# DummyCache ele se desliga sozinho; ALLOW_LOCAL=True liga mesmo assim
+# (só para testes ou um único processo).
+RESPONSE_CACHE = {
+    'ENABLED': True,
+    'ALIAS': 'default',  # Alias em CACHES (backend compartilhado)
+    'ALLOW_LOCAL': False,
+    'TTL': 300,          # Segundos de vida de uma resposta
+}
+
+# Endpoints /bulk/ (apps.api.bulk)
+BULK_API = {
+    'MAX_ITEMS': 1000,   # Itens por requisição (create + update + delete)
+    'BATCH_SIZE': 500,   # Linhas por INSERT/UPDATE/consulta
+}
+
+# ===== SOFT DELETE =====
+# Customers e processos deletados ficam marcados até o purge
+# (manage.py purge_deleted, via cron)
+SOFT_DELETE = {
+    'RETENTION_DAYS': 30,     # Dias até apagar de verdade
+    'PURGE_BATCH_SIZE': 200,  # Objetos por transação no purge
+    'PURGE_PAUSE': 0.0,       # Segundos entre lotes
+}
+
+# ===== AUDITORIA =====
+# Gravação em lote dos AuditLogs (apps.shared.audit_writer)
+AUDIT_LOG_WRITER = {
+    'ASYNC': True,            # False: grava no commit, sem thread em background
+    'BATCH_SIZE': 100,        # Entradas por bulk_create
+    'FLUSH_INTERVAL': 1.0,    # Segundos entre gravações
+    'MAX_QUEUE': 10000,       # Tamanho máximo da fila
+    # Fila cheia: drop_oldest | drop_newest | block | sync. block e sync
+    # seguram o commit na thread do request (até BLOCK_TIMEOUT / um bulk_create)
+    'BACKPRESSURE': 'drop_oldest',
+    'BLOCK_TIMEOUT': 1.0,     # Segundos esperando espaço (política block)
+}
+
+# Arquivamento dos AuditLogs antigos (manage.py archive_audit_logs)
+AUDIT_LOG_ARCHIVE = {
+    'DIR': BASE_DIR / 'audit_archive',  # Partes audit-YYYY-MM.<id>.ndjson.gz
+    'KEEP_MONTHS': 12,                  # Partições mensais mantidas no banco
+}